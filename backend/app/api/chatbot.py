@@ -8,13 +8,16 @@ from fastapi import (
     Header,
     Request,
 )
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, AsyncIterator, Awaitable, List, Optional, Tuple
 from datetime import datetime, UTC
 from app.services.grok_service import grok_service
 from app.services.kaggle_notebook_service import kaggle_notebook_service
 from app.services.plantnet_service import plantnet_service
 from app.services.usda_service import usda_service
+from app.services.zero_shot_service import zero_shot_service
+from app.services.redis_service import pipeline_result_cache
 from app.core.security import ImageSecurity, AuthSecurity
 from app.core.rate_limiter import rate_limiter
 from app.core.config import settings
@@ -24,6 +27,8 @@ from app.core.exceptions import (
     ImageValidationError,
     PlantRecognitionException,
 )
+import asyncio
+import json
 import uuid
 from datetime import datetime
 from PIL import Image
@@ -44,6 +49,193 @@ class ChatRequest(BaseModel):
     session_id: Optional[str] = None
 
 
+def _as_prediction_list(result: Any) -> Optional[List[dict]]:
+    """
+    Normalize a source response to a list of prediction dicts (None = failed)
+
+    PlantNet's {"success", "results"} envelope is unwrapped to its results,
+    so it merges like Kaggle's bare list instead of as one "Unknown"
+    prediction; any other dict counts as a single prediction.
+    """
+    if isinstance(result, dict):
+        # PlantNet wraps predictions: {"success": bool, "results": [...]}
+        if result.get("success") is False:
+            return None
+        if "results" in result:
+            result = result.get("results") or []
+        else:
+            return [result]
+    if not isinstance(result, list):
+        return []
+    return [r for r in result if isinstance(r, dict)]
+
+
+async def _identify_with_deadline(
+    source: str, call: Awaitable[Any], timeout: float
+) -> Optional[List[dict]]:
+    """Await one identification source, returning None on timeout or failure"""
+    try:
+        results = _as_prediction_list(await asyncio.wait_for(call, timeout=timeout))
+        if results is None:
+            logger.warning(f"⚠️ {source} reported a failure")
+        elif results:
+            logger.info(f"✅ {source} found {len(results)} predictions")
+        else:
+            logger.warning(f"⚠️ {source} returned no results")
+        return results
+    except asyncio.TimeoutError:
+        logger.warning(f"⚠️ {source} timed out after {timeout:.1f}s")
+    except Exception as e:
+        logger.warning(f"⚠️ {source} API failed: {e}")
+    return None
+
+
+async def _identify_concurrently(
+    image_bytes: bytes,
+) -> AsyncIterator[Tuple[str, Optional[List[dict]]]]:
+    """
+    Fan out Kaggle PlantCLEF and PlantNet (plus local zero-shot when
+    ZERO_SHOT_MODE=primary) at once.
+
+    Yields (source, predictions) as each source finishes; predictions is
+    None if that source failed or hit its own timeout. Sources still
+    running when IDENTIFICATION_BUDGET_SECONDS runs out are cancelled and
+    never yielded.
+    """
+    tasks = {
+        asyncio.create_task(
+            _identify_with_deadline(
+                "Kaggle",
+                kaggle_notebook_service.identify_plant(image_bytes, top_k=5),
+                settings.KAGGLE_TIMEOUT_SECONDS,
+            )
+        ): "kaggle",
+        asyncio.create_task(
+            _identify_with_deadline(
+                "PlantNet",
+                plantnet_service.identify_plant(image_bytes),
+                settings.PLANTNET_TIMEOUT_SECONDS,
+            )
+        ): "plantnet",
+    }
+    if zero_shot_service.mode == "primary" and zero_shot_service.is_available:
+        tasks[
+            asyncio.create_task(
+                _identify_with_deadline(
+                    "Zero-shot",
+                    zero_shot_service.identify_plant(image_bytes, top_k=5),
+                    settings.ZERO_SHOT_TIMEOUT_SECONDS,
+                )
+            )
+        ] = "zeroshot"
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.IDENTIFICATION_BUDGET_SECONDS
+    pending = set(tasks)
+
+    try:
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield tasks[task], task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+            logger.warning(
+                f"⚠️ {tasks[task]} still running after "
+                f"{settings.IDENTIFICATION_BUDGET_SECONDS:.1f}s budget - skipped"
+            )
+
+
+async def _merge_with_usda(
+    kaggle_results: List[dict],
+    plantnet_results: List[dict],
+    zeroshot_results: Optional[List[dict]] = None,
+) -> List[dict]:
+    """
+    Merge source predictions and validate them with USDA
+
+    Identification comes from the first non-empty source: Kaggle, then
+    PlantNet, then local zero-shot - or zero-shot first when
+    ZERO_SHOT_MODE=primary.
+    """
+    combined_results = []
+
+    # Merge results: prioritize Kaggle for identification, PlantNet for info
+    candidates = [kaggle_results, plantnet_results, zeroshot_results or []]
+    if zero_shot_service.mode == "primary":
+        candidates.insert(0, candidates.pop())
+    identification = next((c for c in candidates if c), [])
+    primary_source = identification[:5]
+    scientific_names = [
+        result.get("scientificName", result.get("scientific_name", "Unknown"))
+        for result in primary_source
+    ]
+
+    # One USDA round trip for all candidates, off the event loop
+    usda_matches = await asyncio.to_thread(
+        usda_service.find_by_scientific_names, scientific_names
+    )
+
+    for result, scientific_name in zip(primary_source, scientific_names):
+
+        # Start with base info
+        enriched_result = {
+            "scientificName": scientific_name,
+            "commonName": result.get("commonName", result.get("common_name", "")),
+            "family": result.get("family", ""),
+            "confidence": result.get("certainty", result.get("score", 0)),
+            "source": result.get("source", "plantnet"),
+            "usda_verified": False,
+        }
+
+        # USDA validation and enrichment
+        usda_data = usda_matches.get(scientific_name)
+        if usda_data:
+            enriched_result["usda_verified"] = True
+            enriched_result["usda_symbol"] = usda_data["symbol"]
+            enriched_result["usda_match_confidence"] = usda_data.get(
+                "match_confidence", 1.0
+            )
+            # Fill missing info from USDA
+            if not enriched_result["family"]:
+                enriched_result["family"] = usda_data["family"]
+            if not enriched_result["commonName"]:
+                enriched_result["commonName"] = usda_data["common_name"]
+            logger.info(
+                f"✅ USDA verified: {scientific_name} -> "
+                f"{usda_data['scientific_name']} ({usda_data.get('match_confidence', 1.0):.2f})"
+            )
+        else:
+            logger.info(f"ℹ️ {scientific_name} not in USDA database")
+
+        # Cross-reference with PlantNet for additional info
+        if identification is not plantnet_results and plantnet_results:
+            for pn in plantnet_results:
+                # Skip if pn is not a dict (could be string in some error cases)
+                if not isinstance(pn, dict):
+                    continue
+                pn_name = pn.get("scientific_name", "") or pn.get(
+                    "scientificName", ""
+                )
+                if pn_name and scientific_name.lower().startswith(
+                    pn_name.lower().split()[0] if pn_name else ""
+                ):
+                    # Found matching genus, add PlantNet info
+                    enriched_result["genus"] = pn.get("genus", "")
+                    if pn.get("common_name") and not enriched_result["commonName"]:
+                        enriched_result["commonName"] = pn.get("common_name")
+                    break
+
+        combined_results.append(enriched_result)
+
+    return combined_results
+
+
 @router.post("/chat")
 async def chat(request: ChatRequest):
     """Text-only chat endpoint - uses LLM directly"""
@@ -64,6 +256,226 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _identify_and_merge(
+    image_bytes: bytes, image_hash: str
+) -> AsyncIterator[Tuple[str, List[dict]]]:
+    """
+    Run steps 1-3 of the pipeline as a sequence of stages.
+
+    Yields ("kaggle" | "plantnet", predictions) as each source lands and
+    finally ("merged", combined_results). A pipeline cache hit yields only
+    the "merged" stage.
+    """
+    cached = await pipeline_result_cache.get(image_hash)
+    if cached is not None:
+        logger.info(f"⚡ Pipeline cache hit: {image_hash[:16]}...")
+        yield "merged", cached["results"]
+        return
+
+    # ═══════════════════════════════════════════════════════════════
+    # STEP 1-2: KAGGLE PLANTCLEF + PLANTNET - run concurrently
+    # ═══════════════════════════════════════════════════════════════
+    logger.info("🔍 Querying Kaggle PlantCLEF and PlantNet concurrently...")
+    source_results = {"kaggle": None, "plantnet": None}
+    if zero_shot_service.mode == "primary" and zero_shot_service.is_available:
+        source_results["zeroshot"] = None
+    async for source, results in _identify_concurrently(image_bytes):
+        source_results[source] = results
+        yield source, results or []
+
+    # Local zero-shot fallback when both remote sources came back empty
+    if (
+        zero_shot_service.mode == "fallback"
+        and not source_results["kaggle"]
+        and not source_results["plantnet"]
+        and zero_shot_service.is_available
+    ):
+        logger.info("🔁 Remote sources empty - using local zero-shot classifier")
+        source_results["zeroshot"] = await _identify_with_deadline(
+            "Zero-shot",
+            zero_shot_service.identify_plant(image_bytes, top_k=5),
+            settings.ZERO_SHOT_TIMEOUT_SECONDS,
+        )
+        yield "zeroshot", source_results["zeroshot"] or []
+
+    # ═══════════════════════════════════════════════════════════════
+    # STEP 3: COMBINE & VALIDATE WITH USDA
+    # ═══════════════════════════════════════════════════════════════
+    combined_results = await _merge_with_usda(
+        source_results["kaggle"] or [],
+        source_results["plantnet"] or [],
+        source_results.get("zeroshot"),
+    )
+    logger.info(f"📊 Combined {len(combined_results)} plant results")
+
+    # Only cache complete answers - a failed or timed-out source must be
+    # retried. Kaggle reports errors as an empty list, indistinguishable from
+    # "no match", so answers with an empty source are only kept briefly.
+    if combined_results and None not in source_results.values():
+        ttl = (
+            settings.PIPELINE_CACHE_PARTIAL_TTL
+            if not all(source_results.values())
+            else None
+        )
+        await pipeline_result_cache.set(image_hash, {"results": combined_results}, ttl=ttl)
+
+    yield "merged", combined_results
+
+
+async def _generate_plant_response(
+    safe_message: str, combined_results: List[dict]
+) -> str:
+    """STEP 4: LLM RAG - Generate Turkish explanation"""
+    if not combined_results:
+        logger.info("⚠️ No plants found")
+        return (
+            "Görsel analizi tamamlandı ancak eşleşen bitki bulunamadı. "
+            "Lütfen daha net bir fotoğraf veya farklı açıdan çekilmiş görsel deneyin."
+        )
+
+    top_3 = combined_results[:3]
+    context_parts = []
+
+    for p in top_3:
+        confidence = p.get("confidence", 0)
+        usda_status = "✓ USDA Doğrulandı" if p.get("usda_verified") else "Doğrulanmadı"
+
+        context = (
+            f"- {p['scientificName']} ({p['commonName']})\n"
+            f"  Aile: {p.get('family', 'Bilinmiyor')}\n"
+            f"  Güven: {confidence:.1%}\n"
+            f"  Kaynak: {p.get('source', 'unknown')}, {usda_status}"
+        )
+        context_parts.append(context)
+
+    context = "\n\n".join(context_parts)
+
+    # Build prompt based on user query
+    if safe_message.lower() in [
+        "identify",
+        "tanı",
+        "nedir",
+        "what is",
+        "bu ne",
+    ]:
+        prompt = (
+            f"Yüklenen bitkinin türünü belirle ve Türkçe açıkla.\n\n"
+            f"BULUNAN BİTKİLER:\n{context}\n\n"
+            f"GÖREV: Her bitki için kısa açıklama yap (isim, güven, özellikler)."
+        )
+    else:
+        prompt = (
+            f"Kullanıcı sorusu: {safe_message}\n\n"
+            f"BULUNAN BİTKİLER:\n{context}\n\n"
+            f"GÖREV: Soruyu bu bitki bilgileriyle cevaplayarak Türkçe yanıt ver."
+        )
+
+    response = await grok_service.generate_rag_response(prompt, context, top_3)
+    logger.info(f"✅ LLM response: {len(response)} chars")
+    return response
+
+
+def _format_plants(combined_results: List[dict]) -> List[dict]:
+    """Shape the top 3 merged results for the client"""
+    formatted_plants = []
+    for idx, plant in enumerate(combined_results[:3], 1):
+        formatted_plants.append(
+            {
+                "id": idx,
+                "scientificName": plant.get("scientificName", "Unknown"),
+                "commonName": plant.get("commonName", ""),
+                "family": plant.get("family", ""),
+                "confidence": max(0.0, min(1.0, plant.get("confidence", 0))),
+                "source": plant.get("source", "unknown"),
+                "usda_verified": plant.get("usda_verified", False),
+            }
+        )
+    return formatted_plants
+
+
+def _build_chat_response(
+    session_id: str, response: str, combined_results: List[dict], image_hash: str
+) -> dict:
+    """STEP 5: Final /chat-with-image payload"""
+    # Note: Database logging disabled (no PostgreSQL)
+    logger.info(f"💾 Query processed: session {session_id}")
+
+    formatted_plants = _format_plants(combined_results)
+
+    return {
+        "session_id": session_id,
+        "response": response,
+        "identified_plants": formatted_plants,
+        "total_matches": len(combined_results),
+        "highest_confidence": formatted_plants[0]["confidence"]
+        if formatted_plants
+        else 0,
+        "sources": {
+            "kaggle": len(
+                [p for p in combined_results if p.get("source") == "kaggle-plantclef"]
+            ),
+            "plantnet": len(
+                [
+                    p
+                    for p in combined_results
+                    if p.get("source") not in ("kaggle-plantclef", "clip-zeroshot")
+                ]
+            ),
+            "zeroshot": len(
+                [p for p in combined_results if p.get("source") == "clip-zeroshot"]
+            ),
+            "usda_verified": len(
+                [p for p in combined_results if p.get("usda_verified")]
+            ),
+        },
+        "image_hash": image_hash[:16],
+        "timestamp": datetime.now(UTC).isoformat(),
+    }
+
+
+async def _validate_chat_upload(
+    request: Request,
+    file: UploadFile,
+    message: str,
+    x_api_key: Optional[str],
+) -> Tuple[bytes, str, str]:
+    """
+    Run the security layers shared by both /chat-with-image variants
+
+    Returns: (sanitized_bytes, safe_message, image_hash)
+    """
+    client_id = request.client.host if request.client else "unknown"
+
+    # SECURITY LAYER 1: API Key Authentication
+    if settings.REQUIRE_API_KEY:
+        await AuthSecurity.verify_api_key(x_api_key)
+        logger.info(f"✅ API key validated for client {client_id}")
+
+    # SECURITY LAYER 2: Rate Limiting (handled by Depends)
+    logger.info(f"✅ Rate limit check passed for client {client_id}")
+
+    # SECURITY LAYER 3-5: Image Validation & Sanitization
+    is_valid, error_msg, sanitized_bytes = await ImageSecurity.validate_image(
+        file, max_size_mb=settings.MAX_IMAGE_SIZE_MB
+    )
+    logger.info(f"✅ Image validated: {len(sanitized_bytes)} bytes")
+
+    # SECURITY LAYER 6: Text Input Sanitization
+    safe_message = AuthSecurity.sanitize_text_input(message, max_length=2000)
+
+    # Image hash for duplicate detection and pipeline caching
+    image_hash = ImageSecurity.compute_image_hash(sanitized_bytes)
+    logger.info(f"📸 Image hash: {image_hash[:16]}...")
+
+    # Load image
+    pil_image = Image.open(io.BytesIO(sanitized_bytes))
+    if pil_image.mode != "RGB":
+        pil_image = pil_image.convert("RGB")
+    logger.info(f"🖼️ Image loaded: {pil_image.size}")
+
+    return sanitized_bytes, safe_message, image_hash
+
+
 @router.post("/chat-with-image")
 async def chat_with_image(
     request: Request,
@@ -78,9 +490,11 @@ async def chat_with_image(
 
     Flow:
     1. Kaggle PlantCLEF API → Image-based plant identification (1.5TB remote)
-    2. PlantNet API → General plant information (primary info source)
+    2. PlantNet API → General plant information (runs concurrently with 1)
     3. USDA Service → Validation + additional info (93K local plants)
     4. LLM (Gemini/OpenRouter) → Turkish explanation generation
+    Optional: local CLIP zero-shot classifier as fallback or primary source
+    (ZERO_SHOT_MODE)
 
     Security Layers:
     1. API Key Authentication (optional)
@@ -89,247 +503,120 @@ async def chat_with_image(
     4. PIL Verification + Content Sanitization
     5. Text Input Sanitization
     """
+    try:
+        sanitized_bytes, safe_message, image_hash = await _validate_chat_upload(
+            request, file, message, x_api_key
+        )
+        session_id = session_id or str(uuid.uuid4())
 
-    client_id = request.client.host if request.client else "unknown"
+        combined_results: List[dict] = []
+        async for stage, payload in _identify_and_merge(sanitized_bytes, image_hash):
+            if stage == "merged":
+                combined_results = payload
 
-    try:
-        # SECURITY LAYER 1: API Key Authentication
-        if settings.REQUIRE_API_KEY:
-            await AuthSecurity.verify_api_key(x_api_key)
-            logger.info(f"✅ API key validated for client {client_id}")
+        response = await _generate_plant_response(safe_message, combined_results)
 
-        # SECURITY LAYER 2: Rate Limiting (handled by Depends)
-        logger.info(f"✅ Rate limit check passed for client {client_id}")
+        return _build_chat_response(
+            session_id, response, combined_results, image_hash
+        )
 
-        # SECURITY LAYER 3-5: Image Validation & Sanitization
-        is_valid, error_msg, sanitized_bytes = await ImageSecurity.validate_image(
-            file, max_size_mb=settings.MAX_IMAGE_SIZE_MB
+    except HTTPException:
+        raise
+    except PlantRecognitionException as e:
+        logger.error(f"Plant recognition error: {e.message}", exc_info=True)
+        raise exception_to_http(e)
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail={"error": "Internal server error", "message": str(e)},
         )
-        logger.info(f"✅ Image validated: {len(sanitized_bytes)} bytes")
 
-        # SECURITY LAYER 6: Text Input Sanitization
-        safe_message = AuthSecurity.sanitize_text_input(message, max_length=2000)
-        session_id = session_id or str(uuid.uuid4())
 
-        # Image hash for duplicate detection
-        image_hash = ImageSecurity.compute_image_hash(sanitized_bytes)
-        logger.info(f"📸 Image hash: {image_hash[:16]}...")
-
-        # Load image
-        pil_image = Image.open(io.BytesIO(sanitized_bytes))
-        if pil_image.mode != "RGB":
-            pil_image = pil_image.convert("RGB")
-        logger.info(f"🖼️ Image loaded: {pil_image.size}")
-
-        # ═══════════════════════════════════════════════════════════════
-        # STEP 1: KAGGLE PLANTCLEF API - Image-based plant identification
-        # ═══════════════════════════════════════════════════════════════
-        kaggle_results = []
-        try:
-            logger.info("🔍 Querying Kaggle PlantCLEF API...")
-            kaggle_results = await kaggle_notebook_service.identify_plant(
-                sanitized_bytes, top_k=5
-            )
-            if kaggle_results:
-                logger.info(f"✅ Kaggle found {len(kaggle_results)} predictions")
-            else:
-                logger.warning("⚠️ Kaggle returned no results")
-        except Exception as e:
-            logger.warning(f"⚠️ Kaggle API failed: {e}")
-
-        # ═══════════════════════════════════════════════════════════════
-        # STEP 2: PLANTNET API - General plant information
-        # ═══════════════════════════════════════════════════════════════
-        plantnet_results = []
-        try:
-            logger.info("🌱 Querying PlantNet API for general info...")
-            plantnet_results = await plantnet_service.identify_plant(sanitized_bytes)
-            if plantnet_results:
-                logger.info(f"✅ PlantNet found {len(plantnet_results)} results")
-            else:
-                logger.warning("⚠️ PlantNet returned no results")
-        except Exception as e:
-            logger.warning(f"⚠️ PlantNet API failed: {e}")
-
-        # ═══════════════════════════════════════════════════════════════
-        # STEP 3: COMBINE & VALIDATE WITH USDA
-        # ═══════════════════════════════════════════════════════════════
-        combined_results = []
-
-        # Merge results: prioritize Kaggle for identification, PlantNet for info
-        primary_source = kaggle_results if kaggle_results else plantnet_results
-
-        # Ensure primary_source is a list (not None or dict)
-        if primary_source is None:
-            primary_source = []
-        elif isinstance(primary_source, dict):
-            primary_source = [primary_source]
-        elif not isinstance(primary_source, list):
-            primary_source = []
-
-        for result in list(primary_source)[:5]:
-            scientific_name = result.get(
-                "scientificName", result.get("scientific_name", "Unknown")
-            )
+def _sse_event(event: str, data: Any) -> str:
+    """Encode one Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
-            # Start with base info
-            enriched_result = {
-                "scientificName": scientific_name,
-                "commonName": result.get("commonName", result.get("common_name", "")),
-                "family": result.get("family", ""),
-                "confidence": result.get("certainty", result.get("score", 0)),
-                "source": result.get("source", "plantnet"),
-                "usda_verified": False,
-            }
 
-            # USDA validation and enrichment
-            usda_data = usda_service.find_by_scientific_name(scientific_name)
-            if usda_data:
-                enriched_result["usda_verified"] = True
-                enriched_result["usda_symbol"] = usda_data["symbol"]
-                # Fill missing info from USDA
-                if not enriched_result["family"]:
-                    enriched_result["family"] = usda_data["family"]
-                if not enriched_result["commonName"]:
-                    enriched_result["commonName"] = usda_data["common_name"]
-                logger.info(f"✅ USDA verified: {scientific_name}")
-            else:
-                logger.info(f"ℹ️ {scientific_name} not in USDA database")
-
-            # Cross-reference with PlantNet for additional info
-            if kaggle_results and plantnet_results:
-                for pn in plantnet_results:
-                    # Skip if pn is not a dict (could be string in some error cases)
-                    if not isinstance(pn, dict):
-                        continue
-                    pn_name = pn.get("scientific_name", "") or pn.get(
-                        "scientificName", ""
-                    )
-                    if pn_name and scientific_name.lower().startswith(
-                        pn_name.lower().split()[0] if pn_name else ""
-                    ):
-                        # Found matching genus, add PlantNet info
-                        enriched_result["genus"] = pn.get("genus", "")
-                        if pn.get("common_name") and not enriched_result["commonName"]:
-                            enriched_result["commonName"] = pn.get("common_name")
-                        break
-
-            combined_results.append(enriched_result)
-
-        logger.info(f"📊 Combined {len(combined_results)} plant results")
-
-        # ═══════════════════════════════════════════════════════════════
-        # STEP 4: LLM RAG - Generate Turkish explanation
-        # ═══════════════════════════════════════════════════════════════
-        if combined_results:
-            top_3 = combined_results[:3]
-            context_parts = []
-
-            for p in top_3:
-                confidence = p.get("confidence", 0)
-                usda_status = (
-                    "✓ USDA Doğrulandı" if p.get("usda_verified") else "Doğrulanmadı"
-                )
+async def _stream_chat_with_image(
+    sanitized_bytes: bytes, safe_message: str, session_id: str, image_hash: str
+) -> AsyncIterator[str]:
+    """Emit one SSE event per pipeline stage, ending with the full payload"""
+    yield _sse_event(
+        "validated", {"session_id": session_id, "image_hash": image_hash[:16]}
+    )
 
-                context = (
-                    f"- {p['scientificName']} ({p['commonName']})\n"
-                    f"  Aile: {p.get('family', 'Bilinmiyor')}\n"
-                    f"  Güven: {confidence:.1%}\n"
-                    f"  Kaynak: {p.get('source', 'unknown')}, {usda_status}"
-                )
-                context_parts.append(context)
-
-            context = "\n\n".join(context_parts)
-
-            # Build prompt based on user query
-            if safe_message.lower() in [
-                "identify",
-                "tanı",
-                "nedir",
-                "what is",
-                "bu ne",
-            ]:
-                prompt = (
-                    f"Yüklenen bitkinin türünü belirle ve Türkçe açıkla.\n\n"
-                    f"BULUNAN BİTKİLER:\n{context}\n\n"
-                    f"GÖREV: Her bitki için kısa açıklama yap (isim, güven, özellikler)."
+    try:
+        combined_results: List[dict] = []
+        async for stage, payload in _identify_and_merge(sanitized_bytes, image_hash):
+            if stage == "merged":
+                combined_results = payload
+                yield _sse_event(
+                    "merged",
+                    {
+                        "identified_plants": _format_plants(combined_results),
+                        "total_matches": len(combined_results),
+                    },
                 )
             else:
-                prompt = (
-                    f"Kullanıcı sorusu: {safe_message}\n\n"
-                    f"BULUNAN BİTKİLER:\n{context}\n\n"
-                    f"GÖREV: Soruyu bu bitki bilgileriyle cevaplayarak Türkçe yanıt ver."
-                )
+                yield _sse_event(stage, {"predictions": payload})
 
-            response = await grok_service.generate_rag_response(prompt, context, top_3)
-            logger.info(f"✅ LLM response: {len(response)} chars")
-        else:
-            response = (
-                "Görsel analizi tamamlandı ancak eşleşen bitki bulunamadı. "
-                "Lütfen daha net bir fotoğraf veya farklı açıdan çekilmiş görsel deneyin."
-            )
-            logger.info("⚠️ No plants found")
+        response = await _generate_plant_response(safe_message, combined_results)
+        yield _sse_event("response", {"response": response})
 
-        # ═══════════════════════════════════════════════════════════════
-        # STEP 5: Log to database & return response
-        # ═══════════════════════════════════════════════════════════════
-        # Note: Database logging disabled (no PostgreSQL)
-        logger.info(f"💾 Query processed: session {session_id}")
-
-        # Format response
-        formatted_plants = []
-        for idx, plant in enumerate(combined_results[:3], 1):
-            formatted_plants.append(
-                {
-                    "id": idx,
-                    "scientificName": plant.get("scientificName", "Unknown"),
-                    "commonName": plant.get("commonName", ""),
-                    "family": plant.get("family", ""),
-                    "confidence": max(0.0, min(1.0, plant.get("confidence", 0))),
-                    "source": plant.get("source", "unknown"),
-                    "usda_verified": plant.get("usda_verified", False),
-                }
-            )
+        # Same JSON body /chat-with-image returns
+        yield _sse_event(
+            "done",
+            _build_chat_response(session_id, response, combined_results, image_hash),
+        )
+
+    except PlantRecognitionException as e:
+        logger.error(f"Plant recognition error: {e.message}", exc_info=True)
+        yield _sse_event(
+            "error",
+            {"error": e.message, "details": e.details, "type": type(e).__name__},
+        )
+    except Exception as e:
+        logger.error(f"Unexpected streaming error: {str(e)}", exc_info=True)
+        yield _sse_event(
+            "error", {"error": "Internal server error", "message": str(e)}
+        )
 
-        return {
-            "session_id": session_id,
-            "response": response,
-            "identified_plants": formatted_plants,
-            "total_matches": len(combined_results),
-            "highest_confidence": formatted_plants[0]["confidence"]
-            if formatted_plants
-            else 0,
-            "sources": {
-                "kaggle": len(
-                    [
-                        p
-                        for p in combined_results
-                        if p.get("source") == "kaggle-plantclef"
-                    ]
-                ),
-                "plantnet": len(
-                    [
-                        p
-                        for p in combined_results
-                        if p.get("source") != "kaggle-plantclef"
-                    ]
-                ),
-                "usda_verified": len(
-                    [p for p in combined_results if p.get("usda_verified")]
-                ),
-            },
-            "image_hash": image_hash[:16],
-            "timestamp": datetime.now(UTC).isoformat(),
-        }
 
+@router.post("/chat-with-image/stream")
+async def chat_with_image_stream(
+    request: Request,
+    file: UploadFile = File(...),
+    message: str = Form(...),
+    session_id: Optional[str] = Form(None),
+    x_api_key: Optional[str] = Header(None),
+    _rate_limit: None = Depends(rate_limiter),
+):
+    """
+    🌿 Streaming (Server-Sent Events) variant of /chat-with-image
+
+    Same pipeline and security layers; events are emitted as each stage
+    finishes instead of after the slowest upstream:
+    validated → kaggle / plantnet (arrival order) → merged → response → done
+
+    The "done" event carries exactly the /chat-with-image JSON body. A
+    pipeline cache hit skips the kaggle/plantnet events. Failures after
+    validation are reported as an "error" event.
+    """
+    try:
+        # Validate before streaming so bad uploads still get a 4xx status
+        sanitized_bytes, safe_message, image_hash = await _validate_chat_upload(
+            request, file, message, x_api_key
+        )
     except HTTPException:
         raise
     except PlantRecognitionException as e:
-        logger.error(f"Plant recognition error: {e.message}", exc_info=True)
         raise exception_to_http(e)
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail={"error": "Internal server error", "message": str(e)},
-        )
+
+    session_id = session_id or str(uuid.uuid4())
+
+    return StreamingResponse(
+        _stream_chat_with_image(sanitized_bytes, safe_message, session_id, image_hash),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
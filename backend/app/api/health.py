@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from datetime import datetime, UTC
 from app.core.config import settings
 
@@ -18,7 +19,7 @@ async def health_check():
         "services": {},
     }
 
-    # USDA Plants Database check (Weaviate Cloud)
+    # USDA Plants Database check (Weaviate Cloud or local index)
     try:
         from app.services.usda_service import usda_service
 
@@ -27,12 +28,13 @@ async def health_check():
             health_status["services"]["usda_plants"] = {
                 "status": "healthy",
                 "plant_count": count,
-                "source": "Weaviate Cloud",
+                "source": usda_service.source,
+                "cache": usda_service.cache_stats(),
             }
         else:
             health_status["services"]["usda_plants"] = {
                 "status": "not_loaded",
-                "error": "Run import_usda_to_weaviate.py",
+                "error": "Set USDA_PLANTS_FILE (local) or run import_usda_to_weaviate.py",
             }
             health_status["status"] = "degraded"
     except Exception as e:
@@ -56,6 +58,40 @@ async def health_check():
     except Exception as e:
         health_status["services"]["kaggle"] = {"status": "error", "error": str(e)}
 
+    # Local zero-shot classifier check
+    try:
+        from app.services.zero_shot_service import zero_shot_service
+
+        if zero_shot_service.mode == "off":
+            health_status["services"]["zero_shot"] = {"status": "disabled"}
+        elif zero_shot_service.is_available:
+            health_status["services"]["zero_shot"] = {
+                "status": "ready",
+                "mode": zero_shot_service.mode,
+                "labels": zero_shot_service.label_count,
+            }
+        else:
+            health_status["services"]["zero_shot"] = {
+                "status": "not_loaded",
+                "mode": zero_shot_service.mode,
+                "message": "Run scripts/build_zero_shot_index.py",
+            }
+    except Exception as e:
+        health_status["services"]["zero_shot"] = {"status": "error", "error": str(e)}
+
+    # Local PlantImage vector index (VECTOR_SEARCH_BACKEND=local)
+    try:
+        from app.services.vector_index import vector_index_service
+
+        if vector_index_service.enabled:
+            health_status["services"]["vector_index"] = vector_index_service.stats()
+            if health_status["services"]["vector_index"]["status"] == "failed":
+                health_status["status"] = "degraded"
+        else:
+            health_status["services"]["vector_index"] = {"status": "disabled"}
+    except Exception as e:
+        health_status["services"]["vector_index"] = {"status": "error", "error": str(e)}
+
     # PlantNet API check
     if settings.PLANTNET_API_KEY:
         health_status["services"]["plantnet"] = {
@@ -85,6 +121,32 @@ async def health_check():
             "message": "Set GOOGLE_AI_STUDIO_API_KEY or GROK_API_KEY",
         }
 
+    # CLIP model readiness (background warm-up)
+    try:
+        from app.services.clip_scheduler import clip_scheduler
+
+        health_status["services"]["clip_model"] = clip_scheduler.model_status()
+        if health_status["services"]["clip_model"]["status"] == "failed":
+            health_status["status"] = "degraded"
+    except Exception as e:
+        health_status["services"]["clip_model"] = {"status": "error", "error": str(e)}
+
+    # CLIP inference queue (micro-batching metrics)
+    try:
+        from app.services.clip_scheduler import clip_scheduler
+
+        from app.services.embedding_cache import embedding_cache
+
+        health_status["services"]["clip_inference"] = {
+            **clip_scheduler.stats(),
+            "embedding_cache": embedding_cache.stats(),
+        }
+    except Exception as e:
+        health_status["services"]["clip_inference"] = {
+            "status": "error",
+            "error": str(e),
+        }
+
     # Redis check
     try:
         from app.services.redis_service import redis_service
@@ -102,6 +164,23 @@ async def health_check():
     return health_status
 
 
+@router.get("/ready")
+async def readiness():
+    """
+    Readiness probe: 503 until the CLIP model is loaded and warmed
+    (with CLIP_WARMUP_ON_STARTUP off the model loads lazily, so only a
+    failed load counts as not ready)
+    """
+    from app.services.clip_scheduler import clip_scheduler
+
+    status = clip_scheduler.model_status()
+    if settings.CLIP_WARMUP_ON_STARTUP:
+        ready = status["ready"]
+    else:
+        ready = status["status"] != "failed"
+    return JSONResponse(status, status_code=200 if ready else 503)
+
+
 @router.get("/status")
 async def get_status():
     """Simple status endpoint"""
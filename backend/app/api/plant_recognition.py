@@ -1,14 +1,13 @@
+import asyncio
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from sqlalchemy.orm import Session
 from app.db.base import get_db
-from app.services.clip_service import clip_service
+from app.services.clip_scheduler import clip_scheduler
 from app.services.weaviate_service import weaviate_service
 from app.services.plantnet_service import plantnet_service
 from app.services.grok_service import grok_service
 from app.utils.image_utils import image_processor
 from app.core.config import settings
-from PIL import Image
-import io
 
 router = APIRouter()
 
@@ -26,10 +25,13 @@ async def recognize_plant(file: UploadFile = File(...), db: Session = Depends(ge
         # PlantNet identification
         plantnet_results = await plantnet_service.identify_plant(image_bytes)
         
-        # CLIP similarity search
-        pil_image = Image.open(io.BytesIO(image_bytes))
-        embedding = clip_service.encode_image(pil_image)
-        similar_plants = weaviate_service.similarity_search(embedding) if embedding else []
+        # CLIP similarity search (raw bytes: cheap cache key, reduced-scale JPEG decode)
+        embedding = await clip_scheduler.encode_image(image_bytes)
+        similar_plants = (
+            await asyncio.to_thread(weaviate_service.similarity_search, embedding)
+            if embedding
+            else []
+        )
         
         # Get top result
         top_plant = None
@@ -79,13 +79,91 @@ class Settings(BaseSettings):
     CLIP_MODEL_NAME: str = "openai/clip-vit-base-patch32"
     SIMILARITY_THRESHOLD: float = 0.7
     TOP_K_RESULTS: int = 5
+    # full = CLIPModel up front; vision = vision tower only, text tower on first use
+    CLIP_LOAD_MODE: str = os.getenv("CLIP_LOAD_MODE", "full")
+    # Inference precision: fp32 | bf16 | int8 (dynamic quantization, CPU only)
+    CLIP_PRECISION: str = os.getenv("CLIP_PRECISION", "fp32")
+    # Shortest side (px) images are downscaled to before CLIP preprocessing (0 = off)
+    CLIP_PREPROCESS_SIZE: int = int(os.getenv("CLIP_PREPROCESS_SIZE", "448"))
+    # Load CLIP and run a dummy forward pass in the background at startup.
+    # Off by default: every worker would import torch and load CLIP right
+    # away. gunicorn.conf.py preloads CLIP in the master regardless
+    CLIP_WARMUP_ON_STARTUP: bool = (
+        os.getenv("CLIP_WARMUP_ON_STARTUP", "false").lower() == "true"
+    )
+
+    # CLIP embedding cache: off | disk | redis (plus an in-process LRU tier)
+    EMBEDDING_CACHE_BACKEND: str = os.getenv("EMBEDDING_CACHE_BACKEND", "disk")
+    EMBEDDING_CACHE_DIR: str = os.getenv("EMBEDDING_CACHE_DIR", "data/embedding_cache")
+    EMBEDDING_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "4096"))
+    EMBEDDING_CACHE_TTL: int = int(os.getenv("EMBEDDING_CACHE_TTL", "2592000"))
+    # Disk tier size cap; the oldest entries are pruned beyond it (0 = no cap)
+    EMBEDDING_CACHE_MAX_MB: int = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "512"))
+
+    # CLIP micro-batching: rows (images x TTA crops, or texts) per forward pass,
+    # how long a batch waits for company, and the bounded request queue size
+    CLIP_BATCH_MAX_SIZE: int = int(os.getenv("CLIP_BATCH_MAX_SIZE", "32"))
+    CLIP_BATCH_MAX_WAIT_MS: float = float(os.getenv("CLIP_BATCH_MAX_WAIT_MS", "5"))
+    CLIP_BATCH_QUEUE_SIZE: int = int(os.getenv("CLIP_BATCH_QUEUE_SIZE", "256"))
+    # Where CLIP runs: thread (in the web process) | process (separate
+    # inference processes; CLIP_WORKER_THREADS=0 splits the cores evenly)
+    CLIP_INFERENCE_BACKEND: str = os.getenv("CLIP_INFERENCE_BACKEND", "thread")
+    CLIP_WORKER_PROCESSES: int = int(os.getenv("CLIP_WORKER_PROCESSES", "1"))
+    CLIP_WORKER_THREADS: int = int(os.getenv("CLIP_WORKER_THREADS", "0"))
+
+    # PlantImage similarity search: "remote" (Weaviate nearVector) or "local"
+    # (in-process index loaded from VECTOR_INDEX_SNAPSHOT, else synced from Weaviate)
+    VECTOR_SEARCH_BACKEND: str = os.getenv("VECTOR_SEARCH_BACKEND", "remote")
+    # exact (brute-force matrix product) | hnsw (needs the optional hnswlib package)
+    VECTOR_INDEX_MODE: str = os.getenv("VECTOR_INDEX_MODE", "exact")
+    VECTOR_INDEX_SNAPSHOT: str = os.getenv("VECTOR_INDEX_SNAPSHOT", "data/vectors/plant_images")
+    VECTOR_INDEX_HNSW_EF: int = int(os.getenv("VECTOR_INDEX_HNSW_EF", "64"))
+    VECTOR_INDEX_HNSW_M: int = int(os.getenv("VECTOR_INDEX_HNSW_M", "16"))
 
     # USDA Plants Data (local file)
     USDA_PLANTS_FILE: str = os.getenv("USDA_PLANTS_FILE", "data/plantlst.txt")
+    # "weaviate" (BM25 in Weaviate Cloud) or "local" (in-process index of the file)
+    USDA_BACKEND: str = os.getenv("USDA_BACKEND", "weaviate")
+    # Memory-mapped snapshot of USDA_PLANTS_FILE (scripts/build_usda_snapshot.py)
+    USDA_SNAPSHOT_FILE: str = os.getenv("USDA_SNAPSHOT_FILE", "data/plantlst.snap")
+    # Minimum name-match confidence (0-1) for a candidate to count as USDA verified
+    USDA_MATCH_THRESHOLD: float = float(os.getenv("USDA_MATCH_THRESHOLD", "0.85"))
+    # Lookup cache (misses are cached too, for USDA_CACHE_NEGATIVE_TTL seconds)
+    USDA_CACHE_MAX_ENTRIES: int = int(os.getenv("USDA_CACHE_MAX_ENTRIES", "4096"))
+    USDA_CACHE_TTL: int = int(os.getenv("USDA_CACHE_TTL", "86400"))
+    USDA_CACHE_NEGATIVE_TTL: int = int(os.getenv("USDA_CACHE_NEGATIVE_TTL", "3600"))
+    # Share Weaviate lookup results across workers through Redis
+    USDA_CACHE_SHARED: bool = os.getenv("USDA_CACHE_SHARED", "false").lower() == "true"
 
     # Kaggle Notebook API (for PlantCLEF remote inference)
     KAGGLE_NOTEBOOK_URL: str = os.getenv("KAGGLE_NOTEBOOK_URL", "")
 
+    # Identification fan-out deadlines (seconds) for /chat-with-image
+    KAGGLE_TIMEOUT_SECONDS: float = float(os.getenv("KAGGLE_TIMEOUT_SECONDS", "60"))
+    PLANTNET_TIMEOUT_SECONDS: float = float(os.getenv("PLANTNET_TIMEOUT_SECONDS", "30"))
+    IDENTIFICATION_BUDGET_SECONDS: float = float(
+        os.getenv("IDENTIFICATION_BUDGET_SECONDS", "60")
+    )
+
+    # Local CLIP zero-shot identification (scripts/build_zero_shot_index.py)
+    # ZERO_SHOT_MODE: off | fallback (when Kaggle and PlantNet find nothing) | primary
+    ZERO_SHOT_MODE: str = os.getenv("ZERO_SHOT_MODE", "off")
+    ZERO_SHOT_INDEX: str = os.getenv("ZERO_SHOT_INDEX", "data/zero_shot/usda_species")
+    ZERO_SHOT_TIMEOUT_SECONDS: float = float(os.getenv("ZERO_SHOT_TIMEOUT_SECONDS", "10"))
+    # flat (scan every label) | hierarchical (family -> genus -> species)
+    ZERO_SHOT_SEARCH: str = os.getenv("ZERO_SHOT_SEARCH", "flat")
+    ZERO_SHOT_TOP_FAMILIES: int = int(os.getenv("ZERO_SHOT_TOP_FAMILIES", "5"))
+    ZERO_SHOT_TOP_GENERA: int = int(os.getenv("ZERO_SHOT_TOP_GENERA", "10"))
+
+    # Pipeline result cache (bump PIPELINE_VERSION to invalidate cached results)
+    PIPELINE_VERSION: str = os.getenv("PIPELINE_VERSION", "1")
+    PIPELINE_CACHE_TTL: int = int(os.getenv("PIPELINE_CACHE_TTL", "86400"))
+    # TTL for answers where a source came back empty (possibly a swallowed error)
+    PIPELINE_CACHE_PARTIAL_TTL: int = int(os.getenv("PIPELINE_CACHE_PARTIAL_TTL", "300"))
+    PIPELINE_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("PIPELINE_CACHE_MAX_ENTRIES", "1024")
+    )
+
     # Security settings
     REQUIRE_API_KEY: bool = os.getenv("REQUIRE_API_KEY", "false").lower() == "true"
     VALID_API_KEYS: str = os.getenv("VALID_API_KEYS", "")
@@ -98,3 +176,15 @@ class Settings(BaseSettings):
 
 
 settings = Settings()
+
+
+def resolve_data_path(path: str) -> Path:
+    """Resolve a data file relative to backend/ or the repository root"""
+    candidate = Path(path)
+    if candidate.is_absolute():
+        return candidate
+
+    for base in (BASE_DIR, BASE_DIR.parent):
+        if (base / candidate).exists():
+            return base / candidate
+    return BASE_DIR.parent / candidate
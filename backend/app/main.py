@@ -9,6 +9,21 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip everything except Server-Sent Events streams
+
+    GZip buffers the compressed body until the response ends, which would
+    hold back every SSE event until the stream closes.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith("/stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -38,7 +53,9 @@ async def lifespan(app: FastAPI):
 
         count = usda_service.get_count()
         if count > 0:
-            logger.info(f"✅ USDA Weaviate: {count} plants available")
+            logger.info(f"✅ USDA {usda_service.source}: {count} plants available")
+        elif usda_service.backend == "local":
+            logger.warning("⚠️  USDA local index empty - check USDA_PLANTS_FILE")
         else:
             logger.warning("⚠️  USDA not in Weaviate - run import_usda_to_weaviate.py")
     except Exception as e:
@@ -59,6 +76,44 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Kaggle service error: {e}")
 
+    # Map the local zero-shot index (only when enabled)
+    try:
+        from app.services.zero_shot_service import zero_shot_service
+
+        if zero_shot_service.mode != "off":
+            if zero_shot_service.is_available:
+                logger.info(
+                    f"✅ Zero-shot classifier ({zero_shot_service.mode}): "
+                    f"{zero_shot_service.label_count} labels"
+                )
+            else:
+                logger.warning(
+                    "⚠️  Zero-shot index missing - run build_zero_shot_index.py"
+                )
+    except Exception as e:
+        logger.error(f"Zero-shot service error: {e}")
+
+    # Load the local PlantImage vector index in the background (only when enabled)
+    try:
+        from app.services.vector_index import vector_index_service
+
+        if vector_index_service.enabled:
+            vector_index_service.start_loading()
+            logger.info(f"⏳ Local vector index ({vector_index_service.mode}) loading...")
+    except Exception as e:
+        logger.error(f"Vector index error: {e}")
+
+    # Load and warm CLIP off the event loop (a background thread, or the
+    # inference processes); requests arriving first wait for it
+    if settings.CLIP_WARMUP_ON_STARTUP:
+        try:
+            from app.services.clip_scheduler import clip_scheduler
+
+            clip_scheduler.start_warm_up()
+            logger.info("⏳ CLIP model warming up in background...")
+        except Exception as e:
+            logger.error(f"CLIP warm-up error: {e}")
+
     # Check PlantNet API
     if settings.PLANTNET_API_KEY:
         logger.info("✅ PlantNet API configured")
@@ -80,6 +135,14 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down application...")
 
+    # Drain the CLIP queue (and stop inference processes)
+    try:
+        from app.services.clip_scheduler import clip_scheduler
+
+        clip_scheduler.stop()
+    except Exception as e:
+        logger.error(f"CLIP batcher shutdown error: {e}")
+
     # Disconnect Redis
     try:
         from app.services.redis_service import redis_service
@@ -113,8 +176,8 @@ app.add_middleware(
     max_age=3600,
 )
 
-# GZip Middleware
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# GZip Middleware (SSE streams are passed through uncompressed)
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1000)
 
 # Routers
 app.include_router(health.router, prefix=settings.API_V1_PREFIX, tags=["health"])
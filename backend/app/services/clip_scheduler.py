@@ -0,0 +1,306 @@
+"""
+CLIP Micro-Batching Scheduler
+Gathers concurrent image and text encode requests for a few milliseconds
+(or until CLIP_BATCH_MAX_SIZE) and runs them as one batched forward pass,
+instead of many batch-1 forwards contending for the same CPU cores
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+from PIL import Image
+
+from app.core.config import settings
+from app.core.exceptions import CLIPModelError
+from app.services.clip_service import CLIPService, clip_service
+from app.services.embedding_cache import embedding_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _EncodeRequest:
+    kind: str  # "image" (payload: prepared views) or "text" (payload: str)
+    payload: Any
+    size: int  # Rows this request adds to the forward batch
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class CLIPBatchScheduler:
+    """
+    Single inference thread in front of CLIPService
+
+    Callers get their own Future per request. Image preprocessing (decode,
+    enhance, TTA crops) runs on the caller's thread; only the forward pass
+    is batched. A batch closes when max_wait_ms has passed since its first
+    request arrived or when it holds max_batch_size rows (TTA crops count
+    individually). The queue is bounded: once it holds max_queue_size
+    requests, new ones fail fast with CLIPModelError.
+    """
+
+    def __init__(
+        self,
+        service: CLIPService,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        max_queue_size: Optional[int] = None,
+    ):
+        self.service = service
+        self.max_batch_size = max(1, max_batch_size or settings.CLIP_BATCH_MAX_SIZE)
+        self.max_wait_ms = (
+            settings.CLIP_BATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms
+        )
+        self.max_queue_size = max_queue_size or settings.CLIP_BATCH_QUEUE_SIZE
+
+        self._queue: "queue.Queue[Optional[_EncodeRequest]]" = queue.Queue(
+            maxsize=self.max_queue_size
+        )
+        self._carry: Optional[_EncodeRequest] = None
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._rows = 0
+        self._largest_batch = 0
+        self._rejected = 0
+        self._queue_wait_total = 0.0
+        self._batch_time_total = 0.0
+
+    # Lifecycle
+    def start(self):
+        """Start the inference thread (idempotent; submit() calls this)"""
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="clip-batcher", daemon=True
+                )
+                self._thread.start()
+                logger.info(
+                    f"CLIP batcher started (max batch {self.max_batch_size}, "
+                    f"max wait {self.max_wait_ms}ms)"
+                )
+
+    def start_warm_up(self):
+        """Load and warm the model on a background thread"""
+        self.service.start_warm_up()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the inference thread
+
+        The batch already running finishes; requests still queued fail with
+        CLIPModelError instead of waiting on a thread that is gone.
+        """
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        self._fail_queued()
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+        self._fail_queued()
+        if thread is None or not thread.is_alive():
+            carry, self._carry = self._carry, None
+            if carry is not None:
+                self._fail(carry)
+
+    def _fail_queued(self):
+        """Fail every request still waiting in the queue"""
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if request is not None:
+                self._fail(request)
+
+    @staticmethod
+    def _fail(request: _EncodeRequest):
+        if request.future.set_running_or_notify_cancel():
+            request.future.set_exception(
+                CLIPModelError(
+                    message="CLIP batcher stopped", details={"kind": request.kind}
+                )
+            )
+
+    # Submission
+    def submit_image(
+        self, image: Union[Image.Image, bytes], use_tta: bool = True
+    ) -> Future:
+        """
+        Queue an image (preprocessed on this thread); resolves to its embedding
+
+        Embedding cache hits resolve immediately without touching the queue.
+        """
+        key = self.service.embedding_cache_key(image, use_tta)
+        cached = embedding_cache.get(key) if key else None
+        if cached is not None:
+            future: Future = Future()
+            future.set_result(cached)
+            return future
+
+        views = self.service.prepare_views(image, use_tta)
+        future = self._submit(_EncodeRequest("image", views, len(views)))
+        if key:
+            def remember(done: Future):
+                if not done.cancelled() and done.exception() is None:
+                    embedding_cache.set(key, done.result())
+
+            future.add_done_callback(remember)
+        return future
+
+    def submit_text(self, text: str) -> Future:
+        """Queue a text; resolves to its embedding"""
+        return self._submit(_EncodeRequest("text", text, 1))
+
+    async def encode_image(
+        self, image: Union[Image.Image, bytes], use_tta: bool = True
+    ) -> List[float]:
+        """Async encode_image: preprocess off the event loop, then await the batch"""
+        future = await asyncio.to_thread(self.submit_image, image, use_tta)
+        return await asyncio.wrap_future(future)
+
+    async def encode_text(self, text: str) -> List[float]:
+        """Async encode_text through the batch queue"""
+        return await asyncio.wrap_future(self.submit_text(text))
+
+    def _submit(self, request: _EncodeRequest) -> Future:
+        self.start()
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
+            raise CLIPModelError(
+                message="CLIP inference queue is full",
+                details={"queue_size": self.max_queue_size},
+            )
+        return request.future
+
+    # Inference thread
+    def _run(self):
+        while True:
+            first = self._carry or self._queue.get()
+            self._carry = None
+            if first is None:
+                return
+
+            batch, stopping = self._gather(first)
+            self._execute(batch)
+            if stopping:
+                return
+
+    def _gather(self, first: _EncodeRequest):
+        """Collect requests until the wait deadline or the row budget is reached"""
+        batch = [first]
+        rows = first.size
+        deadline = first.enqueued_at + self.max_wait_ms / 1000
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    request = self._queue.get(timeout=remaining)
+                else:
+                    request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            if rows + request.size > self.max_batch_size:
+                self._carry = request
+                break
+            batch.append(request)
+            rows += request.size
+        return batch, False
+
+    def _execute(self, batch: List[_EncodeRequest]):
+        # Drop requests whose callers gave up (e.g. client disconnected)
+        batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started = time.monotonic()
+        images = [r for r in batch if r.kind == "image"]
+        texts = [r for r in batch if r.kind == "text"]
+        if images:
+            self._resolve(
+                images, lambda: self.service.encode_prepared([r.payload for r in images])
+            )
+        if texts:
+            self._resolve(
+                texts, lambda: self.service.encode_texts([r.payload for r in texts])
+            )
+        finished = time.monotonic()
+
+        rows = sum(r.size for r in batch)
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._rows += rows
+            self._largest_batch = max(self._largest_batch, rows)
+            self._queue_wait_total += sum(started - r.enqueued_at for r in batch)
+            self._batch_time_total += finished - started
+        logger.debug(
+            f"CLIP batch: {len(batch)} requests, {rows} rows in "
+            f"{(finished - started) * 1000:.0f}ms"
+        )
+
+    @staticmethod
+    def _resolve(requests: List[_EncodeRequest], encode):
+        try:
+            embeddings = encode()
+        except Exception as e:
+            logger.error(f"CLIP batch failed ({len(requests)} requests): {e}")
+            for request in requests:
+                request.future.set_exception(e)
+            return
+        for request, embedding in zip(requests, embeddings):
+            request.future.set_result(embedding)
+
+    def model_status(self) -> Dict[str, Any]:
+        return {**self.service.status(), "backend": "thread"}
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and batch-size metrics for health reporting"""
+        with self._stats_lock:
+            batches = self._batches
+            requests = self._requests
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "backend": "thread",
+                "queue_depth": self._queue.qsize(),
+                "max_queue_size": self.max_queue_size,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "batches": batches,
+                "requests": requests,
+                "rejected": self._rejected,
+                "avg_batch_requests": round(requests / batches, 2) if batches else 0.0,
+                "avg_batch_rows": round(self._rows / batches, 2) if batches else 0.0,
+                "largest_batch_rows": self._largest_batch,
+                "avg_queue_wait_ms": (
+                    round(self._queue_wait_total / requests * 1000, 2)
+                    if requests
+                    else 0.0
+                ),
+                "avg_batch_ms": (
+                    round(self._batch_time_total / batches * 1000, 2) if batches else 0.0
+                ),
+            }
+
+
+# Singleton instance (CLIP_INFERENCE_BACKEND picks this thread or worker processes)
+if settings.CLIP_INFERENCE_BACKEND.lower() == "process":
+    from app.services.clip_worker import CLIPWorkerPool
+
+    clip_scheduler = CLIPWorkerPool(clip_service)
+else:
+    clip_scheduler = CLIPBatchScheduler(clip_service)
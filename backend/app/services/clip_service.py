@@ -1,20 +1,115 @@
-from transformers import CLIPProcessor, CLIPModel
 from PIL import Image, ImageEnhance, ImageFilter
-import torch
-from typing import List, Union
+import threading
+import time
+from typing import TYPE_CHECKING, List, Optional, Union
 import io
 import numpy as np
 from app.core.config import settings
 from app.core.exceptions import CLIPModelError
+from app.services.embedding_cache import embedding_cache, settings_fingerprint
 import logging
 
+# torch/transformers take seconds to import; they are imported on first
+# model load so API workers that never encode start fast
+if TYPE_CHECKING:
+    import torch
+
 logger = logging.getLogger(__name__)
 
+# Inference precision modes (CLIP_PRECISION)
+PRECISIONS = ("fp32", "bf16", "int8")
+# What load_model() loads (CLIP_LOAD_MODE)
+LOAD_MODES = ("full", "vision")
+# Bump whenever prepare_views() output changes, to invalidate cached embeddings
+PREPROCESSING_VERSION = 2
+# Model lifecycle states reported by status()
+STATES = ("not_loaded", "loading", "warming", "ready", "failed")
+
 class CLIPService:
-    def __init__(self):
+    """
+    CLIP image/text encoder
+    
+    CLIP_LOAD_MODE=full loads the whole CLIPModel up front. "vision" loads
+    only the vision tower + projection; the text tower and tokenizer are
+    loaded on the first encode_text(s) call. Both give identical embeddings.
+    
+    Loading is guarded by a lock, so concurrent first requests and the
+    startup warm-up thread share a single load.
+    """
+    
+    def __init__(self, precision: Optional[str] = None, load_mode: Optional[str] = None):
         self.model = None
         self.processor = None
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.text_model = None
+        self.tokenizer = None
+        self._text_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._warming = False
+        self._image_processor = None
+        self.state = "not_loaded"
+        self.load_error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.load_mode = (load_mode or settings.CLIP_LOAD_MODE).lower()
+        if self.load_mode not in LOAD_MODES:
+            raise CLIPModelError(
+                message=f"Unknown CLIP load mode: {self.load_mode}",
+                details={"supported": list(LOAD_MODES)}
+            )
+        self._device: Optional[str] = None
+        self.precision = (precision or settings.CLIP_PRECISION).lower()
+        if self.precision not in PRECISIONS:
+            raise CLIPModelError(
+                message=f"Unknown CLIP precision: {self.precision}",
+                details={"supported": list(PRECISIONS)}
+            )
+        self._dtype = None  # torch dtype, set by _apply_precision()
+    
+    @staticmethod
+    def _downscale(image: Image.Image) -> Image.Image:
+        """
+        Shrink an image to the working resolution (shortest side
+        CLIP_PREPROCESS_SIZE) before any per-pixel work.
+        
+        Every crop is resized to 224px by the CLIP processor anyway, so
+        denoising and enhancing a 4096px upload only burns CPU. JPEGs are
+        decoded directly at reduced scale via draft() when still unloaded.
+        """
+        target = settings.CLIP_PREPROCESS_SIZE
+        if target <= 0 or min(image.size) <= target:
+            return image
+        
+        try:
+            image.draft("RGB", (target, target))  # DCT scaling; keeps both sides >= target
+        except Exception:
+            pass
+        
+        width, height = image.size
+        scale = target / min(width, height)
+        if scale >= 1:
+            return image
+        new_size = (max(target, round(width * scale)), max(target, round(height * scale)))
+        return image.resize(new_size, Image.Resampling.BICUBIC, reducing_gap=2.0)
+    
+    @staticmethod
+    def _percentiles(image: Image.Image, low: float, high: float):
+        """
+        np.percentile(np.array(image), (low, high)) from the 256-bin
+        histogram instead of sorting every pixel (same linear interpolation)
+        """
+        counts = np.array(image.histogram(), dtype=np.int64).reshape(-1, 256).sum(axis=0)
+        cdf = np.cumsum(counts)
+        total = int(cdf[-1])
+        
+        values = []
+        for q in (low, high):
+            rank = (total - 1) * q / 100.0
+            lower = int(np.floor(rank))
+            below = np.searchsorted(cdf, lower, side="right")
+            above = np.searchsorted(cdf, min(lower + 1, total - 1), side="right")
+            values.append(float(below + (rank - lower) * (above - below)))
+        return values
     
     def _advanced_preprocessing(self, image: Image.Image) -> Image.Image:
         """
@@ -23,6 +118,8 @@ class CLIPService:
         2. Enhance sharpness (make edges clearer)
         3. Auto contrast (normalize brightness/contrast)
         4. Color enhancement (make plant colors more vivid)
+        
+        Expects an RGB image already at working resolution (see _downscale).
         """
         try:
             # Step 1: Denoise - reduce noise from camera sensor
@@ -33,16 +130,14 @@ class CLIPService:
             image = enhancer.enhance(1.3)  # 30% sharper
             
             # Step 3: Auto contrast - normalize brightness
-            # Convert to numpy for percentile calculation
-            img_array = np.array(image)
+            # 2nd and 98th percentile (all channels) for robust normalization
+            p2, p98 = self._percentiles(image, 2, 98)
             
-            # Calculate 2nd and 98th percentile for robust normalization
-            p2, p98 = np.percentile(img_array, (2, 98))
-            
-            # Normalize to full range if needed
+            # Normalize to full range if needed, as a 256-entry lookup table
             if p98 - p2 > 0:
-                img_array = np.clip((img_array - p2) * 255.0 / (p98 - p2), 0, 255).astype(np.uint8)
-                image = Image.fromarray(img_array)
+                levels = np.arange(256, dtype=np.float64)
+                lut = np.clip((levels - p2) * 255.0 / (p98 - p2), 0, 255).astype(np.uint8)
+                image = image.point(lut.tolist() * len(image.getbands()))
             
             # Step 4: Enhance color - make plant colors more distinguishable
             enhancer = ImageEnhance.Color(image)
@@ -87,21 +182,334 @@ class CLIPService:
         return crops
         
     def load_model(self):
+        """Load the model once per process (no-op if already loaded)"""
+        with self._load_lock:
+            if self.model is not None:
+                return True
+            self.state = "loading"
+            self.load_error = None
+            started = time.perf_counter()
+            try:
+                logger.info(f"Loading CLIP model ({self.load_mode})...")
+                from transformers import (
+                    CLIPImageProcessor,
+                    CLIPModel,
+                    CLIPProcessor,
+                    CLIPVisionModelWithProjection,
+                )
+                
+                if self.load_mode == "vision":
+                    model = CLIPVisionModelWithProjection.from_pretrained(settings.CLIP_MODEL_NAME)
+                    self.processor = CLIPImageProcessor.from_pretrained(settings.CLIP_MODEL_NAME)
+                else:
+                    model = CLIPModel.from_pretrained(settings.CLIP_MODEL_NAME)
+                    self.processor = CLIPProcessor.from_pretrained(settings.CLIP_MODEL_NAME)
+                self.model = self._apply_precision(model)
+                self.load_seconds = round(time.perf_counter() - started, 2)
+                self.state = "warming" if self._warming else "ready"
+                logger.info(
+                    f"CLIP model loaded successfully on {self.device} ({self.precision}) "
+                    f"in {self.load_seconds}s"
+                )
+                return True
+            except Exception as e:
+                self.state = "failed"
+                self.load_error = str(e)
+                logger.error(f"CLIP model loading failed: {e}", exc_info=True)
+                raise CLIPModelError(
+                    message="Failed to load CLIP model",
+                    details={"error": str(e), "model": settings.CLIP_MODEL_NAME}
+                )
+    
+    def _load_text_model(self):
+        """Load the text tower + projection and tokenizer (vision load mode only)"""
         try:
-            logger.info("Loading CLIP model...")
-            self.model = CLIPModel.from_pretrained(settings.CLIP_MODEL_NAME)
-            self.processor = CLIPProcessor.from_pretrained(settings.CLIP_MODEL_NAME)
-            self.model.to(self.device)
-            self.model.eval()
-            logger.info(f"CLIP model loaded successfully on {self.device}")
-            return True
+            logger.info("Loading CLIP text tower...")
+            from transformers import CLIPTextModelWithProjection, CLIPTokenizer
+            
+            model = CLIPTextModelWithProjection.from_pretrained(settings.CLIP_MODEL_NAME)
+            self.tokenizer = CLIPTokenizer.from_pretrained(settings.CLIP_MODEL_NAME)
+            self.text_model = self._apply_precision(model)
+            logger.info("CLIP text tower loaded")
         except Exception as e:
-            logger.error(f"CLIP model loading failed: {e}", exc_info=True)
+            logger.error(f"CLIP text tower loading failed: {e}", exc_info=True)
             raise CLIPModelError(
-                message="Failed to load CLIP model",
+                message="Failed to load CLIP text model",
                 details={"error": str(e), "model": settings.CLIP_MODEL_NAME}
             )
     
+    def _ensure_text_model(self):
+        if self.load_mode != "vision":
+            self._ensure_model()
+            return
+        if self.text_model is None:
+            with self._text_lock:
+                if self.text_model is None:
+                    self._load_text_model()
+    
+    @property
+    def device(self) -> str:
+        """cuda or cpu (resolving it imports torch)"""
+        if self._device is None:
+            import torch
+            
+            self._device = "cuda" if torch.cuda.is_available() else "cpu"
+        return self._device
+    
+    def _image_features(self, inputs: dict) -> "torch.Tensor":
+        if self.load_mode == "full":
+            return self.model.get_image_features(**inputs)
+        return self.model(**inputs).image_embeds
+    
+    def _text_features(self, inputs: dict) -> "torch.Tensor":
+        if self.load_mode == "vision":
+            return self.text_model(**inputs).text_embeds
+        return self.model.get_text_features(**inputs)
+    
+    def _tokenize(self, texts: List[str]) -> dict:
+        if self.load_mode == "vision":
+            return self.tokenizer(texts, return_tensors="pt", padding=True)
+        return self.processor(text=texts, return_tensors="pt", padding=True)
+    
+    def _apply_precision(self, model: "torch.nn.Module") -> "torch.nn.Module":
+        """
+        Move the model to the device in the configured precision:
+        - fp32: unchanged weights
+        - bf16: bfloat16 weights and activations (fast on CPUs with AVX512-BF16/AMX)
+        - int8: dynamic int8 quantization of every nn.Linear (CPU only;
+          activations are quantized on the fly, conv stem stays fp32)
+        """
+        import torch
+        
+        model.eval()
+        self._dtype = torch.float32
+        if self.precision == "int8":
+            if self.device != "cpu":
+                logger.warning("int8 dynamic quantization is CPU-only, using fp32 on GPU")
+                self.precision = "fp32"
+            else:
+                return torch.ao.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+        
+        if self.precision == "bf16":
+            self._dtype = torch.bfloat16
+        return model.to(self.device, dtype=self._dtype)
+    
+    def _to_device(self, inputs) -> dict:
+        """Processor outputs on the model device; pixel values in the model dtype"""
+        return {
+            k: v.to(self.device, dtype=self._dtype) if v.is_floating_point() else v.to(self.device)
+            for k, v in inputs.items()
+        }
+    
+    def prepare_views(self, image: Union[Image.Image, bytes], use_tta: bool) -> List[Image.Image]:
+        """
+        Decode and preprocess an image into the views to encode:
+        five TTA crops for larger images, otherwise the image itself
+        
+        Runs on the caller's thread, so preprocessing of concurrent requests
+        happens in parallel ahead of the batched forward pass.
+        """
+        # Convert bytes to PIL Image
+        if isinstance(image, bytes):
+            image = Image.open(io.BytesIO(image))
+        
+        # TTA only for larger images (decided on the upload's own size)
+        use_tta = use_tta and min(image.size) > 300
+        
+        # Work at the resolution the crops actually need
+        image = self._downscale(image)
+        
+        # Convert to RGB
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        
+        # Apply advanced preprocessing
+        logger.info(" Applying advanced preprocessing...")
+        image = self._advanced_preprocessing(image)
+        
+        # Test-Time Augmentation with multi-crop
+        if use_tta:
+            logger.info(" Using multi-crop TTA for better accuracy...")
+            return self._multi_crop_augmentation(image)
+        return [image]
+    
+    def pixel_values(self, views: List[Image.Image]) -> np.ndarray:
+        """
+        CLIP-normalized float32 pixels (views x 3 x H x W)
+        
+        Needs only the image processor (no torch), so a web process can
+        prepare tensors for an inference process that holds the model.
+        """
+        processor = self.processor
+        if processor is None:
+            if self._image_processor is None:
+                from transformers import CLIPImageProcessor
+                
+                self._image_processor = CLIPImageProcessor.from_pretrained(settings.CLIP_MODEL_NAME)
+            processor = self._image_processor
+        return processor(images=views, return_tensors="np")["pixel_values"]
+    
+    def _encode_views(self, views: List[Image.Image]) -> "torch.Tensor":
+        """
+        Encode all views in a single batched forward pass
+        
+        Returns:
+            L2-normalized features, one row per view
+        """
+        import torch
+        
+        inputs = self._to_device(self.processor(images=views, return_tensors="pt"))
+        
+        with torch.no_grad():
+            features = self._image_features(inputs).float()
+        return features / features.norm(dim=-1, keepdim=True)
+    
+    @staticmethod
+    def _pool_views(features: "torch.Tensor") -> "torch.Tensor":
+        """Average per-view embeddings (ensemble) and re-normalize"""
+        pooled = features.mean(dim=0, keepdim=True)
+        return pooled / pooled.norm(dim=-1, keepdim=True)
+    
+    def _pool_groups(self, features: "torch.Tensor", group_sizes: List[int]) -> List[List[float]]:
+        """One pooled embedding per image from consecutive rows of view features"""
+        embeddings = []
+        start = 0
+        for size in group_sizes:
+            pooled = self._pool_views(features[start:start + size])
+            embeddings.append(pooled.cpu().numpy().flatten().tolist())
+            start += size
+        return embeddings
+    
+    def _ensure_model(self):
+        if self.model is None:
+            logger.info("CLIP model not loaded, loading now...")
+            self.load_model()
+    
+    def warm_up(self):
+        """
+        Load the model and run one dummy forward pass, so the first real
+        request doesn't pay for lazy allocations and kernel selection
+        """
+        self._warming = True
+        try:
+            self._ensure_model()
+            self.state = "warming"
+            started = time.perf_counter()
+            self.encode_prepared([[Image.new("RGB", (224, 224), (128, 128, 128))]])
+            if self.load_mode == "full":
+                self.encode_texts(["a photo of a plant"])
+            self.warmup_seconds = round(time.perf_counter() - started, 2)
+            self.state = "ready"
+            logger.info(f"✅ CLIP warm-up complete ({self.warmup_seconds}s forward)")
+        except Exception as e:
+            self.state = "failed"
+            self.load_error = str(e)
+            logger.error(f"CLIP warm-up failed: {e}")
+        finally:
+            self._warming = False
+    
+    def start_warm_up(self) -> threading.Thread:
+        """Run warm_up() on a background thread (at most one per process)"""
+        with self._load_lock:
+            if self._warmup_thread is None:
+                self._warmup_thread = threading.Thread(
+                    target=self.warm_up, name="clip-warmup", daemon=True
+                )
+                self._warmup_thread.start()
+            return self._warmup_thread
+    
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "ready"
+    
+    def status(self) -> dict:
+        """Readiness details for health reporting"""
+        return {
+            "status": self.state,
+            "ready": self.is_ready,
+            "device": self._device,  # None until the model loads
+            "precision": self.precision,
+            "load_mode": self.load_mode,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.load_error,
+        }
+    
+    def encode_prepared(self, view_groups: List[List[Image.Image]]) -> List[List[float]]:
+        """
+        Encode the views of several images in one forward pass
+        
+        Args:
+            view_groups: prepare_views() output for each image
+        
+        Returns:
+            One pooled, normalized embedding per image
+        """
+        self._ensure_model()
+        features = self._encode_views([view for views in view_groups for view in views])
+        return self._pool_groups(features, [len(views) for views in view_groups])
+    
+    def encode_pixel_values(self, pixel_values: np.ndarray, group_sizes: List[int]) -> List[List[float]]:
+        """
+        encode_prepared() for pixel_values() output: rows are the views of
+        consecutive images, group_sizes[i] of them for image i
+        """
+        import torch
+        
+        self._ensure_model()
+        inputs = self._to_device({"pixel_values": torch.from_numpy(pixel_values)})
+        with torch.no_grad():
+            features = self._image_features(inputs).float()
+        features = features / features.norm(dim=-1, keepdim=True)
+        return self._pool_groups(features, group_sizes)
+    
+    def embedding_cache_key(self, image: Union[Image.Image, bytes], use_tta: bool) -> Optional[str]:
+        """
+        Embedding cache key: image SHA-256 plus every setting that shapes
+        the embedding (None when the cache is off or image isn't bytes)
+        """
+        if not embedding_cache.enabled:
+            return None
+        return embedding_cache.key(
+            image,
+            settings_fingerprint({
+                "model": settings.CLIP_MODEL_NAME,
+                "precision": self.precision,
+                "preprocessing": PREPROCESSING_VERSION,
+                "preprocess_size": settings.CLIP_PREPROCESS_SIZE,
+                "tta": use_tta,
+            }),
+        )
+    
+    def encode_images(self, images: List[Union[Image.Image, bytes]], use_tta: bool = True) -> List[List[float]]:
+        """
+        Batched encode_image: one forward pass for all uncached images and
+        their crops
+        """
+        try:
+            keys = [self.embedding_cache_key(image, use_tta) for image in images]
+            embeddings = [embedding_cache.get(key) if key else None for key in keys]
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            if missing:
+                encoded = self.encode_prepared(
+                    [self.prepare_views(images[i], use_tta) for i in missing]
+                )
+                for i, embedding in zip(missing, encoded):
+                    embeddings[i] = embedding
+                    if keys[i]:
+                        embedding_cache.set(keys[i], embedding)
+            return embeddings
+        except CLIPModelError:
+            raise
+        except Exception as e:
+            logger.error(f"Batch image encoding failed: {e}", exc_info=True)
+            raise CLIPModelError(
+                message="Failed to encode images with CLIP",
+                details={"error": str(e), "batch_size": len(images)}
+            )
+    
     def encode_image(self, image: Union[Image.Image, bytes], use_tta: bool = True) -> List[float]:
         """
         Extract normalized image embedding using CLIP with advanced preprocessing.
@@ -110,7 +518,7 @@ class CLIPService:
         1. Image -> RGB conversion
         2. Advanced preprocessing (denoise, sharpen, contrast, color)
         3. Multi-crop augmentation (optional, enabled by default)
-        4. CLIP preprocessing -> Model inference
+        4. CLIP preprocessing -> one batched forward pass over all crops
         5. Ensemble averaging + L2 normalization
         
         Args:
@@ -121,54 +529,21 @@ class CLIPService:
             Normalized embedding vector
         """
         try:
-            if self.model is None:
-                logger.info("CLIP model not loaded, loading now...")
-                self.load_model()
-            
-            # Convert bytes to PIL Image
-            if isinstance(image, bytes):
-                image = Image.open(io.BytesIO(image))
+            key = self.embedding_cache_key(image, use_tta)
+            if key:
+                cached = embedding_cache.get(key)
+                if cached is not None:
+                    logger.info(" Embedding cache hit")
+                    return cached
             
-            # Convert to RGB
-            if image.mode != "RGB":
-                image = image.convert("RGB")
+            views = self.prepare_views(image, use_tta)
+            embedding = self.encode_prepared([views])[0]
+            if len(views) > 1:
+                logger.info(f" TTA complete: averaged {len(views)} crops")
             
-            # Apply advanced preprocessing
-            logger.info(" Applying advanced preprocessing...")
-            image = self._advanced_preprocessing(image)
-            
-            # Test-Time Augmentation with multi-crop
-            if use_tta and min(image.size) > 300:  # Only for larger images
-                logger.info(" Using multi-crop TTA for better accuracy...")
-                crops = self._multi_crop_augmentation(image)
-                
-                # Extract embeddings for all crops
-                all_embeddings = []
-                for idx, crop in enumerate(crops):
-                    inputs = self.processor(images=crop, return_tensors="pt")
-                    inputs = {k: v.to(self.device) for k, v in inputs.items()}
-                    
-                    with torch.no_grad():
-                        features = self.model.get_image_features(**inputs)
-                        features = features / features.norm(dim=-1, keepdim=True)
-                        all_embeddings.append(features)
-                
-                # Average all embeddings (ensemble)
-                final_features = torch.stack(all_embeddings).mean(dim=0)
-                # Re-normalize after averaging
-                final_features = final_features / final_features.norm(dim=-1, keepdim=True)
-                
-                logger.info(f" TTA complete: averaged {len(crops)} crops")
-            else:
-                # Standard single-crop encoding
-                inputs = self.processor(images=image, return_tensors="pt")
-                inputs = {k: v.to(self.device) for k, v in inputs.items()}
-                
-                with torch.no_grad():
-                    final_features = self.model.get_image_features(**inputs)
-                    final_features = final_features / final_features.norm(dim=-1, keepdim=True)
-            
-            return final_features.cpu().numpy().flatten().tolist()
+            if key:
+                embedding_cache.set(key, embedding)
+            return embedding
             
         except CLIPModelError:
             raise
@@ -179,26 +554,37 @@ class CLIPService:
                 details={"error": str(e)}
             )
     
-    def encode_text(self, text: str) -> List[float]:
-        """
-        Extract normalized text embedding using CLIP.
-        Used for semantic search: text query -> find similar plant images
-        """
+    def encode_texts(self, texts: List[str]) -> List[List[float]]:
+        """Normalized text embeddings for several texts in one forward pass"""
         try:
-            if self.model is None:
-                if not self.load_model():
-                    raise Exception("Failed to load CLIP model")
+            import torch
             
-            inputs = self.processor(text=[text], return_tensors="pt", padding=True)
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            self._ensure_text_model()
+            inputs = self._to_device(self._tokenize(texts))
             
             with torch.no_grad():
-                features = self.model.get_text_features(**inputs)
+                features = self._text_features(inputs).float()
                 features = features / features.norm(dim=-1, keepdim=True)
             
-            return features.cpu().numpy().flatten().tolist()
+            return features.cpu().numpy().tolist()
+        except CLIPModelError:
+            raise
+        except Exception as e:
+            logger.error(f"Text encoding failed: {e}", exc_info=True)
+            raise CLIPModelError(
+                message="Failed to encode text with CLIP",
+                details={"error": str(e), "batch_size": len(texts)}
+            )
+    
+    def encode_text(self, text: str) -> List[float]:
+        """
+        Extract normalized text embedding using CLIP.
+        Used for semantic search: text query -> find similar plant images
+        """
+        try:
+            return self.encode_texts([text])[0]
         except Exception as e:
-            print(f"Text encode error: {e}")
+            logger.error(f"Text encoding failed: {e}")
             return None
 
 clip_service = CLIPService()
@@ -0,0 +1,396 @@
+"""
+CLIP Inference Worker Processes (CLIP_INFERENCE_BACKEND=process)
+The model lives in CLIP_WORKER_PROCESSES separate processes, so forward
+passes never hold the web process's GIL or stall its event loop, and
+inference concurrency is set independently of HTTP concurrency
+
+Web process:  decode + preprocess + CLIP normalization (PIL/NumPy, no torch)
+              -> float32 pixel tensor in a SharedMemory block
+              -> (request id, block name, shape) on a bounded request queue
+Worker:       attaches the block, batches whatever is already queued
+              (up to CLIP_BATCH_MAX_SIZE rows), encodes, replies with
+              embeddings on the response queue
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import settings
+from app.core.exceptions import CLIPModelError
+from app.services.clip_service import CLIPService
+from app.services.embedding_cache import embedding_cache
+
+logger = logging.getLogger(__name__)
+
+_STOP_LISTENER = "stop"
+
+
+def _attach_pixels(name: str, shape) -> np.ndarray:
+    """Copy a pixel tensor out of a web-process SharedMemory block"""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray(shape, dtype=np.float32, buffer=block.buf).copy()
+    finally:
+        block.close()
+
+
+def _release(block: Optional[shared_memory.SharedMemory]):
+    """Close and unlink a web-process pixel block (None-safe, idempotent)"""
+    if block is None:
+        return
+    block.close()
+    try:
+        block.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _reply(jobs: list, responses, encode):
+    """Run encode() for jobs and send one reply per job, even on failure"""
+    try:
+        embeddings = encode()
+    except Exception as e:
+        for job in jobs:
+            responses.put((job[0], "error", str(e)))
+        return
+    for job, embedding in zip(jobs, embeddings):
+        responses.put((job[0], "ok", embedding))
+
+
+def _encode_jobs(service: CLIPService, jobs: list, responses):
+    """Encode one gathered batch: all images in one forward pass, then all texts"""
+    images, pixels = [], []
+    for job in jobs:
+        if job[1] != "image":
+            continue
+        # Per job, so one missing block only fails its own request
+        try:
+            pixels.append(_attach_pixels(*job[2]))
+        except Exception as e:
+            responses.put((job[0], "error", f"pixel block unavailable: {e}"))
+            continue
+        images.append(job)
+    texts = [job for job in jobs if job[1] == "text"]
+    if images:
+        _reply(images, responses, lambda: service.encode_pixel_values(
+            np.concatenate(pixels), [job[3] for job in images]
+        ))
+    if texts:
+        _reply(texts, responses, lambda: service.encode_texts([job[2] for job in texts]))
+
+
+def _worker_main(worker_id: int, requests, responses, threads: int, max_batch_rows: int):
+    """Inference process: load + warm the model, then serve the request queue"""
+    # Ctrl+C reaches the whole process group; the web process stops us
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(
+        level=logging.INFO, format=f"[clip-worker-{worker_id}] %(levelname)s %(message)s"
+    )
+    import torch
+
+    torch.set_num_threads(threads)
+    service = CLIPService()
+    service.warm_up()
+    responses.put((None, "state", {
+        "worker": worker_id,
+        "pid": os.getpid(),
+        "status": service.state,
+        "error": service.load_error,
+    }))
+
+    while True:
+        job = requests.get()
+        if job is None:
+            return
+        jobs, rows, stopping = [job], job[3], False
+        # Batch whatever else is already waiting - never wait for more
+        while rows < max_batch_rows:
+            try:
+                job = requests.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                stopping = True
+                break
+            jobs.append(job)
+            rows += job[3]
+        _encode_jobs(service, jobs, responses)
+        if stopping:
+            return
+
+
+class CLIPWorkerPool:
+    """
+    clip_scheduler replacement backed by inference processes
+
+    Same interface as CLIPBatchScheduler (submit_*/encode_*, start/stop,
+    stats). The request queue is bounded: once it holds max_queue_size
+    requests, new ones fail fast with CLIPModelError. If a worker dies,
+    in-flight requests fail and the worker is restarted.
+    """
+
+    def __init__(
+        self,
+        service: CLIPService,
+        processes: Optional[int] = None,
+        threads: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        max_batch_size: Optional[int] = None,
+    ):
+        self.service = service
+        self.processes = max(1, processes or settings.CLIP_WORKER_PROCESSES)
+        self.threads = threads or settings.CLIP_WORKER_THREADS or max(
+            1, (os.cpu_count() or 1) // self.processes
+        )
+        self.max_queue_size = max_queue_size or settings.CLIP_BATCH_QUEUE_SIZE
+        self.max_batch_size = max(1, max_batch_size or settings.CLIP_BATCH_MAX_SIZE)
+
+        self._context = multiprocessing.get_context("spawn")
+        self._requests = None
+        self._responses = None
+        self._workers: List[Any] = []
+        self._listener: Optional[threading.Thread] = None
+        self._lifecycle_lock = threading.Lock()
+
+        self._ids = itertools.count()
+        # id -> (future, submitted at, pixel block); kept until the worker
+        # replies, even if the future is cancelled, so the block outlives the job
+        self._pending: Dict[int, Tuple[Future, float, Optional[shared_memory.SharedMemory]]] = {}
+        self._pending_lock = threading.Lock()
+        self._worker_states: Dict[int, Dict[str, Any]] = {}
+
+        self._requests_total = 0
+        self._rejected = 0
+        self._restarts = 0
+        self._latency_total = 0.0
+
+    # Lifecycle
+    def start(self):
+        """Spawn the inference processes (idempotent; submit() calls this)"""
+        with self._lifecycle_lock:
+            if self._listener is not None:
+                return
+            self._requests = self._context.Queue(maxsize=self.max_queue_size)
+            self._responses = self._context.Queue()
+            self._workers = [self._spawn(i) for i in range(self.processes)]
+            self._listener = threading.Thread(
+                target=self._listen, name="clip-worker-listener", daemon=True
+            )
+            self._listener.start()
+            logger.info(
+                f"CLIP inference: {self.processes} worker process(es) x "
+                f"{self.threads} threads, queue {self.max_queue_size}"
+            )
+
+    def _spawn(self, worker_id: int):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, self._requests, self._responses, self.threads, self.max_batch_size),
+            name=f"clip-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        self._worker_states[worker_id] = {"worker": worker_id, "pid": process.pid, "status": "loading"}
+        return process
+
+    def start_warm_up(self):
+        """Start the workers now; each loads and warms its model copy"""
+        self.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Let the workers finish queued work, then stop them"""
+        with self._lifecycle_lock:
+            listener, self._listener = self._listener, None
+            workers = list(self._workers)
+        if listener is None:
+            return
+        for _ in workers:
+            try:
+                self._requests.put(None, timeout=timeout)
+            except queue.Full:
+                break
+        for process in workers:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._responses.put((None, _STOP_LISTENER, None))
+        listener.join(timeout)
+        self._fail_pending("CLIP inference workers stopped")
+
+    # Submission
+    def submit_image(
+        self, image: Union[Image.Image, bytes], use_tta: bool = True
+    ) -> Future:
+        """
+        Queue an image (preprocessed on this thread); resolves to its embedding
+
+        Embedding cache hits resolve immediately without touching the queue.
+        """
+        key = self.service.embedding_cache_key(image, use_tta)
+        cached = embedding_cache.get(key) if key else None
+        if cached is not None:
+            future: Future = Future()
+            future.set_result(cached)
+            return future
+
+        pixels = self.service.pixel_values(self.service.prepare_views(image, use_tta))
+        block = shared_memory.SharedMemory(create=True, size=pixels.nbytes)
+        np.ndarray(pixels.shape, dtype=np.float32, buffer=block.buf)[:] = pixels
+
+        def finish(done: Future):
+            if key and not done.cancelled() and done.exception() is None:
+                embedding_cache.set(key, done.result())
+
+        return self._submit("image", (block.name, pixels.shape), len(pixels), finish, block)
+
+    def submit_text(self, text: str) -> Future:
+        """Queue a text; resolves to its embedding"""
+        return self._submit("text", text, 1)
+
+    async def encode_image(
+        self, image: Union[Image.Image, bytes], use_tta: bool = True
+    ) -> List[float]:
+        """Async encode_image: preprocess off the event loop, then await a worker"""
+        future = await asyncio.to_thread(self.submit_image, image, use_tta)
+        return await asyncio.wrap_future(future)
+
+    async def encode_text(self, text: str) -> List[float]:
+        """Async encode_text through a worker"""
+        return await asyncio.wrap_future(self.submit_text(text))
+
+    def _submit(self, kind: str, payload, rows: int, on_done=None, block=None) -> Future:
+        self.start()
+        request_id = next(self._ids)
+        future: Future = Future()
+        if on_done is not None:
+            future.add_done_callback(on_done)
+        with self._pending_lock:
+            self._pending[request_id] = (future, time.monotonic(), block)
+        try:
+            self._requests.put_nowait((request_id, kind, payload, rows))
+        except queue.Full:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+                self._rejected += 1
+            _release(block)
+            error = CLIPModelError(
+                message="CLIP inference queue is full",
+                details={"queue_size": self.max_queue_size},
+            )
+            future.set_exception(error)
+            raise error
+        return future
+
+    # Responses
+    def _listen(self):
+        while True:
+            try:
+                request_id, kind, value = self._responses.get(timeout=1.0)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if kind == _STOP_LISTENER:
+                return
+            if kind == "state":
+                self._worker_states[value["worker"]] = value
+                logger.info(f"CLIP worker {value['worker']} (pid {value['pid']}): {value['status']}")
+                continue
+
+            with self._pending_lock:
+                future, submitted_at, block = self._pending.pop(request_id, (None, 0.0, None))
+                if future is not None:
+                    self._requests_total += 1
+                    self._latency_total += time.monotonic() - submitted_at
+            # The worker is done with the pixels now (it has replied)
+            _release(block)
+            if future is None or future.done():
+                continue
+            if kind == "ok":
+                future.set_result(value)
+            else:
+                future.set_exception(
+                    CLIPModelError(message="CLIP inference failed", details={"error": value})
+                )
+
+    def _check_workers(self):
+        """Restart dead workers; their in-flight requests can't be told apart, so fail all"""
+        with self._lifecycle_lock:
+            if self._listener is None:
+                return
+            for worker_id, process in enumerate(self._workers):
+                if process.is_alive():
+                    continue
+                logger.error(
+                    f"CLIP worker {worker_id} died (exit code {process.exitcode}), restarting"
+                )
+                self._fail_pending(f"CLIP worker {worker_id} died")
+                self._workers[worker_id] = self._spawn(worker_id)
+                self._restarts += 1
+
+    def _fail_pending(self, reason: str):
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future, _, block in pending.values():
+            # A restarted worker may still dequeue these jobs; it replies
+            # with a per-job error for the missing block
+            _release(block)
+            if not future.done():
+                future.set_exception(CLIPModelError(message=reason))
+
+    # Reporting
+    def model_status(self) -> Dict[str, Any]:
+        """Readiness across workers: ready once every worker has warmed up"""
+        states = [self._worker_states.get(i, {"status": "not_loaded"}) for i in range(self.processes)]
+        statuses = {state["status"] for state in states}
+        if statuses == {"ready"}:
+            status = "ready"
+        elif "failed" in statuses:
+            status = "failed"
+        elif statuses == {"not_loaded"}:
+            status = "not_loaded"
+        else:
+            status = "loading"
+        return {
+            "status": status,
+            "ready": status == "ready",
+            "backend": "process",
+            "precision": self.service.precision,
+            "load_mode": self.service.load_mode,
+            "workers": states,
+            "error": next((s.get("error") for s in states if s.get("error")), None),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and throughput metrics for health reporting"""
+        with self._pending_lock:
+            in_flight = len(self._pending)
+            requests = self._requests_total
+            return {
+                "running": self._listener is not None,
+                "backend": "process",
+                "processes": self.processes,
+                "alive": sum(process.is_alive() for process in self._workers),
+                "threads_per_process": self.threads,
+                "in_flight": in_flight,
+                "max_queue_size": self.max_queue_size,
+                "max_batch_size": self.max_batch_size,
+                "requests": requests,
+                "rejected": self._rejected,
+                "restarts": self._restarts,
+                "avg_latency_ms": (
+                    round(self._latency_total / requests * 1000, 2) if requests else 0.0
+                ),
+            }
@@ -0,0 +1,201 @@
+"""
+CLIP Embedding Cache - repeat uploads and re-ingests skip the model
+Keyed by the image's SHA-256 plus a fingerprint of everything that shapes
+the embedding (model, precision, preprocessing version and resolution,
+TTA), so changing any of them invalidates old entries automatically
+
+Tiers: in-process LRU, then EMBEDDING_CACHE_BACKEND:
+    disk  - <EMBEDDING_CACHE_DIR>/<fingerprint>/<sha[:2]>/<sha>.f16, expired
+            by mtime (EMBEDDING_CACHE_TTL) and pruned oldest-first once the
+            directory exceeds EMBEDDING_CACHE_MAX_MB
+    redis - clip:emb:<fingerprint>:<sha> (shared by all workers)
+Both store raw float16 bytes (1 KB for a 512-d embedding), not JSON lists.
+
+Only encoded bytes (uploads, files) are cached: hashing a PIL image would
+mean decoding it at full resolution first, defeating the draft() downscale.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+from PIL import Image
+
+from app.core.cache import LRUCache
+from app.core.config import resolve_data_path, settings
+from app.services.redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("off", "disk", "redis")
+# Disk tier: prune after this many writes (per process)
+PRUNE_EVERY_WRITES = 500
+
+
+def image_digest(image: Union[Image.Image, bytes]) -> Optional[str]:
+    """SHA-256 of the encoded bytes; None for PIL images (not cached)"""
+    if not isinstance(image, bytes):
+        return None
+    return hashlib.sha256(image).hexdigest()
+
+
+def settings_fingerprint(settings_used: Dict[str, Any]) -> str:
+    """Short stable hash of the embedding-relevant settings"""
+    encoded = json.dumps(settings_used, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class EmbeddingCache:
+    """Two-tier (LRU + disk/Redis) store of float16 image embeddings"""
+
+    def __init__(self):
+        self.backend = settings.EMBEDDING_CACHE_BACKEND.lower()
+        if self.backend not in BACKENDS:
+            logger.warning(f"Unknown EMBEDDING_CACHE_BACKEND {self.backend!r} - cache disabled")
+            self.backend = "off"
+        self._lru = LRUCache(
+            maxsize=settings.EMBEDDING_CACHE_MAX_ENTRIES, ttl=settings.EMBEDDING_CACHE_TTL
+        )
+        self._directory = resolve_data_path(settings.EMBEDDING_CACHE_DIR)
+        self._max_bytes = settings.EMBEDDING_CACHE_MAX_MB * 1024 * 1024
+        self._writes = 0
+        self._pruning = threading.Lock()
+        self.store_hits = 0
+        self.store_misses = 0
+        self.pruned = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend != "off"
+
+    def key(self, image: Union[Image.Image, bytes], fingerprint: str) -> Optional[str]:
+        """Cache key, or None if the image can't be cached (PIL input)"""
+        digest = image_digest(image)
+        return f"{fingerprint}:{digest}" if digest else None
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Cached embedding or None"""
+        if not self.enabled:
+            return None
+        embedding = self._lru.get(key)
+        if embedding is not None:
+            return embedding
+
+        payload = self._read(key)
+        if payload is None:
+            self.store_misses += 1
+            return None
+        self.store_hits += 1
+        embedding = np.frombuffer(payload, dtype=np.float16).astype(np.float32).tolist()
+        self._lru.set(key, embedding)
+        return embedding
+
+    def set(self, key: str, embedding: List[float]):
+        if not self.enabled or embedding is None:
+            return
+        self._lru.set(key, embedding)
+        self._write(key, np.asarray(embedding, dtype=np.float16).tobytes())
+
+    # Persistent tier
+    def _path(self, key: str) -> Path:
+        fingerprint, digest = key.split(":", 1)
+        return self._directory / fingerprint / digest[:2] / f"{digest}.f16"
+
+    def _read(self, key: str) -> Optional[bytes]:
+        if self.backend == "redis":
+            return redis_service.get_bytes_sync(f"clip:emb:{key}")
+        path = self._path(key)
+        try:
+            ttl = settings.EMBEDDING_CACHE_TTL
+            if ttl > 0 and time.time() - path.stat().st_mtime > ttl:
+                path.unlink(missing_ok=True)
+                return None
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Embedding cache read failed: {e}")
+            return None
+
+    def _write(self, key: str, payload: bytes):
+        if self.backend == "redis":
+            redis_service.set_bytes_sync(
+                f"clip:emb:{key}", payload, expire=settings.EMBEDDING_CACHE_TTL or 30 * 86400
+            )
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so concurrent workers never read half a file
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+            return
+
+        self._writes += 1
+        if self._writes % PRUNE_EVERY_WRITES == 1 and not self._pruning.locked():
+            threading.Thread(target=self.prune, name="embedding-cache-prune", daemon=True).start()
+
+    def prune(self) -> int:
+        """
+        Disk tier: delete expired files, then the oldest ones until the
+        directory is under 90% of EMBEDDING_CACHE_MAX_MB. Returns files removed.
+        """
+        if self.backend != "disk" or not self._pruning.acquire(blocking=False):
+            return 0
+        try:
+            now = time.time()
+            ttl = settings.EMBEDDING_CACHE_TTL
+            files, total, removed = [], 0, 0
+            for path in self._directory.glob("*/*/*.f16"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if ttl > 0 and now - stat.st_mtime > ttl:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+                else:
+                    files.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+
+            if self._max_bytes > 0 and total > self._max_bytes:
+                files.sort()
+                for _, size, path in files:
+                    if total <= self._max_bytes * 0.9:
+                        break
+                    path.unlink(missing_ok=True)
+                    total -= size
+                    removed += 1
+            if removed:
+                logger.info(f"Embedding cache pruned {removed} files ({total / 1024 / 1024:.0f} MB left)")
+            self.pruned += removed
+            return removed
+        except OSError as e:
+            logger.warning(f"Embedding cache prune failed: {e}")
+            return 0
+        finally:
+            self._pruning.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "memory": self._lru.stats(),
+            "store_hits": self.store_hits,
+            "store_misses": self.store_misses,
+            "pruned": self.pruned,
+        }
+
+
+# Singleton instance
+embedding_cache = EmbeddingCache()
@@ -1,9 +1,11 @@
 """
 Redis service for caching and rate limiting
 """
-from typing import Optional
+from typing import Any, Dict, Optional
+import redis as sync_redis
 import redis.asyncio as redis
 from app.core.config import settings
+from app.core.cache import LRUCache
 import json
 import logging
 
@@ -12,6 +14,8 @@ logger = logging.getLogger(__name__)
 class RedisService:
     def __init__(self):
         self.client: Optional[redis.Redis] = None
+        self._sync_client: Optional[sync_redis.Redis] = None
+        self._sync_binary_client: Optional[sync_redis.Redis] = None
         self._connected = False
     
     async def connect(self):
@@ -37,6 +41,11 @@ class RedisService:
     
     async def disconnect(self):
         """Disconnect from Redis"""
+        for sync_client in (self._sync_client, self._sync_binary_client):
+            if sync_client:
+                sync_client.close()
+        self._sync_client = None
+        self._sync_binary_client = None
         if self.client:
             await self.client.close()
             self._connected = False
@@ -99,6 +108,73 @@ class RedisService:
             logger.error(f"Redis DELETE error: {e}")
             return False
     
+    # Blocking operations for synchronous services (run them off the event loop)
+    def _get_sync_client(self, binary: bool = False) -> Optional[sync_redis.Redis]:
+        """Lazily create a blocking client once the async one is connected"""
+        if not self.is_connected:
+            return None
+        attr = "_sync_binary_client" if binary else "_sync_client"
+        if getattr(self, attr) is None:
+            setattr(
+                self,
+                attr,
+                sync_redis.from_url(
+                    settings.REDIS_URL,
+                    password=settings.REDIS_PASSWORD,
+                    db=settings.REDIS_DB,
+                    decode_responses=not binary,
+                    socket_timeout=1.0,
+                ),
+            )
+        return getattr(self, attr)
+
+    def get_json_sync(self, key: str) -> Optional[Any]:
+        """Blocking JSON GET (None if missing or Redis unavailable)"""
+        client = self._get_sync_client()
+        if client is None:
+            return None
+        try:
+            value = client.get(key)
+            return json.loads(value) if value else None
+        except Exception as e:
+            logger.error(f"Redis sync GET error: {e}")
+            return None
+
+    def set_json_sync(self, key: str, value: Any, expire: int = 3600) -> bool:
+        """Blocking JSON SET with TTL"""
+        client = self._get_sync_client()
+        if client is None:
+            return False
+        try:
+            client.set(key, json.dumps(value), ex=expire)
+            return True
+        except Exception as e:
+            logger.error(f"Redis sync SET error: {e}")
+            return False
+
+    def get_bytes_sync(self, key: str) -> Optional[bytes]:
+        """Blocking raw GET (None if missing or Redis unavailable)"""
+        client = self._get_sync_client(binary=True)
+        if client is None:
+            return None
+        try:
+            return client.get(key)
+        except Exception as e:
+            logger.error(f"Redis sync GET error: {e}")
+            return None
+
+    def set_bytes_sync(self, key: str, value: bytes, expire: int = 3600) -> bool:
+        """Blocking raw SET with TTL"""
+        client = self._get_sync_client(binary=True)
+        if client is None:
+            return False
+        try:
+            client.set(key, value, ex=expire)
+            return True
+        except Exception as e:
+            logger.error(f"Redis sync SET error: {e}")
+            return False
+
     # Rate limiting operations
     async def increment(self, key: str, expire: int = 60) -> int:
         """Increment counter (for rate limiting)"""
@@ -127,3 +203,58 @@ class RedisService:
 
 # Global instance
 redis_service = RedisService()
+
+
+class TieredCache:
+    """
+    Two-tier JSON cache: in-process LRU in front of Redis
+
+    Reads hit the local LRU first, then Redis (backfilling the LRU).
+    Writes go to both tiers. Without Redis it behaves as a plain LRU.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 1024, ttl: int = 3600):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.redis_hits = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get cached value from LRU, falling back to Redis"""
+        full_key = self._key(key)
+        value = self.local.get(full_key)
+        if value is not None:
+            return value
+
+        value = await redis_service.get_json(full_key)
+        if value is not None:
+            self.redis_hits += 1
+            self.local.set(full_key, value)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Store value in both tiers with the cache TTL (or a shorter ttl)"""
+        full_key = self._key(key)
+        ttl = self.ttl if ttl is None else ttl
+        self.local.set(full_key, value, ttl=ttl)
+        await redis_service.set_json(full_key, value, expire=ttl)
+
+    async def delete(self, key: str):
+        """Invalidate key in both tiers"""
+        full_key = self._key(key)
+        self.local.delete(full_key)
+        await redis_service.delete(full_key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.local.stats(), "redis_hits": self.redis_hits}
+
+
+# Merged identification results keyed by pipeline version + sanitized image hash
+pipeline_result_cache = TieredCache(
+    namespace=f"pipeline:{settings.PIPELINE_VERSION}",
+    maxsize=settings.PIPELINE_CACHE_MAX_ENTRIES,
+    ttl=settings.PIPELINE_CACHE_TTL,
+)
@@ -0,0 +1,238 @@
+"""
+USDA Plants Local Index - in-process lookups from plantlst.txt
+Loads the 93K-row USDA checklist into memory for microsecond lookups
+without a network round trip to Weaviate
+"""
+
+import csv
+import logging
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.services.usda_fuzzy_matcher import FuzzyNameMatcher
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^a-z0-9×\s-]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, turn folder-style separators into spaces, drop punctuation"""
+    text = (text or "").lower().replace("_", " ")
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def binomial_key(scientific_name: str) -> str:
+    """Normalized "genus species" key (author and infraspecific parts dropped)"""
+    raw_parts = (scientific_name or "").replace("_", " ").split()
+    # A leading hybrid marker belongs to the genus: "× Sorbaronia jackii"
+    genus_len = 2 if raw_parts[:1] == ["×"] else 1
+    if len(raw_parts) > genus_len and raw_parts[genus_len][:1].isupper():
+        # Genus-level names: "Rosa L." -> "rosa", "× Sorbaronia Sennikov" -> "× sorbaronia"
+        return normalize_text(" ".join(raw_parts[:genus_len]))
+
+    parts = normalize_text(scientific_name).split()
+    if parts[:1] == ["×"] or parts[1:2] == ["×"]:
+        # Hybrid markers ("× Sorbaronia", "Salix × rubens") stay in the key
+        return " ".join(parts[:3])
+    return " ".join(parts[:2])
+
+
+COLUMNS = ("symbol", "synonym_symbol", "scientific_name", "common_name", "family")
+KEY_TABLES = ("binomial", "common", "common_token", "family", "accepted_symbol")
+
+
+class USDALocalIndex:
+    """
+    Compact in-memory index over plantlst.txt
+
+    Rows are stored column-wise (one list per field) and referenced by
+    integer row id from key tables: normalized binomial, normalized
+    common name, common-name words (so partial queries like "rose" still
+    match), normalized family, and accepted symbol. Storage goes through
+    _field/_lookup so USDASnapshotIndex can serve the same queries from
+    a memory-mapped file.
+    """
+
+    def __init__(self):
+        self._columns: Dict[str, List[str]] = {name: [] for name in COLUMNS}
+        self._keys: Dict[str, Dict[str, List[int]]] = {
+            name: {} for name in KEY_TABLES
+        }
+        self._matcher: Optional[FuzzyNameMatcher] = None
+        self._matcher_lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "USDALocalIndex":
+        """Build the index from the USDA CSV (same layout as the import script)"""
+        start = time.perf_counter()
+        with open(file_path, "r", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)  # Skip header
+            index = cls.from_rows(row for row in reader if len(row) >= 5)
+
+        logger.info(
+            f"USDA local index: {len(index)} plants loaded in "
+            f"{(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return index
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, ...]]) -> "USDALocalIndex":
+        """Build the index from (symbol, synonym, scientific, common, family) rows"""
+        index = cls()
+        for row in rows:
+            index._append(*(value.strip() for value in row[:5]))
+        index._finalize()
+        return index
+
+    def _append(
+        self,
+        symbol: str,
+        synonym_symbol: str,
+        scientific_name: str,
+        common_name: str,
+        family: str,
+    ):
+        row_id = len(self)
+        for name, value in zip(
+            COLUMNS, (symbol, synonym_symbol, scientific_name, common_name, family)
+        ):
+            self._columns[name].append(value)
+
+        keys = self._keys
+        if not synonym_symbol:
+            keys["accepted_symbol"].setdefault(symbol, [row_id])
+
+        keys["binomial"].setdefault(binomial_key(scientific_name), []).append(row_id)
+        if common_name:
+            common_key = normalize_text(common_name)
+            keys["common"].setdefault(common_key, []).append(row_id)
+            for token in set(common_key.split()):
+                keys["common_token"].setdefault(token, []).append(row_id)
+        if family:
+            keys["family"].setdefault(normalize_text(family), []).append(row_id)
+
+    def _finalize(self):
+        """Order binomial hits so accepted names come before synonyms"""
+        synonyms = self._columns["synonym_symbol"]
+        for row_ids in self._keys["binomial"].values():
+            row_ids.sort(key=lambda row_id: bool(synonyms[row_id]))
+
+    # Storage primitives (overridden by the memory-mapped snapshot)
+    def _field(self, column: str, row_id: int) -> str:
+        return self._columns[column][row_id]
+
+    def _lookup(self, table: str, key: str) -> Sequence[int]:
+        return self._keys[table].get(key, ())
+
+    def _keys_of(self, table: str) -> Iterable[str]:
+        return self._keys[table].keys()
+
+    def __len__(self) -> int:
+        return len(self._columns["symbol"])
+
+    def get_record(self, row_id: int) -> Dict[str, str]:
+        """
+        Plant dict for a row, in the USDAPlantService shape
+
+        Synonym rows carry no common name or family in plantlst.txt, so
+        those are filled from the accepted row sharing the same symbol.
+        """
+        record = {name: self._field(name, row_id) for name in COLUMNS}
+        if record["synonym_symbol"]:
+            accepted = self._lookup("accepted_symbol", record["symbol"])
+            if accepted:
+                accepted_id = accepted[0]
+                record["common_name"] = record["common_name"] or (
+                    self._field("common_name", accepted_id)
+                )
+                record["family"] = record["family"] or self._field(
+                    "family", accepted_id
+                )
+        return record
+
+    def find_by_scientific_name(self, scientific_name: str) -> Optional[Dict[str, str]]:
+        """Exact binomial match, preferring accepted names over synonyms"""
+        row_ids = self._lookup("binomial", binomial_key(scientific_name))
+        if not row_ids:
+            return None
+        return self.get_record(row_ids[0])
+
+    def find_by_scientific_names(
+        self, scientific_names: List[str]
+    ) -> Dict[str, Optional[Dict[str, str]]]:
+        """Bulk variant of find_by_scientific_name"""
+        return {name: self.find_by_scientific_name(name) for name in scientific_names}
+
+    def build_fuzzy_index(self) -> FuzzyNameMatcher:
+        """
+        The fuzzy matcher, built once on first use (the first fuzzy miss);
+        exact lookups never need it
+        """
+        if self._matcher is None:
+            with self._matcher_lock:
+                if self._matcher is None:
+                    start = time.perf_counter()
+                    self._matcher = self._load_fuzzy_index()
+                    logger.info(
+                        f"USDA fuzzy index ready in "
+                        f"{(time.perf_counter() - start) * 1000:.0f}ms"
+                    )
+        return self._matcher
+
+    def _load_fuzzy_index(self) -> FuzzyNameMatcher:
+        """Build the delete indexes (the snapshot maps stored ones instead)"""
+        return FuzzyNameMatcher.from_keys(
+            self._keys_of("binomial"),
+            lambda candidate: self._lookup("binomial", candidate),
+        )
+
+    def match_scientific_name(
+        self, scientific_name: str
+    ) -> Optional[Tuple[Dict[str, str], float]]:
+        """
+        Exact or fuzzy binomial match with a confidence score (0-1)
+
+        Exact binomials score 1.0 without touching the fuzzy index.
+        """
+        key = binomial_key(scientific_name)
+        row_ids = self._lookup("binomial", key)
+        if row_ids:
+            return self.get_record(row_ids[0]), 1.0
+
+        match = self.build_fuzzy_index().match(key)
+        if match is None:
+            return None
+        matched_key, confidence = match
+        return self.get_record(self._lookup("binomial", matched_key)[0]), confidence
+
+    def find_by_common_name(
+        self, common_name: str, limit: int = 5
+    ) -> List[Dict[str, str]]:
+        """Exact common-name matches first, then rows containing every query word"""
+        query = normalize_text(common_name)
+        if not query:
+            return []
+
+        row_ids = list(self._lookup("common", query)[:limit])
+        if len(row_ids) < limit:
+            token_hits = [self._lookup("common_token", t) for t in query.split()]
+            if all(token_hits):
+                token_hits.sort(key=len)
+                candidates = set(token_hits[0]).intersection(*token_hits[1:])
+                seen = set(row_ids)
+                for row_id in sorted(candidates - seen):
+                    row_ids.append(row_id)
+                    if len(row_ids) >= limit:
+                        break
+
+        return [self.get_record(row_id) for row_id in row_ids]
+
+    def find_by_family(self, family: str, limit: int = 10) -> List[Dict[str, str]]:
+        """Plants in a family (case-insensitive exact family name)"""
+        row_ids = self._lookup("family", normalize_text(family))[:limit]
+        return [self.get_record(row_id) for row_id in row_ids]
+
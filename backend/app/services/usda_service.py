@@ -1,26 +1,110 @@
 """
-USDA Plants Service - Weaviate Cloud Integration
-Queries 93K plants from Weaviate Cloud for validation and enrichment
+USDA Plants Service - Weaviate Cloud or in-process index
+Queries 93K plants for validation and enrichment
 """
 
 import logging
-from typing import Dict, List, Optional, Any
-from app.core.config import settings
+import threading
+from typing import Callable, Dict, List, Optional, Any
+from app.core.cache import LRUCache
+from app.core.config import resolve_data_path, settings
+from app.core.exceptions import WeaviateConnectionError
+from app.services.usda_fuzzy_matcher import name_similarity
+from app.services.usda_local_index import (
+    USDALocalIndex,
+    binomial_key,
+    normalize_text,
+)
+from app.services.redis_service import redis_service
+from app.services.usda_snapshot import USDASnapshotIndex
 
 logger = logging.getLogger(__name__)
 
+# Distinguishes "not cached" from a cached miss (None / [])
+_NOT_CACHED = object()
+
 
 class USDAPlantService:
     """
-    Service for searching USDA Plants Database stored in Weaviate Cloud
+    Service for searching the USDA Plants Database
 
     Data source: plantlst.txt (93,158 plants)
-    Storage: Weaviate Cloud with text2vec vectorization
+    Storage (USDA_BACKEND):
+    - "weaviate": Weaviate Cloud with BM25 keyword search (default)
+    - "local": in-process index, memory-mapped from USDA_SNAPSHOT_FILE when
+      present (scripts/build_usda_snapshot.py), else parsed from USDA_PLANTS_FILE
+
+    Lookups go through a bounded LRU + TTL cache that also remembers misses
+    (for USDA_CACHE_NEGATIVE_TTL), optionally backed by Redis so Weaviate
+    results are shared across workers (USDA_CACHE_SHARED). Backend failures
+    are never cached.
     """
 
     def __init__(self):
         self._weaviate_client = None
         self._class_name = "USDAPlant"
+        self._local_index: Optional[USDALocalIndex] = None
+        self._local_lock = threading.Lock()
+        self._local_failed = False
+        self._cache = LRUCache(
+            maxsize=settings.USDA_CACHE_MAX_ENTRIES, ttl=settings.USDA_CACHE_TTL
+        )
+        self._negative_hits = 0
+        self._shared_hits = 0
+
+    @property
+    def backend(self) -> str:
+        return "local" if settings.USDA_BACKEND.lower() == "local" else "weaviate"
+
+    @property
+    def source(self) -> str:
+        """Human-readable storage description for health reporting"""
+        if self.backend == "local":
+            return "Local plantlst.txt index"
+        return "Weaviate Cloud"
+
+    def _get_local_index(self) -> Optional[USDALocalIndex]:
+        """
+        Load the in-process index once (only when USDA_BACKEND=local)
+
+        Returns None if the file cannot be loaded; callers then fall back
+        to Weaviate.
+        """
+        if self.backend != "local" or self._local_failed:
+            return None
+        if self._local_index is None:
+            with self._local_lock:
+                if self._local_index is None and not self._local_failed:
+                    # The fuzzy index loads on the first fuzzy miss, not here
+                    local_index = self._load_local_index()
+                    self._local_index = local_index
+                    self._local_failed = local_index is None
+        return self._local_index
+
+    def _load_local_index(self) -> Optional[USDALocalIndex]:
+        """Map the snapshot if it is up to date, otherwise parse the CSV"""
+        csv_path = resolve_data_path(settings.USDA_PLANTS_FILE)
+        snapshot_path = resolve_data_path(settings.USDA_SNAPSHOT_FILE)
+
+        if snapshot_path.exists():
+            if csv_path.exists() and (
+                csv_path.stat().st_mtime > snapshot_path.stat().st_mtime
+            ):
+                logger.warning(
+                    f"USDA snapshot {snapshot_path} is older than {csv_path} - "
+                    "run scripts/build_usda_snapshot.py"
+                )
+            else:
+                try:
+                    return USDASnapshotIndex.open(str(snapshot_path))
+                except Exception as e:
+                    logger.error(f"Failed to map USDA snapshot {snapshot_path}: {e}")
+
+        try:
+            return USDALocalIndex.from_file(str(csv_path))
+        except Exception as e:
+            logger.error(f"Failed to load USDA local index {csv_path}: {e}")
+            return None
 
     def _get_client(self):
         """Lazy load Weaviate client"""
@@ -35,133 +119,344 @@ class USDAPlantService:
                 logger.error(f"Failed to get Weaviate client: {e}")
         return self._weaviate_client
 
-    def find_by_scientific_name(self, scientific_name: str) -> Optional[Dict[str, str]]:
+    def _require_client(self):
+        """Weaviate client or WeaviateConnectionError (so failures are not cached)"""
+        client = self._get_client()
+        if not client:
+            raise WeaviateConnectionError("Weaviate client not available")
+        return client
+
+    # Lookup cache
+    @property
+    def _shared_cache_enabled(self) -> bool:
+        """Redis tier only pays off for network lookups, not the local index"""
+        return settings.USDA_CACHE_SHARED and self._get_local_index() is None
+
+    def _shared_key(self, key: str) -> str:
+        return f"usda:{self.backend}:{settings.USDA_MATCH_THRESHOLD}:{key}"
+
+    def _cache_get(self, key: str) -> Any:
+        """Cached result (possibly a cached miss) or _NOT_CACHED"""
+        value = self._cache.get(key, _NOT_CACHED)
+        if value is _NOT_CACHED and self._shared_cache_enabled:
+            entry = redis_service.get_json_sync(self._shared_key(key))
+            if entry is not None:
+                self._shared_hits += 1
+                value = entry["value"]
+                self._cache.set(key, value, ttl=self._ttl_for(value))
+        if value is not _NOT_CACHED and not value:
+            self._negative_hits += 1
+        return value
+
+    def _cache_set(self, key: str, value: Any):
+        ttl = self._ttl_for(value)
+        self._cache.set(key, value, ttl=ttl)
+        if self._shared_cache_enabled:
+            redis_service.set_json_sync(
+                self._shared_key(key), {"value": value}, expire=ttl
+            )
+
+    def _ttl_for(self, value: Any) -> int:
+        return settings.USDA_CACHE_TTL if value else settings.USDA_CACHE_NEGATIVE_TTL
+
+    def _cached(self, key: str, search: Callable[[], Any], default: Any) -> Any:
+        """Serve key from the cache or run search and cache its result"""
+        value = self._cache_get(key)
+        if value is not _NOT_CACHED:
+            return value
+        try:
+            value = search()
+        except WeaviateConnectionError as e:
+            logger.warning(e.message)
+            return default
+        except Exception as e:
+            logger.error(f"USDA search error ({key}): {e}")
+            return default
+        self._cache_set(key, value)
+        return value
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Lookup cache counters for health reporting"""
+        return {
+            **self._cache.stats(),
+            "negative_ttl": settings.USDA_CACHE_NEGATIVE_TTL,
+            "negative_hits": self._negative_hits,
+            "shared": self._shared_cache_enabled,
+            "shared_hits": self._shared_hits,
+        }
+
+    def clear_cache(self):
+        """Drop in-process cached lookups (Redis entries expire on their own)"""
+        self._cache.clear()
+        self._negative_hits = 0
+        self._shared_hits = 0
+
+    def _accept_match(
+        self, scientific_name: str, plant: Dict[str, str], confidence: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Calibrated verification decision for a candidate USDA record
+
+        Keeps the record only if its match confidence reaches
+        USDA_MATCH_THRESHOLD, and attaches that confidence.
+        """
+        if confidence < settings.USDA_MATCH_THRESHOLD:
+            logger.info(
+                f"USDA candidate rejected: {scientific_name} -> "
+                f"{plant.get('scientific_name')} ({confidence:.2f})"
+            )
+            return None
+        return {**plant, "match_confidence": round(confidence, 3)}
+
+    def _match_local(
+        self, local_index: USDALocalIndex, scientific_name: str
+    ) -> Optional[Dict[str, Any]]:
+        """Exact or fuzzy local match, filtered by the confidence threshold"""
+        match = local_index.match_scientific_name(scientific_name)
+        if match is None:
+            return None
+        return self._accept_match(scientific_name, *match)
+
+    def _match_bm25_hit(
+        self, scientific_name: str, plant: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Score a BM25 top hit against the query instead of trusting it blindly"""
+        plant = self._format_plant(plant)
+        confidence = name_similarity(
+            binomial_key(scientific_name), binomial_key(plant["scientific_name"])
+        )
+        return self._accept_match(scientific_name, plant, confidence)
+
+    def find_by_scientific_name(self, scientific_name: str) -> Optional[Dict[str, Any]]:
         """
-        Find plant by scientific name using Weaviate text search
+        Find plant by scientific name (local exact/fuzzy index or Weaviate BM25)
 
         Args:
             scientific_name: Scientific name to search (e.g., "Rosa damascena")
 
         Returns:
-            Plant dict with symbol, scientificName, commonName, family
+            Plant dict with symbol, scientificName, commonName, family and
+            match_confidence, or None if no candidate reaches
+            USDA_MATCH_THRESHOLD
         """
-        client = self._get_client()
-        if not client:
-            logger.warning("Weaviate client not available")
-            return None
-
-        try:
-            # Extract base name (genus species) for better matching
-            base_name = self._extract_base_name(scientific_name)
-
-            # Use BM25 search for exact text matching
-            result = (
-                client.query.get(
-                    self._class_name,
-                    [
-                        "symbol",
-                        "synonymSymbol",
-                        "scientificName",
-                        "commonName",
-                        "family",
-                    ],
-                )
-                .with_bm25(query=base_name, properties=["scientificName"])
-                .with_limit(1)
-                .do()
+        return self._cached(
+            self._scientific_key(scientific_name),
+            lambda: self._search_scientific_name(scientific_name),
+            None,
+        )
+
+    def _scientific_key(self, scientific_name: str) -> str:
+        return f"scientific:{binomial_key(scientific_name)}"
+
+    def _search_scientific_name(self, scientific_name: str) -> Optional[Dict[str, Any]]:
+        """Uncached find_by_scientific_name (raises on backend failure)"""
+        local_index = self._get_local_index()
+        if local_index is not None:
+            return self._match_local(local_index, scientific_name)
+
+        client = self._require_client()
+
+        # Extract base name (genus species) for better matching
+        base_name = self._extract_base_name(scientific_name)
+
+        # Use BM25 search for exact text matching
+        result = (
+            client.query.get(
+                self._class_name,
+                [
+                    "symbol",
+                    "synonymSymbol",
+                    "scientificName",
+                    "commonName",
+                    "family",
+                ],
             )
+            .with_bm25(query=base_name, properties=["scientificName"])
+            .with_limit(1)
+            .do()
+        )
 
-            if "data" in result and "Get" in result["data"]:
-                plants = result["data"]["Get"].get(self._class_name, [])
-                if plants:
-                    plant = plants[0]
-                    return {
-                        "symbol": plant.get("symbol", ""),
-                        "synonym_symbol": plant.get("synonymSymbol", ""),
-                        "scientific_name": plant.get("scientificName", ""),
-                        "common_name": plant.get("commonName", ""),
-                        "family": plant.get("family", ""),
-                    }
+        if "data" in result and "Get" in result["data"]:
+            plants = result["data"]["Get"].get(self._class_name, [])
+            if plants:
+                return self._match_bm25_hit(scientific_name, plants[0])
 
-            return None
+        return None
+
+    def find_by_scientific_names(
+        self, scientific_names: List[str]
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Resolve many scientific names in a single Weaviate round trip
 
+        Each name becomes an aliased BM25 subquery of one GraphQL request,
+        with the same matching rules as find_by_scientific_name. Names
+        already in the lookup cache are not queried again.
+
+        Args:
+            scientific_names: Names to look up (duplicates are queried once)
+
+        Returns:
+            Map of every input name to its plant dict, or None if not found
+        """
+        matches: Dict[str, Optional[Dict[str, Any]]] = {
+            name: None for name in scientific_names
+        }
+        pending = []
+        for name in matches:
+            if not name:
+                continue
+            cached = self._cache_get(self._scientific_key(name))
+            if cached is _NOT_CACHED:
+                pending.append(name)
+            else:
+                matches[name] = cached
+        if not pending:
+            return matches
+
+        try:
+            found = self._search_scientific_names(pending)
+        except WeaviateConnectionError as e:
+            logger.warning(e.message)
+            return matches
         except Exception as e:
-            logger.error(f"USDA search error: {e}")
-            return None
+            logger.error(f"USDA bulk search error: {e}")
+            return matches
+
+        for name, plant in found.items():
+            matches[name] = plant
+            self._cache_set(self._scientific_key(name), plant)
+        return matches
+
+    def _search_scientific_names(
+        self, scientific_names: List[str]
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Uncached bulk lookup (raises on backend failure)
+
+        If Weaviate reports errors for part of the request, names that came
+        back empty are left out so they are not cached as misses.
+        """
+        local_index = self._get_local_index()
+        if local_index is not None:
+            return {
+                name: self._match_local(local_index, name) for name in scientific_names
+            }
+
+        client = self._require_client()
+        queries = [
+            client.query.get(
+                self._class_name,
+                [
+                    "symbol",
+                    "synonymSymbol",
+                    "scientificName",
+                    "commonName",
+                    "family",
+                ],
+            )
+            .with_bm25(
+                query=self._extract_base_name(name), properties=["scientificName"]
+            )
+            .with_limit(1)
+            .with_alias(f"q{idx}")
+            for idx, name in enumerate(scientific_names)
+        ]
+        result = client.query.multi_get(queries).do()
+
+        partial = bool(result.get("errors"))
+        if partial:
+            logger.error(f"USDA bulk search errors: {result['errors']}")
+
+        found = (result.get("data") or {}).get("Get") or {}
+        matches: Dict[str, Optional[Dict[str, Any]]] = {}
+        for idx, name in enumerate(scientific_names):
+            plants = found.get(f"q{idx}") or []
+            if plants:
+                matches[name] = self._match_bm25_hit(name, plants[0])
+            elif not partial:
+                matches[name] = None
+        return matches
 
     def find_by_common_name(
         self, common_name: str, limit: int = 5
     ) -> List[Dict[str, str]]:
         """Find plants by common name"""
-        client = self._get_client()
-        if not client:
-            return []
-
-        try:
-            result = (
-                client.query.get(
-                    self._class_name,
-                    ["symbol", "scientificName", "commonName", "family"],
-                )
-                .with_bm25(query=common_name, properties=["commonName"])
-                .with_limit(limit)
-                .do()
+        return self._cached(
+            f"common:{limit}:{normalize_text(common_name)}",
+            lambda: self._search_common_name(common_name, limit),
+            [],
+        )
+
+    def _search_common_name(self, common_name: str, limit: int) -> List[Dict[str, str]]:
+        """Uncached find_by_common_name (raises on backend failure)"""
+        local_index = self._get_local_index()
+        if local_index is not None:
+            return local_index.find_by_common_name(common_name, limit)
+
+        client = self._require_client()
+        result = (
+            client.query.get(
+                self._class_name,
+                ["symbol", "scientificName", "commonName", "family"],
             )
-
-            if "data" in result and "Get" in result["data"]:
-                plants = result["data"]["Get"].get(self._class_name, [])
-                return [
-                    {
-                        "symbol": p.get("symbol", ""),
-                        "scientific_name": p.get("scientificName", ""),
-                        "common_name": p.get("commonName", ""),
-                        "family": p.get("family", ""),
-                    }
-                    for p in plants
-                ]
-
-            return []
-
-        except Exception as e:
-            logger.error(f"USDA common name search error: {e}")
-            return []
+            .with_bm25(query=common_name, properties=["commonName"])
+            .with_limit(limit)
+            .do()
+        )
+
+        if "data" in result and "Get" in result["data"]:
+            plants = result["data"]["Get"].get(self._class_name, [])
+            return [
+                {
+                    "symbol": p.get("symbol", ""),
+                    "scientific_name": p.get("scientificName", ""),
+                    "common_name": p.get("commonName", ""),
+                    "family": p.get("family", ""),
+                }
+                for p in plants
+            ]
+
+        return []
 
     def find_by_family(self, family: str, limit: int = 10) -> List[Dict[str, str]]:
         """Find plants by family name"""
-        client = self._get_client()
-        if not client:
-            return []
-
-        try:
-            result = (
-                client.query.get(
-                    self._class_name,
-                    ["symbol", "scientificName", "commonName", "family"],
-                )
-                .with_where(
-                    {"path": ["family"], "operator": "Equal", "valueText": family}
-                )
-                .with_limit(limit)
-                .do()
+        return self._cached(
+            f"family:{limit}:{normalize_text(family)}",
+            lambda: self._search_family(family, limit),
+            [],
+        )
+
+    def _search_family(self, family: str, limit: int) -> List[Dict[str, str]]:
+        """Uncached find_by_family (raises on backend failure)"""
+        local_index = self._get_local_index()
+        if local_index is not None:
+            return local_index.find_by_family(family, limit)
+
+        client = self._require_client()
+        result = (
+            client.query.get(
+                self._class_name,
+                ["symbol", "scientificName", "commonName", "family"],
             )
-
-            if "data" in result and "Get" in result["data"]:
-                plants = result["data"]["Get"].get(self._class_name, [])
-                return [
-                    {
-                        "symbol": p.get("symbol", ""),
-                        "scientific_name": p.get("scientificName", ""),
-                        "common_name": p.get("commonName", ""),
-                        "family": p.get("family", ""),
-                    }
-                    for p in plants
-                ]
-
-            return []
-
-        except Exception as e:
-            logger.error(f"USDA family search error: {e}")
-            return []
+            .with_where({"path": ["family"], "operator": "Equal", "valueText": family})
+            .with_limit(limit)
+            .do()
+        )
+
+        if "data" in result and "Get" in result["data"]:
+            plants = result["data"]["Get"].get(self._class_name, [])
+            return [
+                {
+                    "symbol": p.get("symbol", ""),
+                    "scientific_name": p.get("scientificName", ""),
+                    "common_name": p.get("commonName", ""),
+                    "family": p.get("family", ""),
+                }
+                for p in plants
+            ]
+
+        return []
 
     def validate_plant(self, scientific_name: str) -> Dict[str, Any]:
         """
@@ -180,7 +475,7 @@ class USDAPlantService:
                 "common_name": plant["common_name"],
                 "family": plant["family"],
                 "symbol": plant["symbol"],
-                "source": "USDA Plants Database (Weaviate)",
+                "source": f"USDA Plants Database ({self.source})",
             }
         else:
             return {
@@ -218,6 +513,16 @@ class USDAPlantService:
 
         return base_info
 
+    def _format_plant(self, plant: Dict[str, Any]) -> Dict[str, str]:
+        """Convert a USDAPlant Weaviate object to the service's plant dict"""
+        return {
+            "symbol": plant.get("symbol", ""),
+            "synonym_symbol": plant.get("synonymSymbol", ""),
+            "scientific_name": plant.get("scientificName", ""),
+            "common_name": plant.get("commonName", ""),
+            "family": plant.get("family", ""),
+        }
+
     def _extract_base_name(self, full_name: str) -> str:
         """Extract genus species from full scientific name with author"""
         if not full_name:
@@ -229,7 +534,11 @@ class USDAPlantService:
         return full_name
 
     def get_count(self) -> int:
-        """Get total plant count from Weaviate"""
+        """Get total plant count from the active backend"""
+        local_index = self._get_local_index()
+        if local_index is not None:
+            return len(local_index)
+
         client = self._get_client()
         if not client:
             return 0
@@ -250,7 +559,7 @@ class USDAPlantService:
 
     @property
     def is_available(self) -> bool:
-        """Check if USDA data is available in Weaviate"""
+        """Check if USDA data is available in the active backend"""
         return self.get_count() > 0
 
 
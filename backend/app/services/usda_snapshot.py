@@ -0,0 +1,241 @@
+"""
+USDA Plants Snapshot - compact memory-mapped form of the local index
+Built once from plantlst.txt (scripts/build_usda_snapshot.py) and opened
+with mmap, so every uvicorn worker shares the same page-cache pages
+instead of parsing the CSV into its own Python dicts
+
+File layout (integers are native-endian uint32; byte order is in the header):
+    b"USDASNAP" | uint32 version | uint32 header_len | JSON header | sections
+Sections (8-byte aligned):
+    col.<column>.offsets / col.<column>.data   - string table per column
+    key.<table>.offsets / key.<table>.data     - sorted UTF-8 keys
+    key.<table>.starts / key.<table>.rows      - row-id postings per key
+    fuzzy.<part>.offsets / fuzzy.<part>.data   - genus / epithet vocabulary
+    fuzzy.<part>.hashes / fuzzy.<part>.words   - sorted CRC-32 delete hashes and
+                                                 their vocabulary ids
+Snapshots without the fuzzy sections build the fuzzy index on first use.
+"""
+
+import json
+import logging
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from app.services.usda_fuzzy_matcher import FuzzyNameMatcher, DeleteIndex
+from app.services.usda_local_index import COLUMNS, KEY_TABLES, USDALocalIndex
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"USDASNAP"
+VERSION = 1
+_PREAMBLE = struct.Struct("<8sII")
+
+
+def _string_table(values: List[str]) -> Tuple[bytes, bytes]:
+    """Concatenate strings into (uint32 offsets, utf-8 data)"""
+    offsets = array("I", [0])
+    chunks = []
+    position = 0
+    for value in values:
+        encoded = value.encode("utf-8")
+        chunks.append(encoded)
+        position += len(encoded)
+        offsets.append(position)
+    return offsets.tobytes(), b"".join(chunks)
+
+
+def write_snapshot(index: USDALocalIndex, path: str) -> int:
+    """
+    Serialize a dict-backed USDALocalIndex to a snapshot file
+
+    Returns:
+        Size of the written file in bytes
+    """
+    sections: Dict[str, bytes] = {}
+
+    for column in COLUMNS:
+        offsets, data = _string_table(index._columns[column])
+        sections[f"col.{column}.offsets"] = offsets
+        sections[f"col.{column}.data"] = data
+
+    for table in KEY_TABLES:
+        entries = sorted(
+            (key.encode("utf-8"), row_ids) for key, row_ids in index._keys[table].items()
+        )
+        offsets, data = _string_table([key.decode("utf-8") for key, _ in entries])
+        starts = array("I", [0])
+        rows = array("I")
+        for _, row_ids in entries:
+            rows.extend(row_ids)
+            starts.append(len(rows))
+        sections[f"key.{table}.offsets"] = offsets
+        sections[f"key.{table}.data"] = data
+        sections[f"key.{table}.starts"] = starts.tobytes()
+        sections[f"key.{table}.rows"] = rows.tobytes()
+
+    matcher = index.build_fuzzy_index()
+    for part, delete_index in (("genus", matcher.genera), ("epithet", matcher.epithets)):
+        offsets, data = _string_table(list(delete_index.words))
+        sections[f"fuzzy.{part}.offsets"] = offsets
+        sections[f"fuzzy.{part}.data"] = data
+        sections[f"fuzzy.{part}.hashes"] = delete_index.hashes.astype(np.uint32).tobytes()
+        sections[f"fuzzy.{part}.words"] = delete_index.word_ids.astype(np.uint32).tobytes()
+
+    layout = {}
+    position = 0
+    for name, payload in sections.items():
+        layout[name] = [position, len(payload)]
+        position += len(payload) + (-len(payload) % 8)
+
+    header = json.dumps(
+        {"rows": len(index), "byteorder": sys.byteorder, "sections": layout}
+    ).encode("utf-8")
+    header += b" " * (-(len(header) + _PREAMBLE.size) % 8)
+
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for name, payload in sections.items():
+            f.write(payload)
+            f.write(b"\0" * (-len(payload) % 8))
+        size = f.tell()
+
+    logger.info(f"USDA snapshot written: {path} ({size / 1024 / 1024:.1f} MB)")
+    return size
+
+
+class _StringTable:
+    """Zero-copy view of a string table inside the mapped file"""
+
+    def __init__(self, buffer: mmap.mmap, offsets: memoryview, data_start: int):
+        self._buffer = buffer
+        self._offsets = offsets
+        self._data_start = data_start
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def raw(self, idx: int) -> bytes:
+        start = self._data_start + self._offsets[idx]
+        return self._buffer[start : self._data_start + self._offsets[idx + 1]]
+
+    def __getitem__(self, idx: int) -> str:
+        return self.raw(idx).decode("utf-8")
+
+
+class USDASnapshotIndex(USDALocalIndex):
+    """
+    USDALocalIndex served from a memory-mapped snapshot file
+
+    Strings are decoded on access and keys are found by binary search
+    over the sorted key tables, so nothing is materialized per worker.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+        magic, version, header_len = _PREAMBLE.unpack_from(self._buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a v{VERSION} USDA snapshot: {path}")
+        header = json.loads(
+            self._buffer[_PREAMBLE.size : _PREAMBLE.size + header_len].tobytes()
+        )
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"USDA snapshot byte order mismatch: {path}")
+
+        self._rows = header["rows"]
+        self._base = _PREAMBLE.size + header_len
+        self._layout = header["sections"]
+
+        self._column_tables = {
+            column: self._strings(f"col.{column}") for column in COLUMNS
+        }
+        self._key_tables = {
+            table: (
+                self._strings(f"key.{table}"),
+                self._uint32(f"key.{table}.starts"),
+                self._uint32(f"key.{table}.rows"),
+            )
+            for table in KEY_TABLES
+        }
+
+    @classmethod
+    def open(cls, path: str) -> "USDASnapshotIndex":
+        index = cls(path)
+        logger.info(f"USDA snapshot mapped: {len(index)} plants from {path}")
+        return index
+
+    def _uint32(self, name: str) -> memoryview:
+        offset, length = self._layout[name]
+        start = self._base + offset
+        return self._buffer[start : start + length].cast("I")
+
+    def _strings(self, prefix: str) -> _StringTable:
+        data_offset, _ = self._layout[f"{prefix}.data"]
+        return _StringTable(
+            self._mmap, self._uint32(f"{prefix}.offsets"), self._base + data_offset
+        )
+
+    def _array(self, name: str, dtype) -> np.ndarray:
+        offset, length = self._layout[name]
+        return np.frombuffer(
+            self._mmap, dtype=dtype, count=length // np.dtype(dtype).itemsize,
+            offset=self._base + offset,
+        )
+
+    def _load_fuzzy_index(self) -> FuzzyNameMatcher:
+        """Map the stored delete indexes (no build, no per-worker copy)"""
+        if "fuzzy.genus.hashes" not in self._layout:
+            return super()._load_fuzzy_index()
+        genera, epithets = (
+            DeleteIndex(
+                self._strings(f"fuzzy.{part}"),
+                self._array(f"fuzzy.{part}.hashes", np.uint32),
+                self._array(f"fuzzy.{part}.words", np.uint32),
+            )
+            for part in ("genus", "epithet")
+        )
+        return FuzzyNameMatcher(
+            genera, epithets, lambda candidate: self._lookup("binomial", candidate)
+        )
+
+    def _field(self, column: str, row_id: int) -> str:
+        return self._column_tables[column][row_id]
+
+    def _lookup(self, table: str, key: str) -> Sequence[int]:
+        keys, starts, rows = self._key_tables[table]
+        target = key.encode("utf-8")
+        lo, hi = 0, len(keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if keys.raw(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(keys) and keys.raw(lo) == target:
+            return rows[starts[lo] : starts[lo + 1]]
+        return ()
+
+    def _keys_of(self, table: str) -> Iterable[str]:
+        keys = self._key_tables[table][0]
+        return (keys[idx] for idx in range(len(keys)))
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def close(self):
+        """Release the mapping (views must not be used afterwards)"""
+        self._matcher = None
+        self._column_tables.clear()
+        self._key_tables.clear()
+        self._buffer.release()
+        self._mmap.close()
@@ -0,0 +1,359 @@
+"""
+Local PlantImage Vector Index - in-process kNN instead of a Weaviate round trip
+The gallery (512-d CLIP vectors) fits in RAM, so similarity_search can be
+a matrix-vector product (exact) or an HNSW lookup (VECTOR_INDEX_MODE=hnsw,
+needs the optional hnswlib package) with the same signature and result
+shape as WeaviateService.similarity_search
+
+Source: the VECTOR_INDEX_SNAPSHOT snapshot if present, otherwise every
+PlantImage is synced from Weaviate and the snapshot is written for the next
+start. Snapshot files (prefix):
+    <prefix>.npy   - float16 (objects x dim) vectors
+    <prefix>.json  - UUIDs plus one column per PlantImage property
+    <prefix>.hnsw  - cached HNSW graph (hnsw mode only)
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import resolve_data_path, settings
+from app.services.weaviate_service import PLANT_IMAGE_PROPERTIES
+
+logger = logging.getLogger(__name__)
+
+MODES = ("exact", "hnsw")
+
+
+def write_vector_snapshot(
+    prefix: str,
+    ids: Sequence[str],
+    vectors: np.ndarray,
+    columns: Dict[str, Sequence[Any]],
+    model: Optional[str] = None,
+):
+    """Persist vectors (float16) plus UUIDs and columnar properties under prefix"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(ids) != len(vectors) or any(len(v) != len(ids) for v in columns.values()):
+        raise ValueError("Snapshot ids, vectors and columns must have the same length")
+
+    Path(prefix).parent.mkdir(parents=True, exist_ok=True)
+    np.save(f"{prefix}.npy", vectors.astype(np.float16))
+    with open(f"{prefix}.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "class": "PlantImage",
+                "model": model or settings.CLIP_MODEL_NAME,
+                "dim": int(vectors.shape[1]) if len(vectors) else 0,
+                "count": len(ids),
+                "created_at": datetime.now(UTC).isoformat(),
+                "ids": list(ids),
+                "columns": {name: list(values) for name, values in columns.items()},
+            },
+            f,
+            ensure_ascii=False,
+        )
+    logger.info(f"Vector snapshot written: {prefix}.npy ({len(ids)} objects)")
+
+
+def read_vector_snapshot(prefix: str) -> Tuple[Dict[str, Any], np.ndarray]:
+    """(metadata, float16 vectors) of a snapshot written by write_vector_snapshot"""
+    with open(f"{prefix}.json", "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    vectors = np.load(f"{prefix}.npy")
+    if len(vectors) != len(meta["ids"]):
+        raise ValueError(
+            f"Vector snapshot {prefix} is inconsistent: {len(vectors)} vectors "
+            f"vs {len(meta['ids'])} ids"
+        )
+    return meta, vectors
+
+
+class PlantVectorIndex:
+    """L2-normalized float32 vectors + metadata columns, exact or HNSW search"""
+
+    def __init__(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        columns: Dict[str, List[Any]],
+        mode: str = "exact",
+        hnsw_path: Optional[str] = None,
+        model: Optional[str] = None,
+    ):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = vectors / np.where(norms == 0, 1.0, norms)
+        self.ids = ids
+        self.columns = columns
+        # Resolved here, not in the signature, so settings overrides apply
+        self.model = settings.CLIP_MODEL_NAME if model is None else model
+        self.mode = mode
+        self._hnsw = self._build_hnsw(hnsw_path) if mode == "hnsw" and len(ids) else None
+        if mode == "hnsw" and self._hnsw is None:
+            self.mode = "exact"
+
+    @classmethod
+    def from_snapshot(cls, prefix: str, mode: str = "exact") -> "PlantVectorIndex":
+        meta, vectors = read_vector_snapshot(prefix)
+        return cls(
+            meta["ids"], vectors, meta["columns"], mode,
+            hnsw_path=f"{prefix}.hnsw", model=meta.get("model", ""),
+        )
+
+    @classmethod
+    def from_weaviate(cls, service, mode: str = "exact") -> "PlantVectorIndex":
+        """Pull every PlantImage (properties + vector) through the cursor API"""
+        ids, vectors = [], []
+        columns: Dict[str, List[Any]] = {name: [] for name in PLANT_IMAGE_PROPERTIES}
+        for object_id, properties, vector in service.iter_plant_images():
+            ids.append(object_id)
+            vectors.append(vector)
+            for name in PLANT_IMAGE_PROPERTIES:
+                columns[name].append(properties.get(name))
+        dim = len(vectors[0]) if vectors else 0
+        return cls(ids, np.array(vectors, dtype=np.float32).reshape(-1, dim), columns, mode)
+
+    def save(self, prefix: str):
+        write_vector_snapshot(prefix, self.ids, self.vectors, self.columns, self.model)
+        if self._hnsw is not None:
+            self._hnsw.save_index(f"{prefix}.hnsw")
+
+    def _build_hnsw(self, path: Optional[str]):
+        """hnswlib inner-product index, loaded from path when it matches"""
+        try:
+            import hnswlib
+        except ImportError:
+            logger.warning("⚠️  hnswlib not installed - using exact vector search")
+            return None
+
+        index = hnswlib.Index(space="ip", dim=self.vectors.shape[1])
+        if path and Path(path).exists():
+            try:
+                index.load_index(path, max_elements=len(self.ids))
+                if index.get_current_count() == len(self.ids):
+                    index.set_ef(settings.VECTOR_INDEX_HNSW_EF)
+                    return index
+            except Exception as e:
+                logger.warning(f"Ignoring HNSW cache {path}: {e}")
+            index = hnswlib.Index(space="ip", dim=self.vectors.shape[1])
+
+        start = time.perf_counter()
+        index.init_index(
+            max_elements=len(self.ids), ef_construction=200, M=settings.VECTOR_INDEX_HNSW_M
+        )
+        index.add_items(self.vectors, np.arange(len(self.ids)))
+        index.set_ef(settings.VECTOR_INDEX_HNSW_EF)
+        logger.info(f"HNSW graph built: {len(self.ids)} vectors in {time.perf_counter() - start:.1f}s")
+        if path:
+            index.save_index(path)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query_embedding: Sequence[float], limit: int = 5):
+        """[(row, cosine)] best first"""
+        return self.search_batch([query_embedding], limit)[0]
+
+    def search_batch(self, query_embeddings: Sequence[Sequence[float]], limit: int = 5):
+        """search() for many queries at once: one matrix product (or HNSW call) per chunk"""
+        limit = min(limit, len(self.ids))
+        if limit <= 0 or not len(query_embeddings):
+            return [[] for _ in query_embeddings]
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1.0, norms)
+
+        if self._hnsw is not None:
+            rows, distances = self._hnsw.knn_query(queries, k=limit)
+            return [
+                [(int(row), 1.0 - float(d)) for row, d in zip(row_ids, row_distances)]
+                for row_ids, row_distances in zip(rows, distances)
+            ]
+
+        results = []
+        # Bound the (queries x gallery) score matrix to ~128 MB of float32
+        chunk = max(1, 32_000_000 // len(self.ids))
+        for start in range(0, len(queries), chunk):
+            scores = queries[start:start + chunk] @ self.vectors.T
+            best = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            order = np.argsort(-best_scores, axis=1)
+            best = np.take_along_axis(best, order, axis=1)
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            results.extend(
+                [(int(row), float(score)) for row, score in zip(row_ids, row_scores)]
+                for row_ids, row_scores in zip(best, best_scores)
+            )
+        return results
+
+    def _result(self, row: int, cosine: float) -> Dict[str, Any]:
+        distance = max(0.0, 1.0 - cosine)
+        item = {name: values[row] for name, values in self.columns.items()}
+        item["_additional"] = {
+            "id": self.ids[row],
+            "certainty": round(1.0 - distance / 2, 4),
+            "distance": round(distance, 4),
+        }
+        return item
+
+    def similarity_search(self, query_embedding: List[float], limit: int = 5) -> List[Dict[str, Any]]:
+        """Same result shape as WeaviateService.similarity_search (cosine distance)"""
+        return [self._result(row, cosine) for row, cosine in self.search(query_embedding, limit)]
+
+    def similarity_search_batch(
+        self, query_embeddings: List[List[float]], limit: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """similarity_search() per query, in query order"""
+        return [
+            [self._result(row, cosine) for row, cosine in hits]
+            for hits in self.search_batch(query_embeddings, limit)
+        ]
+
+
+class VectorIndexService:
+    """Loads the local index once (snapshot, else Weaviate sync) and serves kNN"""
+
+    def __init__(self):
+        self._index: Optional[PlantVectorIndex] = None
+        self._lock = threading.Lock()
+        self._loader_lock = threading.Lock()  # Not _lock: that one is held while loading
+        self._failed = False
+        self._loader: Optional[threading.Thread] = None
+        self.load_seconds: Optional[float] = None
+        self.source: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.VECTOR_SEARCH_BACKEND.lower() == "local"
+
+    @property
+    def mode(self) -> str:
+        mode = settings.VECTOR_INDEX_MODE.lower()
+        return mode if mode in MODES else "exact"
+
+    @property
+    def prefix(self) -> Path:
+        return resolve_data_path(settings.VECTOR_INDEX_SNAPSHOT)
+
+    def _get_index(self) -> Optional[PlantVectorIndex]:
+        if self._index is None and not self._failed:
+            with self._lock:
+                if self._index is None and not self._failed:
+                    self._index = self._load_index()
+                    self._failed = self._index is None
+        return self._index
+
+    def _load_index(self) -> Optional[PlantVectorIndex]:
+        start = time.perf_counter()
+        prefix = str(self.prefix)
+        try:
+            if Path(f"{prefix}.npy").exists():
+                index = PlantVectorIndex.from_snapshot(prefix, self.mode)
+                if index.model != settings.CLIP_MODEL_NAME:
+                    logger.error(
+                        f"Vector snapshot {prefix} holds {index.model} vectors, not "
+                        f"{settings.CLIP_MODEL_NAME} - re-export it"
+                    )
+                    return None
+                self.source = "snapshot"
+            else:
+                from app.services.weaviate_service import weaviate_service
+
+                if weaviate_service.client is None:
+                    weaviate_service.connect()
+                index = PlantVectorIndex.from_weaviate(weaviate_service, self.mode)
+                index.save(prefix)
+                self.source = "weaviate"
+        except Exception as e:
+            logger.error(f"Failed to load local vector index: {e}")
+            return None
+        self.load_seconds = round(time.perf_counter() - start, 2)
+        logger.info(
+            f"✅ Local vector index ({index.mode}): {len(index)} vectors from "
+            f"{self.source} in {self.load_seconds}s"
+        )
+        return index
+
+    def start_loading(self):
+        """Load in a background thread (startup), so requests aren't held up"""
+        if self._index is not None or self._failed:
+            return
+        with self._loader_lock:
+            if self._loader is None or not self._loader.is_alive():
+                self._loader = threading.Thread(
+                    target=self._get_index, name="vector-index-loader", daemon=True
+                )
+                self._loader.start()
+
+    def load_snapshot(self, prefix: str) -> PlantVectorIndex:
+        """
+        Swap in the index from another snapshot and make it the configured
+        one (copied to VECTOR_INDEX_SNAPSHOT, so the next start uses it too)
+        """
+        index = PlantVectorIndex.from_snapshot(prefix, self.mode)
+        target = str(self.prefix)
+        if Path(target).resolve() != Path(prefix).resolve():
+            # A cached HNSW graph belongs to the old vectors
+            Path(f"{target}.hnsw").unlink(missing_ok=True)
+            index.save(target)
+        with self._lock:
+            self._index = index
+            self._failed = False
+            self.source = "snapshot"
+        logger.info(f"✅ Local vector index replaced: {len(index)} vectors from {prefix}")
+        return index
+
+    def reload(self):
+        """Drop the loaded index; the next search starts reloading it"""
+        with self._lock:
+            self._index = None
+            self._failed = False
+
+    @property
+    def is_available(self) -> bool:
+        """Loads the index if needed - blocks (scripts; the API uses is_loaded)"""
+        return self._get_index() is not None
+
+    @property
+    def is_loaded(self) -> bool:
+        """True once loaded, without triggering (or waiting for) a load"""
+        return self._index is not None
+
+    def similarity_search(self, query_embedding: List[float], limit: int = 5) -> List[Dict[str, Any]]:
+        index = self._get_index()
+        return index.similarity_search(query_embedding, limit) if index is not None else []
+
+    def similarity_search_batch(
+        self, query_embeddings: List[List[float]], limit: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        index = self._get_index()
+        if index is None:
+            return [[] for _ in query_embeddings]
+        return index.similarity_search_batch(query_embeddings, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        index = self._index
+        return {
+            "status": (
+                "ready" if index is not None
+                else "failed" if self._failed
+                else "loading" if self._loader is not None and self._loader.is_alive()
+                else "not_loaded"
+            ),
+            "mode": index.mode if index is not None else self.mode,
+            "vectors": len(index) if index is not None else 0,
+            "source": self.source,
+            "load_seconds": self.load_seconds,
+        }
+
+
+# Singleton instance
+vector_index_service = VectorIndexService()
@@ -1,13 +1,37 @@
 import weaviate
 from weaviate.auth import AuthApiKey
-from typing import List, Dict, Any
+from weaviate.batch import Batch
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
 from datetime import datetime, UTC
+import itertools
+import time
+import uuid as uuid_lib
+import numpy as np
 from app.core.config import settings
 from app.core.exceptions import WeaviateConnectionError
 import logging
 
 logger = logging.getLogger(__name__)
 
+PLANT_IMAGE_PROPERTIES = [
+    "plantId",
+    "scientificName",
+    "commonName",
+    "family",
+    "imageUrl",
+    "description",
+    "createdAt",
+]
+
+# Namespace for deterministic PlantImage UUIDs
+PLANT_IMAGE_NAMESPACE = uuid_lib.uuid5(uuid_lib.NAMESPACE_URL, "plant-recognition/PlantImage")
+
+
+def plant_image_uuid(key: str) -> str:
+    """Deterministic object UUID for an image path or content hash"""
+    return str(uuid_lib.uuid5(PLANT_IMAGE_NAMESPACE, key))
+
+
 class WeaviateService:
     def __init__(self):
         self.client = None
@@ -175,10 +199,228 @@ class WeaviateService:
                 }
             )
     
+    def add_plant_images(self, images: List[Dict[str, Any]], batch_size: int = 100,
+                         max_retries: int = 3) -> Dict[str, Any]:
+        """
+        Bulk add_plant_image() over the Weaviate batch endpoint.
+        
+        Each object's UUID is derived from its image_hash (or image_url), so
+        re-running an import overwrites instead of duplicating. Objects that
+        fail are retried (only those, with backoff) up to max_retries times.
+        
+        Args:
+            images: Dicts with add_plant_image() keyword arguments, plus an
+                optional image_hash used for the UUID
+            batch_size: Objects per batch request
+            max_retries: Retries per batch for the objects that failed
+        
+        Returns:
+            Summary: total, added, failed, retried, batches, seconds,
+            objects_per_second, failed_ids (UUIDs) and up to 5 sample errors
+        """
+        if self.client is None:
+            raise WeaviateConnectionError(
+                message="Weaviate client not connected",
+                details={"class": self.class_name}
+            )
+        
+        objects = (self._plant_image_object(image) for image in images)
+        return self._import_objects(objects, len(images), batch_size, max_retries)
+    
+    def _import_objects(self, objects: Iterable[Tuple[str, Dict[str, Any], List[float]]],
+                        total: int, batch_size: int, max_retries: int) -> Dict[str, Any]:
+        """Batch-import (uuid, properties, vector) objects; add_plant_images() summary"""
+        started = time.perf_counter()
+        # A manual-mode batch of our own (nothing is sent until create_objects());
+        # reconfiguring the shared client.batch would change it for every caller
+        batch = Batch(self.client._connection).configure(
+            batch_size=None, dynamic=False, callback=None
+        )
+        
+        added = retried = batches = 0
+        errors: Dict[str, str] = {}
+        objects = iter(objects)  # Consumed one batch at a time
+        while True:
+            pending = list(itertools.islice(objects, batch_size))
+            if not pending:
+                break
+            for attempt in range(max_retries + 1):
+                if attempt:
+                    retried += len(pending)
+                    time.sleep(0.5 * 2 ** (attempt - 1))
+                failures = self._create_batch(batch, pending)
+                batches += 1
+                added += len(pending) - len(failures)
+                pending = [obj for obj in pending if obj[0] in failures]
+                if not pending:
+                    break
+            for object_id, _, _ in pending:
+                errors[object_id] = failures[object_id]
+        
+        elapsed = time.perf_counter() - started
+        summary = {
+            "total": total,
+            "added": added,
+            "failed": len(errors),
+            "retried": retried,
+            "batches": batches,
+            "seconds": round(elapsed, 2),
+            "objects_per_second": round(added / elapsed, 1) if elapsed else 0.0,
+            "failed_ids": list(errors),
+            "errors": list(errors.values())[:5],
+        }
+        logger.info(
+            f"✅ Bulk import: {added}/{total} plant images in {elapsed:.1f}s "
+            f"({summary['objects_per_second']}/s, {batches} batches, {len(errors)} failed)"
+        )
+        return summary
+    
+    def _plant_image_object(self, image: Dict[str, Any]) -> Tuple[str, Dict[str, Any], List[float]]:
+        """(uuid, properties, vector) for one add_plant_images() entry"""
+        data = {
+            "plantId": image["plant_id"],
+            "scientificName": image["scientific_name"],
+            "commonName": image.get("common_name", ""),
+            "family": image.get("family", ""),
+            "imageUrl": image["image_url"],
+            "description": image.get("description", ""),
+            "createdAt": datetime.now(UTC).isoformat()
+        }
+        object_id = plant_image_uuid(image.get("image_hash") or image["image_url"])
+        return object_id, data, image["embedding"]
+    
+    def _create_batch(self, batch: Batch,
+                      objects: List[Tuple[str, Dict[str, Any], List[float]]]) -> Dict[str, str]:
+        """Send one batch; returns {uuid: error} for the objects that failed"""
+        for object_id, data, vector in objects:
+            batch.add_data_object(
+                data_object=data,
+                class_name=self.class_name,
+                uuid=object_id,
+                vector=vector
+            )
+        try:
+            results = batch.create_objects() or []
+        except Exception as e:
+            # Drop the unsent objects so the retry doesn't send them twice
+            batch.empty_objects()
+            logger.warning(f"Batch request failed ({len(objects)} objects): {e}")
+            return {object_id: str(e) for object_id, _, _ in objects}
+        
+        failures = {}
+        for result in results:
+            object_errors = (result.get("result") or {}).get("errors")
+            if object_errors:
+                messages = [error.get("message", "") for error in object_errors.get("error", [])]
+                failures[result.get("id")] = "; ".join(messages) or str(object_errors)
+        return failures
+    
+    def iter_plant_images(self, page_size: int = 500) -> Iterator[Tuple[str, Dict[str, Any], List[float]]]:
+        """
+        Every PlantImage as (uuid, properties, vector), paged with the
+        cursor API (stable and cheap regardless of collection size)
+        """
+        cursor = None
+        while True:
+            query = (
+                self.client.query
+                .get(self.class_name, PLANT_IMAGE_PROPERTIES)
+                .with_additional(["id", "vector"])
+                .with_limit(page_size)
+            )
+            if cursor:
+                query = query.with_after(cursor)
+            result = query.do()
+            if "errors" in result:
+                raise WeaviateConnectionError(
+                    message="Failed to read PlantImage objects",
+                    details={"errors": result["errors"], "after": cursor}
+                )
+            items = result.get("data", {}).get("Get", {}).get(self.class_name) or []
+            for item in items:
+                additional = item.pop("_additional")
+                cursor = additional["id"]
+                yield cursor, item, additional["vector"]
+            if len(items) < page_size:
+                return
+    
+    def export_plant_images(self, prefix: str, page_size: int = 500) -> Dict[str, Any]:
+        """
+        Snapshot every PlantImage (UUID, properties, vector) to <prefix>.npy
+        (float16 vectors) + <prefix>.json (UUIDs and property columns)
+        
+        Restore with restore_plant_images(), or load it as the local vector
+        index (VECTOR_INDEX_SNAPSHOT) - no CLIP re-encoding either way.
+        """
+        from app.services.vector_index import write_vector_snapshot
+        
+        started = time.perf_counter()
+        ids, vectors = [], []
+        columns: Dict[str, List[Any]] = {name: [] for name in PLANT_IMAGE_PROPERTIES}
+        for object_id, properties, vector in self.iter_plant_images(page_size):
+            ids.append(object_id)
+            vectors.append(vector)
+            for name in PLANT_IMAGE_PROPERTIES:
+                columns[name].append(properties.get(name))
+        
+        dim = len(vectors[0]) if vectors else 0
+        write_vector_snapshot(prefix, ids, np.array(vectors, dtype=np.float32).reshape(-1, dim), columns)
+        elapsed = time.perf_counter() - started
+        logger.info(f"✅ Exported {len(ids)} plant images to {prefix} in {elapsed:.1f}s")
+        return {"objects": len(ids), "dim": dim, "seconds": round(elapsed, 2), "prefix": prefix}
+    
+    def restore_plant_images(self, prefix: str, batch_size: int = 200,
+                             max_retries: int = 3) -> Dict[str, Any]:
+        """
+        Bulk-import an export_plant_images() snapshot, keeping the original
+        UUIDs (restoring twice overwrites instead of duplicating)
+        
+        Returns:
+            add_plant_images() summary
+        """
+        from app.services.vector_index import read_vector_snapshot
+        
+        if self.client is None:
+            raise WeaviateConnectionError(
+                message="Weaviate client not connected",
+                details={"class": self.class_name}
+            )
+        meta, vectors = read_vector_snapshot(prefix)
+        columns = meta["columns"]
+        objects = (
+            (
+                object_id,
+                {name: values[row] for name, values in columns.items() if values[row] is not None},
+                vectors[row].astype(np.float32).tolist(),
+            )
+            for row, object_id in enumerate(meta["ids"])
+        )
+        return self._import_objects(objects, len(meta["ids"]), batch_size, max_retries)
+    
+    def _local_vector_index(self):
+        """
+        vector_index_service once its index is loaded, else None (search
+        Weaviate). Never waits for a load in progress - that runs in the
+        background, started here if startup didn't.
+        """
+        if settings.VECTOR_SEARCH_BACKEND.lower() != "local":
+            return None
+        from app.services.vector_index import vector_index_service
+        
+        if vector_index_service.is_loaded:
+            return vector_index_service
+        vector_index_service.start_loading()
+        logger.debug("Local vector index not loaded yet - searching Weaviate")
+        return None
+    
     def similarity_search(self, query_embedding: List[float], limit: int = 5):
         """
         Vector similarity search using cosine distance.
         
+        With VECTOR_SEARCH_BACKEND=local this is answered by the in-process
+        index (app/services/vector_index.py), falling back to Weaviate
+        while that index is unavailable.
+        
         Args:
             query_embedding: 512-dim CLIP vector from query image
             limit: Number of results to return (default: 5)
@@ -200,18 +442,14 @@ class WeaviateService:
                 }
             ]
         """
+        local_index = self._local_vector_index()
+        if local_index is not None:
+            return local_index.similarity_search(query_embedding, limit)
+        
         try:
             result = (
                 self.client.query
-                .get(self.class_name, [
-                    "plantId", 
-                    "scientificName", 
-                    "commonName", 
-                    "family",
-                    "imageUrl",
-                    "description",
-                    "createdAt"
-                ])
+                .get(self.class_name, PLANT_IMAGE_PROPERTIES)
                 .with_near_vector({"vector": query_embedding})
                 .with_limit(limit)
                 .with_additional(["certainty", "distance"])
@@ -233,6 +471,62 @@ class WeaviateService:
                 details={"error": str(e), "limit": limit}
             )
     
+    def similarity_search_batch(self, query_embeddings: List[List[float]], limit: int = 5,
+                                queries_per_request: int = 32) -> List[List[Dict[str, Any]]]:
+        """
+        similarity_search() for many query vectors in one round trip.
+        
+        The queries go out as aliased nearVector subqueries of a single
+        GraphQL request (q0, q1, ...), queries_per_request at a time to keep
+        the request body bounded (~10 KB of JSON per 512-dim vector).
+        
+        Args:
+            query_embeddings: CLIP vectors (e.g. several uploads, or TTA crops)
+            limit: Results per query
+            queries_per_request: Subqueries per GraphQL request
+        
+        Returns:
+            One similarity_search()-shaped result list per query, in order
+        """
+        if not query_embeddings:
+            return []
+        local_index = self._local_vector_index()
+        if local_index is not None:
+            return local_index.similarity_search_batch(query_embeddings, limit)
+        
+        results: List[List[Dict[str, Any]]] = []
+        try:
+            for start in range(0, len(query_embeddings), queries_per_request):
+                chunk = query_embeddings[start:start + queries_per_request]
+                queries = [
+                    self.client.query
+                    .get(self.class_name, PLANT_IMAGE_PROPERTIES)
+                    .with_near_vector({"vector": list(embedding)})
+                    .with_limit(limit)
+                    .with_additional(["certainty", "distance"])
+                    .with_alias(f"q{i}")
+                    for i, embedding in enumerate(chunk)
+                ]
+                result = self.client.query.multi_get(queries).do()
+                if "errors" in result:
+                    raise WeaviateConnectionError(
+                        message="Batch similarity search failed",
+                        details={"errors": result["errors"], "queries": len(chunk)}
+                    )
+                found = (result.get("data") or {}).get("Get") or {}
+                results.extend(found.get(f"q{i}") or [] for i in range(len(chunk)))
+        except WeaviateConnectionError:
+            raise
+        except Exception as e:
+            logger.error(f"Batch vector search error: {e}", exc_info=True)
+            raise WeaviateConnectionError(
+                message="Failed to perform batch similarity search",
+                details={"error": str(e), "queries": len(query_embeddings), "limit": limit}
+            )
+        
+        logger.info(f"Batch similarity search: {len(results)} queries")
+        return results
+    
     def get_schema_info(self) -> Dict[str, Any]:
         """Get current schema information"""
         try:
@@ -0,0 +1,349 @@
+"""
+Local Zero-Shot Plant Identification - CLIP text embeddings as a classifier
+Prompts like "a photo of {species}" are encoded once per label
+(scripts/build_zero_shot_index.py) into a float16 matrix that is
+memory-mapped at startup, so identifying a plant is one image encode plus
+a matrix-vector product and top-k - no Kaggle tunnel needed
+
+Files (ZERO_SHOT_INDEX prefix):
+    <prefix>.npy   - float16 (labels x dim) L2-normalized text embeddings
+    <prefix>.json  - model name, prompt template and label metadata
+
+ZERO_SHOT_SEARCH=hierarchical scores family and genus prototypes first
+and only scans species inside the best few genera (see HierarchicalSearch).
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import resolve_data_path, settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATE = "a photo of {species}"
+# CLIP's learned temperature (exp(logit_scale)) for turning cosines into probabilities
+LOGIT_SCALE = 100.0
+# Rows converted to float32 at a time while scoring (bounds temporary memory)
+_SCORE_CHUNK = 2048
+
+
+def _softmax_top(scores: np.ndarray, best: np.ndarray) -> np.ndarray:
+    """Probabilities of the best rows under a softmax over all given scores"""
+    logits = (scores - scores.max()) * LOGIT_SCALE
+    return np.exp(logits[best]) / np.exp(logits).sum()
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best])]
+
+
+def genus_of(scientific_name: str) -> str:
+    """Genus key of a label ("× Sorbaronia x" -> "× sorbaronia")"""
+    parts = scientific_name.lower().split()
+    if parts[:1] == ["×"]:
+        return " ".join(parts[:2])
+    return parts[0] if parts else ""
+
+
+def write_label_index(
+    prefix: str,
+    labels: Sequence[Dict[str, str]],
+    embeddings: np.ndarray,
+    template: str,
+    model_name: str,
+):
+    """
+    Persist label embeddings (float16) and their metadata under prefix
+
+    Args:
+        labels: One dict per row with scientific_name (common_name/family optional)
+        embeddings: (len(labels), dim) L2-normalized text embeddings
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if len(labels) != len(embeddings):
+        raise ValueError(f"{len(labels)} labels but {len(embeddings)} embeddings")
+
+    Path(prefix).parent.mkdir(parents=True, exist_ok=True)
+    np.save(f"{prefix}.npy", embeddings.astype(np.float16))
+    with open(f"{prefix}.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "model": model_name,
+                "template": template,
+                "dim": int(embeddings.shape[1]),
+                "count": len(labels),
+                "labels": [
+                    {
+                        "scientific_name": label["scientific_name"],
+                        "common_name": label.get("common_name", ""),
+                        "family": label.get("family", ""),
+                    }
+                    for label in labels
+                ],
+            },
+            f,
+            ensure_ascii=False,
+        )
+    logger.info(f"Zero-shot index written: {prefix}.npy ({len(labels)} labels)")
+
+
+class ZeroShotIndex:
+    """Memory-mapped label embedding matrix plus label metadata"""
+
+    def __init__(self, prefix: str):
+        with open(f"{prefix}.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.prefix = prefix
+        self.model = meta["model"]
+        self.template = meta["template"]
+        self.labels: List[Dict[str, str]] = meta["labels"]
+        self.matrix = np.load(f"{prefix}.npy", mmap_mode="r")
+        if self.matrix.shape != (len(self.labels), meta["dim"]):
+            raise ValueError(
+                f"Zero-shot index {prefix} is inconsistent: matrix "
+                f"{self.matrix.shape} vs {len(self.labels)} labels"
+            )
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def scores(self, embedding: Sequence[float]) -> np.ndarray:
+        """Cosine similarity of the embedding with every label"""
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        out = np.empty(len(self.labels), dtype=np.float32)
+        for start in range(0, len(self.labels), _SCORE_CHUNK):
+            chunk = self.matrix[start : start + _SCORE_CHUNK]
+            out[start : start + len(chunk)] = chunk.astype(np.float32) @ query
+        return out
+
+    def top_k(self, embedding: Sequence[float], k: int = 5) -> List[Tuple[int, float, float]]:
+        """
+        Best k labels for an image embedding
+
+        Returns:
+            (row, cosine, probability) tuples, best first; probability is a
+            softmax over all labels at CLIP's logit scale
+        """
+        scores = self.scores(embedding)
+        best = _top(scores, k)
+        probabilities = _softmax_top(scores, best)
+        return [
+            (int(row), float(scores[row]), float(p))
+            for row, p in zip(best, probabilities)
+        ]
+
+
+class HierarchicalSearch:
+    """
+    Two-stage family -> genus -> species search over a ZeroShotIndex
+
+    Every family and genus gets a prototype: the normalized mean of its
+    species embeddings (no extra prompts to encode). A query scores all
+    family prototypes, then the genera of the top_families families, and
+    only then the species of the top_genera best genera - a few hundred
+    rows instead of the whole matrix. Labels without a family are grouped
+    by genus alone. Probabilities are a softmax over the scanned species
+    only.
+    """
+
+    def __init__(self, index: ZeroShotIndex, top_families: int = 5, top_genera: int = 10):
+        start = time.perf_counter()
+        self.index = index
+        self.top_families = top_families
+        self.top_genera = top_genera
+
+        genus_keys = [genus_of(label["scientific_name"]) for label in index.labels]
+        family_keys = [
+            (label.get("family") or "").lower() or f"genus:{genus}"
+            for label, genus in zip(index.labels, genus_keys)
+        ]
+
+        # Genus groups: rows sorted by genus, so each genus is one slice
+        genus_names, genus_ids = np.unique(np.array(genus_keys, dtype=object), return_inverse=True)
+        self._rows = np.argsort(genus_ids, kind="stable")
+        sorted_ids = genus_ids[self._rows]
+        self._genus_starts = np.searchsorted(sorted_ids, np.arange(len(genus_names) + 1))
+
+        matrix = index.matrix[self._rows].astype(np.float32)
+        genus_sums = np.add.reduceat(matrix, self._genus_starts[:-1])
+        self._genus_protos = self._normalize(genus_sums)
+        del matrix
+
+        # Family groups: which genera belong to each family
+        genus_family = {}
+        for genus_id, family in zip(genus_ids.tolist(), family_keys):
+            genus_family.setdefault(genus_id, family)
+        family_names = sorted(set(genus_family.values()))
+        family_index = {name: i for i, name in enumerate(family_names)}
+        self._family_genera: List[List[int]] = [[] for _ in family_names]
+        for genus_id, family in genus_family.items():
+            self._family_genera[family_index[family]].append(genus_id)
+        self._family_genera = [np.array(g, dtype=np.int64) for g in self._family_genera]
+
+        self._family_protos = self._normalize(
+            np.stack([genus_sums[genera].sum(axis=0) for genera in self._family_genera])
+        )
+
+        logger.info(
+            f"Zero-shot hierarchy: {len(family_names)} families, "
+            f"{len(genus_names)} genera in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.where(norms == 0, 1.0, norms)).astype(np.float32)
+
+    @property
+    def family_count(self) -> int:
+        return len(self._family_protos)
+
+    @property
+    def genus_count(self) -> int:
+        return len(self._genus_protos)
+
+    def top_k(self, embedding: Sequence[float], k: int = 5) -> List[Tuple[int, float, float]]:
+        """Same contract as ZeroShotIndex.top_k, scanning only the best groups"""
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        families = _top(self._family_protos @ query, self.top_families)
+        genera = np.concatenate([self._family_genera[f] for f in families])
+        genera = genera[_top(self._genus_protos[genera] @ query, self.top_genera)]
+
+        rows = np.concatenate(
+            [self._rows[self._genus_starts[g] : self._genus_starts[g + 1]] for g in genera]
+        )
+        rows.sort()  # Sequential reads from the memory-mapped matrix
+        scores = self.index.matrix[rows].astype(np.float32) @ query
+
+        best = _top(scores, k)
+        probabilities = _softmax_top(scores, best)
+        return [
+            (int(rows[i]), float(scores[i]), float(p))
+            for i, p in zip(best, probabilities)
+        ]
+
+
+class ZeroShotService:
+    """
+    Local species identification from a precomputed zero-shot index
+
+    ZERO_SHOT_MODE controls its role in /chat-with-image: "off",
+    "fallback" (used only when Kaggle and PlantNet both return nothing) or
+    "primary" (runs alongside them and ranks first in the merge).
+    """
+
+    def __init__(self):
+        self._index: Optional[ZeroShotIndex] = None
+        self._search = None
+        self._lock = threading.Lock()
+        self._failed = False
+
+    @property
+    def mode(self) -> str:
+        mode = settings.ZERO_SHOT_MODE.lower()
+        return mode if mode in ("fallback", "primary") else "off"
+
+    @property
+    def prefix(self) -> Path:
+        return resolve_data_path(settings.ZERO_SHOT_INDEX)
+
+    def _get_index(self) -> Optional[ZeroShotIndex]:
+        """Map the index once; None if missing or built with another model"""
+        if self._index is None and not self._failed:
+            with self._lock:
+                if self._index is None and not self._failed:
+                    index = self._load_index()
+                    if index is not None:
+                        self._search = self._build_search(index)
+                    self._index = index
+                    self._failed = index is None
+        return self._index
+
+    def _build_search(self, index: ZeroShotIndex):
+        """Flat scan or HierarchicalSearch, per ZERO_SHOT_SEARCH"""
+        if settings.ZERO_SHOT_SEARCH.lower() == "hierarchical":
+            return HierarchicalSearch(
+                index,
+                top_families=settings.ZERO_SHOT_TOP_FAMILIES,
+                top_genera=settings.ZERO_SHOT_TOP_GENERA,
+            )
+        return index
+
+    def _load_index(self) -> Optional[ZeroShotIndex]:
+        prefix = self.prefix
+        if not Path(f"{prefix}.npy").exists():
+            logger.warning(
+                f"Zero-shot index {prefix}.npy not found - run scripts/build_zero_shot_index.py"
+            )
+            return None
+        try:
+            start = time.perf_counter()
+            index = ZeroShotIndex(str(prefix))
+        except Exception as e:
+            logger.error(f"Failed to load zero-shot index {prefix}: {e}")
+            return None
+        if index.model != settings.CLIP_MODEL_NAME:
+            logger.error(
+                f"Zero-shot index {prefix} was built with {index.model}, "
+                f"not {settings.CLIP_MODEL_NAME} - rebuild it"
+            )
+            return None
+        logger.info(
+            f"Zero-shot index mapped: {len(index)} labels in "
+            f"{(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return index
+
+    @property
+    def is_available(self) -> bool:
+        return self._get_index() is not None
+
+    @property
+    def label_count(self) -> int:
+        index = self._get_index()
+        return len(index) if index is not None else 0
+
+    def classify(self, embedding: Sequence[float], top_k: int = 5) -> List[Dict[str, Any]]:
+        """Top-k labels for an image embedding, in the shared prediction shape"""
+        index = self._get_index()
+        if index is None:
+            return []
+        return [
+            {
+                **index.labels[row],
+                "score": probability,
+                "similarity": round(cosine, 4),
+                "source": "clip-zeroshot",
+            }
+            for row, cosine, probability in self._search.top_k(embedding, top_k)
+        ]
+
+    async def identify_plant(self, image_bytes: bytes, top_k: int = 5) -> List[Dict[str, Any]]:
+        """Encode the image through the CLIP batcher and classify it locally"""
+        if not self.is_available:
+            return []
+
+        from app.services.clip_scheduler import clip_scheduler
+
+        embedding = await clip_scheduler.encode_image(image_bytes)
+        return await asyncio.to_thread(self.classify, embedding, top_k)
+
+
+# Singleton instance
+zero_shot_service = ZeroShotService()
@@ -1,4 +1,3 @@
-import cv2
 import numpy as np
 from PIL import Image
 import io
@@ -11,6 +10,8 @@ class ImageProcessor:
     
     @staticmethod
     def enhance_image(image_bytes: bytes) -> bytes:
+        import cv2  # Deferred: only this path needs OpenCV
+        
         nparr = np.frombuffer(image_bytes, np.uint8)
         img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
         
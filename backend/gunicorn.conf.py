@@ -0,0 +1,73 @@
+"""
+Pre-fork serving: one copy of the CLIP weights shared by every worker
+
+uvicorn --workers spawns fresh interpreters, so each worker loads its own
+CLIP copy. Here the gunicorn master imports the app and loads CLIP once,
+then forks the uvicorn workers; the weights stay shared copy-on-write
+(inference only reads them). With CLIP_WARMUP_ON_STARTUP=true each worker
+also runs the warm-up forward pass itself.
+
+Usage:
+    gunicorn -c gunicorn.conf.py app.main:app
+    WEB_CONCURRENCY=4 CLIP_TORCH_THREADS=2 gunicorn -c gunicorn.conf.py app.main:app
+
+Measure with scripts/measure_worker_memory.py.
+"""
+
+import gc
+import logging
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+logger = logging.getLogger("gunicorn.error")
+
+
+def on_starting(server):
+    """Load CLIP in the master before any worker is forked"""
+    from app.core.config import settings
+
+    if settings.CLIP_INFERENCE_BACKEND.lower() == "process":
+        # The model lives in the inference processes, not the web workers
+        gc.freeze()
+        return
+
+    import torch
+
+    from app.services.clip_service import clip_service
+
+    # Load single-threaded: an OpenMP pool started in the master does not
+    # survive fork and would hang the workers' first forward pass
+    threads = torch.get_num_threads()
+    torch.set_num_threads(1)
+    try:
+        clip_service.load_model()
+    except Exception as e:
+        logger.error(f"CLIP preload failed, workers will load their own copy: {e}")
+    finally:
+        torch.set_num_threads(threads)
+
+    # Move everything allocated so far out of the GC's reach, so collections
+    # in the workers don't write to (and un-share) the master's pages
+    gc.freeze()
+    logger.info(
+        f"✅ CLIP preloaded in master (pid {os.getpid()}), forking {server.cfg.workers} workers"
+    )
+
+
+def post_fork(server, worker):
+    """Split the cores between workers instead of each using all of them"""
+    from app.core.config import settings
+
+    if settings.CLIP_INFERENCE_BACKEND.lower() == "process":
+        return
+    import torch
+
+    threads = int(os.getenv("CLIP_TORCH_THREADS", "0")) or max(
+        1, (os.cpu_count() or 1) // server.cfg.workers
+    )
+    torch.set_num_threads(threads)
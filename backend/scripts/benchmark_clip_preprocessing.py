@@ -0,0 +1,111 @@
+"""
+CLIP preprocessing benchmark: full-resolution pipeline vs resolution-aware
+Measures per-image CPU time of everything before the forward pass (decode,
+denoise, sharpen, contrast stretch, color, TTA crops) - the model is not
+loaded
+
+Usage:
+    python scripts/benchmark_clip_preprocessing.py [--images a.jpg b.jpg] [--runs 5]
+"""
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.clip_service import CLIPService
+
+SYNTHETIC_SIZES = [(1024, 768), (2048, 1536), (4032, 3024), (4096, 4096)]
+
+
+def legacy_prepare(service: CLIPService, image_bytes: bytes):
+    """The previous pipeline: every step at full upload resolution"""
+    image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    image = image.filter(ImageFilter.MedianFilter(size=3))
+    image = ImageEnhance.Sharpness(image).enhance(1.3)
+    img_array = np.array(image)
+    p2, p98 = np.percentile(img_array, (2, 98))
+    if p98 - p2 > 0:
+        img_array = np.clip((img_array - p2) * 255.0 / (p98 - p2), 0, 255).astype(np.uint8)
+        image = Image.fromarray(img_array)
+    image = ImageEnhance.Color(image).enhance(1.2)
+    if min(image.size) > 300:
+        return service._multi_crop_augmentation(image)
+    return [image]
+
+
+def synthetic_photo(size) -> bytes:
+    """Smooth gradients plus sensor-like noise, saved as a camera-quality JPEG"""
+    width, height = size
+    rng = np.random.default_rng(width * height)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack(
+        [
+            120 + 80 * np.sin(x / 97.0),
+            140 + 60 * np.cos(y / 61.0),
+            90 + 50 * np.sin((x + y) / 143.0),
+        ],
+        axis=-1,
+    )
+    noisy = base + rng.normal(0, 12, base.shape)
+    image = Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def cpu_ms(fn, runs: int) -> float:
+    """Median per-call CPU time (process_time counts all threads)"""
+    samples = []
+    for _ in range(runs):
+        start = time.process_time()
+        fn()
+        samples.append((time.process_time() - start) * 1000)
+    return float(np.median(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLIP preprocessing benchmark")
+    parser.add_argument("--images", nargs="*", help="Image files (default: synthetic)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.images:
+        inputs = [(Path(p).name, Path(p).read_bytes()) for p in args.images]
+    else:
+        inputs = [(f"synthetic {w}x{h}", synthetic_photo((w, h))) for w, h in SYNTHETIC_SIZES]
+
+    service = CLIPService()
+    working_size = settings.CLIP_PREPROCESS_SIZE
+
+    print("=" * 72)
+    print(f"Working resolution: {working_size}px shortest side")
+    print(f"{'image':<26}{'full-res ms':>13}{'resized ms':>12}{'speedup':>9}{'crops':>12}")
+    print("=" * 72)
+    totals = [0.0, 0.0]
+    for name, image_bytes in inputs:
+        before = cpu_ms(lambda: legacy_prepare(service, image_bytes), args.runs)
+        after = cpu_ms(lambda: service.prepare_views(image_bytes, True), args.runs)
+        views = service.prepare_views(image_bytes, True)
+        totals[0] += before
+        totals[1] += after
+        print(
+            f"{name:<26}{before:>13.1f}{after:>12.1f}{before / after:>8.1f}x"
+            f"{f'{len(views)}x{views[0].size[0]}px':>12}"
+        )
+    print("=" * 72)
+    print(
+        f"{'mean per image':<26}{totals[0] / len(inputs):>13.1f}"
+        f"{totals[1] / len(inputs):>12.1f}{totals[0] / totals[1]:>8.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
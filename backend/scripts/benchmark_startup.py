@@ -0,0 +1,177 @@
+"""
+API cold-start benchmark
+Measures, each in a fresh process:
+    import - time to `import app.main`, and which heavy modules it pulled in
+    status - time from launching uvicorn to the first 200 from /status
+    ready  - time from launching uvicorn to the first 200 from /ready (with
+             CLIP_WARMUP_ON_STARTUP on this includes loading + warming CLIP)
+
+torch, transformers and cv2 should NOT be imported at startup; they load
+on the first request that needs them, or in the background warm-up. The
+server runs with the configured CLIP_WARMUP_ON_STARTUP unless --warmup
+on/off overrides it.
+
+Usage:
+    python scripts/benchmark_startup.py [--runs 5] [--json]
+    python scripts/benchmark_startup.py --warmup on
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Optional, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+HEAVY_MODULES = ["torch", "transformers", "cv2", "weaviate", "numpy", "PIL"]
+
+
+def run_import():
+    """Child process: time `import app.main`, print JSON"""
+    start = time.perf_counter()
+    import app.main  # noqa: F401
+
+    import_ms = (time.perf_counter() - start) * 1000
+    print(
+        json.dumps(
+            {
+                "import_ms": round(import_ms, 1),
+                "heavy": [m for m in HEAVY_MODULES if m in sys.modules],
+            }
+        )
+    )
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _poll(server, url: str, start: float, timeout: float) -> Optional[float]:
+    """ms since start until url answers 200; None if it reports a failure (503)"""
+    while time.perf_counter() - start < timeout:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return (time.perf_counter() - start) * 1000
+        except urllib.error.HTTPError as e:
+            if json.loads(e.read() or b"{}").get("status") == "failed":
+                return None
+            time.sleep(0.05)
+        except OSError:
+            time.sleep(0.01)
+    raise TimeoutError(f"No 200 from {url} after {timeout}s")
+
+
+def time_to_ready(warmup: Optional[bool], timeout: float = 300.0) -> Tuple[float, Optional[float]]:
+    """Launch uvicorn; ms until the first 200 from /status, then from /ready"""
+    from app.core.config import settings
+
+    port = _free_port()
+    env = dict(os.environ)
+    if warmup is not None:
+        env["CLIP_WARMUP_ON_STARTUP"] = "true" if warmup else "false"
+    prefix = f"http://127.0.0.1:{port}{settings.API_V1_PREFIX}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        status_ms = _poll(server, f"{prefix}/status", start, timeout)
+        return status_ms, _poll(server, f"{prefix}/ready", start, timeout)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _summary(values):
+    return {
+        "median": round(statistics.median(values), 1),
+        "min": round(min(values), 1),
+        "max": round(max(values), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", choices=["on", "off"],
+                        help="Override CLIP_WARMUP_ON_STARTUP (default: as configured)")
+    parser.add_argument("--json", action="store_true", help="Print one JSON line for tracking")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_import()
+        return
+
+    imports, heavy = [], set()
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        imports.append(result["import_ms"])
+        heavy.update(result["heavy"])
+
+    from app.core.config import settings
+
+    warmup = None if args.warmup is None else args.warmup == "on"
+    timings = [time_to_ready(warmup) for _ in range(args.runs)]
+    ready = [ready_ms for _, ready_ms in timings if ready_ms is not None]
+
+    report = {
+        "runs": args.runs,
+        "warmup": settings.CLIP_WARMUP_ON_STARTUP if warmup is None else warmup,
+        "import_ms": _summary(imports),
+        "first_status_ms": _summary([status_ms for status_ms, _ in timings]),
+        "first_ready_ms": _summary(ready) if ready else None,
+        "heavy_modules_at_import": sorted(heavy),
+    }
+    if args.json:
+        print(json.dumps(report))
+        return
+
+    print(f"CLIP_WARMUP_ON_STARTUP={str(report['warmup']).lower()}")
+    print("=" * 60)
+    print(f"{'metric':<24}{'median ms':>12}{'min ms':>12}{'max ms':>12}")
+    print("=" * 60)
+    for name, key in (
+        ("import app.main", "import_ms"),
+        ("first /status", "first_status_ms"),
+        ("first /ready", "first_ready_ms"),
+    ):
+        row = report[key]
+        if row is None:
+            print(f"{name:<24}{'CLIP failed to load':>36}")
+            continue
+        print(f"{name:<24}{row['median']:>12.1f}{row['min']:>12.1f}{row['max']:>12.1f}")
+    print("=" * 60)
+    print(f"Heavy modules loaded by import: {', '.join(report['heavy_modules_at_import']) or 'none'}")
+    if {"torch", "transformers", "cv2"} & heavy:
+        print("⚠️  torch/transformers/cv2 should only load on first use")
+
+
+if __name__ == "__main__":
+    main()
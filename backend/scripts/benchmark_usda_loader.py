@@ -0,0 +1,134 @@
+"""
+USDA loader benchmark: CSV-to-dict vs memory-mapped snapshot
+Each loader runs in a fresh subprocess and reports startup time, lookup
+latency, the fuzzy-index cost a worker pays on its first misspelled name,
+and memory after all of it (RSS plus private/unique memory, which is what
+each extra uvicorn worker actually costs)
+
+Usage:
+    python scripts/build_usda_snapshot.py
+    python scripts/benchmark_usda_loader.py [--runs 3]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import resolve_data_path, settings
+
+LOOKUPS = ["Rosa canina", "Quercus alba L.", "Helianthus annuus", "Zea mays"]
+FUZZY_LOOKUP = "Rosa caninna"
+
+
+def _memory_kb() -> dict:
+    """RSS and private (unique) memory of this process from /proc"""
+    memory = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                    memory[key] = int(rest.split()[0])
+        memory["Private"] = memory.pop("Private_Clean", 0) + memory.pop(
+            "Private_Dirty", 0
+        )
+    except OSError:
+        import resource
+
+        memory["Rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return memory
+
+
+def run_loader(mode: str, csv_path: str, snapshot_path: str):
+    """Child process: load one way, touch every lookup path, print JSON"""
+    baseline = _memory_kb()
+    start = time.perf_counter()
+    if mode == "csv":
+        from app.services.usda_local_index import USDALocalIndex
+
+        index = USDALocalIndex.from_file(csv_path)
+    else:
+        from app.services.usda_snapshot import USDASnapshotIndex
+
+        index = USDASnapshotIndex.open(snapshot_path)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    iterations = 2000
+    for _ in range(iterations):
+        for name in LOOKUPS:
+            index.find_by_scientific_name(name)
+    lookup_us = (time.perf_counter() - start) / (iterations * len(LOOKUPS)) * 1e6
+    index.find_by_common_name("rose", limit=10)
+    index.find_by_family("Rosaceae", limit=10)
+
+    # First fuzzy miss: builds (csv) or maps (snapshot) the fuzzy index
+    start = time.perf_counter()
+    index.match_scientific_name(FUZZY_LOOKUP)
+    fuzzy_ms = (time.perf_counter() - start) * 1000
+
+    memory = _memory_kb()
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "rows": len(index),
+                "load_ms": round(load_ms, 1),
+                "lookup_us": round(lookup_us, 2),
+                "fuzzy_ms": round(fuzzy_ms, 1),
+                "memory_kb": {k: memory[k] - baseline.get(k, 0) for k in memory},
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="USDA loader benchmark")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--child", choices=["csv", "snapshot"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    csv_path = str(resolve_data_path(settings.USDA_PLANTS_FILE))
+    snapshot_path = str(resolve_data_path(settings.USDA_SNAPSHOT_FILE))
+
+    if args.child:
+        run_loader(args.child, csv_path, snapshot_path)
+        return
+
+    if not Path(snapshot_path).exists():
+        print(f"Snapshot not found: {snapshot_path} - run build_usda_snapshot.py")
+        return
+
+    print("=" * 82)
+    print(f"{'loader':<10}{'rows':>8}{'load ms':>10}{'lookup µs':>11}{'fuzzy ms':>10}"
+          f"{'ΔRSS MB':>10}{'ΔPrivate MB':>13}")
+    print("=" * 82)
+    for mode in ("csv", "snapshot"):
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            memory = result["memory_kb"]
+            print(
+                f"{mode:<10}{result['rows']:>8}{result['load_ms']:>10.1f}"
+                f"{result['lookup_us']:>11.2f}{result['fuzzy_ms']:>10.1f}"
+                f"{memory.get('Rss', 0) / 1024:>10.1f}"
+                f"{memory.get('Private', 0) / 1024:>13.1f}"
+            )
+    print("=" * 82)
+    print("fuzzy ms is paid once per worker, on its first misspelled name.")
+    print("ΔPrivate is memory no other worker can share; snapshot pages are")
+    print("file-backed and shared through the page cache (fuzzy index included).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Zero-shot search benchmark: flat scan vs hierarchical family -> genus -> species
+Reports per-query latency, speedup, and how often the hierarchical top-1 /
+top-5 agree with the flat scan, for a few beam widths
+
+Queries are CLIP embeddings of --images if given, otherwise label
+embeddings with noise added (a stand-in for the image/text gap). With
+--synthetic N a clustered synthetic index of N labels is generated instead
+of loading ZERO_SHOT_INDEX, so the search itself can be measured without CLIP.
+
+Usage:
+    python scripts/benchmark_zero_shot_search.py [--images photos/] [--queries 200]
+    python scripts/benchmark_zero_shot_search.py --synthetic 40000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import resolve_data_path, settings
+from app.services.zero_shot_service import (
+    HierarchicalSearch,
+    ZeroShotIndex,
+    write_label_index,
+)
+
+BEAMS = [(3, 5), (5, 10), (10, 20)]
+
+
+def synthetic_index(count: int, dim: int = 512) -> str:
+    """Families -> genera -> species as nested clusters on the unit sphere"""
+    rng = np.random.default_rng(7)
+
+    def around(center, spread, n):
+        points = center + rng.normal(0, spread / np.sqrt(dim), (n, dim))
+        return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+    families = around(np.zeros(dim), 1.0, max(1, count // 80))
+    labels, vectors = [], []
+    genus_id = 0
+    while len(labels) < count:
+        family = rng.integers(len(families))
+        genus = around(families[family], 0.6, 1)[0]
+        species = around(genus, 0.5, int(rng.integers(1, 25)))
+        for vector in species[: count - len(labels)]:
+            labels.append(
+                {"scientific_name": f"Genus{genus_id} sp{len(labels)}", "family": f"Family{family}"}
+            )
+            vectors.append(vector)
+        genus_id += 1
+
+    prefix = str(Path(tempfile.mkdtemp()) / "synthetic")
+    write_label_index(prefix, labels, np.array(vectors), "{species}", settings.CLIP_MODEL_NAME)
+    return prefix
+
+
+def image_queries(paths):
+    from app.services.clip_service import clip_service
+
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.rglob("*.jp*g")) if path.is_dir() else [path])
+    return np.array(clip_service.encode_images([p.read_bytes() for p in files]), dtype=np.float32)
+
+
+def noisy_queries(index: ZeroShotIndex, count: int, noise: float):
+    rng = np.random.default_rng(0)
+    rows = rng.choice(len(index), size=min(count, len(index)), replace=False)
+    queries = index.matrix[rows].astype(np.float32)
+    queries += rng.normal(0, noise / np.sqrt(queries.shape[1]), queries.shape)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def timed(search, queries, k):
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        results.append([row for row, _, _ in search.top_k(query, k)])
+    return results, (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zero-shot search benchmark")
+    parser.add_argument("--index", default=settings.ZERO_SHOT_INDEX, help="Index prefix")
+    parser.add_argument("--synthetic", type=int, help="Generate a synthetic index of N labels")
+    parser.add_argument("--images", nargs="*", help="Query images (default: noisy label embeddings)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.8, help="Noise norm for label queries")
+    args = parser.parse_args()
+
+    prefix = synthetic_index(args.synthetic) if args.synthetic else str(resolve_data_path(args.index))
+    index = ZeroShotIndex(prefix)
+    queries = image_queries(args.images) if args.images else noisy_queries(index, args.queries, args.noise)
+
+    flat, flat_ms = timed(index, queries, 5)
+
+    print("=" * 78)
+    print(f"{len(index)} labels, {len(queries)} queries")
+    print(f"{'search':<22}{'groups':>12}{'ms/query':>10}{'speedup':>9}{'top-1 agree':>13}{'top-5 overlap':>14}")
+    print("=" * 78)
+    print(f"{'flat':<22}{'-':>12}{flat_ms:>10.2f}{'1.0x':>9}{'100.00%':>13}{'100.00%':>14}")
+    for top_families, top_genera in BEAMS:
+        search = HierarchicalSearch(index, top_families, top_genera)
+        results, ms = timed(search, queries, 5)
+        top1 = np.mean([a[0] == b[0] for a, b in zip(results, flat)])
+        top5 = np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(results, flat)])
+        groups = f"{search.family_count}/{search.genus_count}"
+        print(
+            f"{f'hier F={top_families} G={top_genera}':<22}{groups:>12}{ms:>10.2f}"
+            f"{flat_ms / ms:>8.1f}x{top1:>13.2%}{top5:>14.2%}"
+        )
+    print("=" * 78)
+    print("groups = families/genera; agreement is against the flat scan's top-5.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Build the memory-mapped USDA snapshot
+Converts plantlst.txt into the compact binary format opened by usda_service
+when USDA_BACKEND=local (re-run whenever plantlst.txt changes)
+"""
+
+import argparse
+import sys
+import time
+import logging
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import resolve_data_path, settings
+from app.services.usda_local_index import USDALocalIndex
+from app.services.usda_snapshot import USDASnapshotIndex, write_snapshot
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--source", default=settings.USDA_PLANTS_FILE, help="USDA plantlst.txt"
+    )
+    parser.add_argument(
+        "--output", default=settings.USDA_SNAPSHOT_FILE, help="Snapshot file to write"
+    )
+    args = parser.parse_args()
+
+    source = resolve_data_path(args.source)
+    output = resolve_data_path(args.output)
+    if not source.exists():
+        logger.error(f"❌ File not found: {source}")
+        return
+
+    start = time.perf_counter()
+    index = USDALocalIndex.from_file(str(source))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    size = write_snapshot(index, str(output))
+
+    # Verify: every binomial must resolve to the same record from the snapshot
+    snapshot = USDASnapshotIndex.open(str(output))
+    mismatches = sum(
+        1
+        for name in index._columns["scientific_name"]
+        if snapshot.find_by_scientific_name(name) != index.find_by_scientific_name(name)
+    )
+    snapshot.close()
+
+    if mismatches:
+        logger.error(f"❌ Snapshot verification failed: {mismatches} mismatches")
+        return
+
+    logger.info(
+        f"✅ {len(index)} plants -> {output} ({size / 1024 / 1024:.1f} MB) "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
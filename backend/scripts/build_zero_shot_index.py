@@ -0,0 +1,117 @@
+"""
+Build the local zero-shot identification index
+Encodes one CLIP text prompt per species (every accepted USDA species by
+default, or a label file) into the float16 matrix memory-mapped by
+zero_shot_service (re-run after changing CLIP_MODEL_NAME or the labels)
+
+Usage:
+    python scripts/build_zero_shot_index.py
+    python scripts/build_zero_shot_index.py --labels species.txt --output data/zero_shot/plantclef
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import resolve_data_path, settings
+from app.services.clip_service import CLIPService
+from app.services.usda_local_index import USDALocalIndex, binomial_key
+from app.services.zero_shot_service import DEFAULT_TEMPLATE, ZeroShotIndex, write_label_index
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def usda_species_labels(source: Path):
+    """One label per accepted USDA species (genus-level and synonym rows skipped)"""
+    index = USDALocalIndex.from_file(str(source))
+    labels = {}
+    for row_id in range(len(index)):
+        record = index.get_record(row_id)
+        key = binomial_key(record["scientific_name"])
+        if record["synonym_symbol"] or " " not in key or key in labels:
+            continue
+        parts = record["scientific_name"].split()
+        name_parts = 3 if "×" in parts[:2] else 2
+        labels[key] = {
+            "scientific_name": " ".join(parts[:name_parts]),
+            "common_name": record["common_name"],
+            "family": record["family"],
+        }
+    return list(labels.values())
+
+
+def file_labels(path: Path):
+    """Labels from a text file: scientific name[<TAB>common name[<TAB>family]] per line"""
+    labels = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = [field.strip() for field in line.rstrip("\n").split("\t")]
+            if fields and fields[0] and not fields[0].startswith("#"):
+                fields += [""] * (3 - len(fields))
+                labels.append(
+                    {"scientific_name": fields[0], "common_name": fields[1], "family": fields[2]}
+                )
+    return labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--labels", help="Label file (default: USDA accepted species)")
+    parser.add_argument("--source", default=settings.USDA_PLANTS_FILE, help="USDA plantlst.txt")
+    parser.add_argument("--output", default=settings.ZERO_SHOT_INDEX, help="Index prefix")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, help="Prompt, {species} is replaced")
+    parser.add_argument("--batch", type=int, default=256, help="Prompts per forward pass")
+    args = parser.parse_args()
+
+    if args.labels:
+        labels = file_labels(Path(args.labels))
+    else:
+        source = resolve_data_path(args.source)
+        if not source.exists():
+            logger.error(f"❌ File not found: {source}")
+            return
+        labels = usda_species_labels(source)
+    if not labels:
+        logger.error("❌ No labels to encode")
+        return
+    logger.info(f"📋 {len(labels)} labels, template: {args.template!r}")
+
+    service = CLIPService()
+    start = time.perf_counter()
+    embeddings = []
+    for i in range(0, len(labels), args.batch):
+        prompts = [
+            args.template.format(species=label["scientific_name"])
+            for label in labels[i : i + args.batch]
+        ]
+        embeddings.extend(service.encode_texts(prompts))
+        done = min(i + args.batch, len(labels))
+        rate = done / (time.perf_counter() - start)
+        logger.info(f"⏳ {done}/{len(labels)} prompts ({rate:.0f}/s)")
+
+    output = resolve_data_path(args.output)
+    write_label_index(
+        str(output), labels, np.array(embeddings), args.template, settings.CLIP_MODEL_NAME
+    )
+
+    # Verify: every label's own prompt must rank itself first (float16 round trip)
+    index = ZeroShotIndex(str(output))
+    sample = range(0, len(labels), max(1, len(labels) // 200))
+    self_hits = sum(index.top_k(embeddings[i], 1)[0][0] == i for i in sample)
+    logger.info(
+        f"✅ {len(labels)} labels -> {output}.npy "
+        f"({index.matrix.nbytes / 1024 / 1024:.1f} MB) in "
+        f"{time.perf_counter() - start:.0f}s; self-match {self_hits}/{len(sample)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+CLIP precision comparison: fp32 vs bf16 vs int8 dynamic quantization
+Encodes the same images in every mode and reports load time, latency,
+weight size, cosine agreement with the fp32 embeddings, and whether
+nearest-neighbour retrieval over the set still returns the same images
+
+Usage:
+    python scripts/compare_clip_precision.py --images data/kaggle/images [--limit 200]
+    python scripts/compare_clip_precision.py --modes fp32 int8 --batch 8
+"""
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.clip_service import PRECISIONS, CLIPService
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+
+
+def collect_images(paths, limit: int):
+    """Image files from the given files/directories (recursively)"""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(p for p in sorted(path.rglob("*")) if p.suffix.lower() in IMAGE_SUFFIXES)
+        elif path.suffix.lower() in IMAGE_SUFFIXES:
+            files.append(path)
+    return [Image.open(p) for p in files[:limit]]
+
+
+def synthetic_images(count: int):
+    """Fallback inputs - fine for latency, not representative for accuracy"""
+    rng = np.random.default_rng(0)
+    images = []
+    for _ in range(count):
+        base = rng.integers(0, 256, (8, 8, 3), dtype=np.uint8)
+        images.append(Image.fromarray(base).resize((640, 480), Image.Resampling.BICUBIC))
+    return images
+
+
+def weight_mb(model: torch.nn.Module) -> float:
+    """Serialized state_dict size (counts packed int8 weights correctly)"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 1024 / 1024
+
+
+def neighbours(embeddings: np.ndarray, k: int) -> np.ndarray:
+    """Top-k most similar other images for every image"""
+    similarity = embeddings @ embeddings.T
+    np.fill_diagonal(similarity, -np.inf)
+    return np.argsort(-similarity, axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLIP precision comparison")
+    parser.add_argument("--images", nargs="*", help="Image files or directories")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--modes", nargs="+", default=list(PRECISIONS), choices=PRECISIONS)
+    parser.add_argument("--batch", type=int, default=8, help="Images per forward pass")
+    args = parser.parse_args()
+
+    images = collect_images(args.images, args.limit) if args.images else []
+    if not images:
+        print("No images given - using synthetic inputs (latency only, accuracy is not meaningful)")
+        images = synthetic_images(min(args.limit, 32))
+
+    # Preprocess once so only model time is compared
+    preprocessor = CLIPService(precision="fp32")
+    views = [preprocessor.prepare_views(image, True) for image in images]
+    modes = ["fp32"] + [m for m in args.modes if m != "fp32"]
+
+    results = {}
+    for mode in modes:
+        service = CLIPService(precision=mode)
+        start = time.perf_counter()
+        service.load_model()
+        load_s = time.perf_counter() - start
+
+        service.encode_prepared(views[:1])  # Warm-up
+        embeddings = []
+        start = time.perf_counter()
+        for i in range(0, len(views), args.batch):
+            embeddings.extend(service.encode_prepared(views[i:i + args.batch]))
+        latency_ms = (time.perf_counter() - start) * 1000 / len(views)
+
+        results[mode] = {
+            "precision": service.precision,
+            "load_s": load_s,
+            "latency_ms": latency_ms,
+            "weights_mb": weight_mb(service.model),
+            "embeddings": np.array(embeddings, dtype=np.float32),
+        }
+        del service
+
+    reference = results["fp32"]["embeddings"]
+    k = min(5, len(images) - 1)
+    reference_nn = neighbours(reference, k) if k > 0 else None
+
+    print("=" * 92)
+    print(f"{len(images)} images, batch {args.batch}, {torch.get_num_threads()} threads")
+    print(f"{'mode':<8}{'load s':>8}{'ms/img':>9}{'weights MB':>12}"
+          f"{'cos mean':>10}{'cos min':>9}{'top-1 agree':>13}{f'top-{k} overlap':>15}")
+    print("=" * 92)
+    for mode in modes:
+        result = results[mode]
+        embeddings = result["embeddings"]
+        cosine = np.sum(embeddings * reference, axis=1)
+        top1 = overlap = 1.0
+        if reference_nn is not None:
+            nn = neighbours(embeddings, k)
+            top1 = float(np.mean(nn[:, 0] == reference_nn[:, 0]))
+            overlap = float(np.mean([
+                len(set(a) & set(b)) / k for a, b in zip(nn, reference_nn)
+            ]))
+        label = mode if result["precision"] == mode else f"{mode}*"
+        print(
+            f"{label:<8}{result['load_s']:>8.2f}{result['latency_ms']:>9.1f}"
+            f"{result['weights_mb']:>12.1f}{cosine.mean():>10.4f}{cosine.min():>9.4f}"
+            f"{top1:>13.2%}{overlap:>15.2%}"
+        )
+    print("=" * 92)
+    print("Agreement is measured against fp32 embeddings of the same images.")
+    if any(r["precision"] != m for m, r in results.items()):
+        print("* fell back to fp32 (int8 dynamic quantization is CPU-only)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Export every PlantImage (UUID, properties, CLIP vector) from Weaviate to a
+vector snapshot: <prefix>.npy (float16 vectors) + <prefix>.json (UUIDs and
+property columns). Restore it with import_vector_snapshot.py - into
+Weaviate (disaster recovery) or as the local vector index (warm start) -
+without re-running CLIP over the image corpus
+
+Usage:
+    python scripts/export_vector_snapshot.py
+    python scripts/export_vector_snapshot.py --output data/vectors/fixture-2026-10
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import resolve_data_path, settings
+from app.services.weaviate_service import weaviate_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export PlantImage vectors to a snapshot")
+    parser.add_argument("--output", default=settings.VECTOR_INDEX_SNAPSHOT,
+                        help="Snapshot prefix (writes <prefix>.npy and <prefix>.json)")
+    parser.add_argument("--page-size", type=int, default=500, help="Objects per cursor page")
+    args = parser.parse_args()
+
+    weaviate_service.connect()
+    summary = weaviate_service.export_plant_images(str(resolve_data_path(args.output)), args.page_size)
+    size = sum(Path(f"{summary['prefix']}{suffix}").stat().st_size for suffix in (".npy", ".json"))
+    print(
+        f"✅ {summary['objects']} objects ({summary['dim']}-d) in {summary['seconds']}s, "
+        f"{size / 1024 / 1024:.1f} MB -> {summary['prefix']}.npy/.json"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Restore a vector snapshot (export_vector_snapshot.py) without re-running CLIP
+    --target weaviate  bulk-import into PlantImage, keeping the original UUIDs
+    --target local     install it as the local vector index (VECTOR_INDEX_SNAPSHOT,
+                       used with VECTOR_SEARCH_BACKEND=local)
+
+Vectors are stored as float16, so restored vectors differ from the
+originals by ~1e-3 relative - far below what changes a ranking.
+
+Usage:
+    python scripts/import_vector_snapshot.py --input data/vectors/plant_images
+    python scripts/import_vector_snapshot.py --input backup/plant_images --target local
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import resolve_data_path, settings
+from app.services.vector_index import read_vector_snapshot, vector_index_service
+from app.services.weaviate_service import weaviate_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Restore a PlantImage vector snapshot")
+    parser.add_argument("--input", default=settings.VECTOR_INDEX_SNAPSHOT, help="Snapshot prefix")
+    parser.add_argument("--target", choices=["weaviate", "local"], default="weaviate")
+    parser.add_argument("--batch", type=int, default=200, help="Objects per Weaviate batch")
+    parser.add_argument("--force", action="store_true",
+                        help="Restore even if the snapshot was made with another CLIP model")
+    args = parser.parse_args()
+
+    prefix = str(resolve_data_path(args.input))
+    meta, _ = read_vector_snapshot(prefix)
+    logger.info(
+        f"📦 Snapshot {prefix}: {meta['count']} x {meta['dim']}-d {meta['model']} vectors "
+        f"from {meta['created_at']}"
+    )
+    if meta["model"] != settings.CLIP_MODEL_NAME and not args.force:
+        logger.error(
+            f"❌ Snapshot vectors come from {meta['model']}, this deployment encodes queries "
+            f"with {settings.CLIP_MODEL_NAME} (--force to restore anyway)"
+        )
+        sys.exit(1)
+
+    if args.target == "local":
+        index = vector_index_service.load_snapshot(prefix)
+        print(f"✅ Local vector index: {len(index)} vectors at {vector_index_service.prefix}")
+        return
+
+    weaviate_service.connect()
+    weaviate_service.create_schema()
+    summary = weaviate_service.restore_plant_images(prefix, batch_size=args.batch)
+    print(
+        f"✅ Restored {summary['added']}/{summary['total']} objects in {summary['seconds']}s "
+        f"({summary['objects_per_second']}/s), {summary['failed']} failed"
+    )
+    for error in summary["errors"]:
+        print(f"   {error}")
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,292 @@
 """
 Load Kaggle dataset into Weaviate vector database
 Prepares CLIP embeddings for similarity search
+
+Three stages with bounded queues between them (a slow stage stalls the
+ones before it instead of buffering the dataset in memory):
+    decode  - process pool: read, embedding cache lookup (by file bytes),
+              then preprocess (+ TTA crops) and CLIP-normalize on a miss
+    encode  - batched CLIP forward passes in this process (cache misses only;
+              new embeddings are stored in the embedding cache)
+    write   - thread doing bulk Weaviate imports (add_plant_images)
+
+Every imported path is appended to the checkpoint file, so an interrupted
+run resumes where it stopped (UUIDs are derived from the path, so images
+written twice are overwritten, not duplicated).
+
+Usage:
+    python scripts/load_kaggle_to_weaviate.py --limit 1000
+    python scripts/load_kaggle_to_weaviate.py --images data/kaggle/plantclef2025 --limit 0 --no-tta
 """
-import asyncio
+import argparse
+import logging
+import multiprocessing
+import os
+import queue
 import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
+
+import numpy as np
+
 sys.path.append(str(Path(__file__).parent.parent))
 
-from app.services.kaggle_service import kaggle_service
-from app.services.weaviate_service import weaviate_service
-from app.services.clip_service import clip_service
-from PIL import Image
-
-async def load_kaggle_to_weaviate(limit: int = 1000):
-    print(f"Loading Kaggle dataset to Weaviate (limit: {limit})")
-    
-    print("Fetching images from Kaggle...")
-    images = kaggle_service.get_plant_images(limit=limit)
-    print(f"Found {len(images)} images")
-    
-    print("Loading CLIP model...")
-    await clip_service.load_model()
-    
-    print("Connecting to Weaviate...")
-    await weaviate_service.connect()
-    await weaviate_service.create_schema()
-    
-    print(f"Processing {len(images)} images...")
-    success_count = 0
-    error_count = 0
-    
-    for idx, image_path in enumerate(images, 1):
-        try:
-            image = Image.open(image_path)
-            embedding = await clip_service.encode_image(image)
-            
-            plant_id = idx
-            
-            await weaviate_service.add_plant_image(
-                plant_id=plant_id,
-                image_url=image_path,
-                embedding=embedding
-            )
-            
-            success_count += 1
-            
-            if idx % 100 == 0:
-                print(f"Progress: {idx}/{len(images)} ({success_count} success, {error_count} errors)")
-        
-        except Exception as e:
-            error_count += 1
-            print(f"Error ({image_path}): {str(e)}")
-            continue
-    
-    print(f"\nLoading completed!")
-    print(f"Success: {success_count}")
-    print(f"Errors: {error_count}")
-    print(f"Success rate: {(success_count/len(images)*100):.2f}%")
+from app.services.clip_service import CLIPService, clip_service
+from app.services.embedding_cache import embedding_cache
+from app.services.weaviate_service import plant_image_uuid, weaviate_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png")
+
+# Decode worker state (one CLIPService per pool process, image processor only)
+_decoder = None
+_decoder_tta = True
+
+
+def _init_decoder(use_tta: bool):
+    global _decoder, _decoder_tta
+    _decoder = CLIPService()
+    _decoder_tta = use_tta
+
+
+def decode(path: str):
+    """
+    Pool worker: (path, cache key, cached embedding, pixel tensor, error)
+
+    A cache hit skips preprocessing and comes back with its embedding.
+    """
+    try:
+        data = Path(path).read_bytes()
+        key = _decoder.embedding_cache_key(data, _decoder_tta)
+        cached = embedding_cache.get(key) if key else None
+        if cached is not None:
+            return path, key, cached, None, None
+        views = _decoder.prepare_views(data, _decoder_tta)
+        return path, key, None, _decoder.pixel_values(views), None
+    except Exception as e:
+        return path, None, None, None, str(e)
+
+
+class PipelineStats:
+    """Stage counters and a one-line live report"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.decoded = self.cached = self.encoded = self.written = self.failed = 0
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def add(self, **counts):
+        with self.lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def report(self, write_queue: queue.Queue) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = self.written / elapsed if elapsed else 0.0
+        eta = (self.total - self.written - self.failed) / rate if rate else 0.0
+        return (
+            f"⏳ {self.written}/{self.total} written ({rate:.1f} images/s) | "
+            f"decoded {self.decoded} cached {self.cached} encoded {self.encoded} "
+            f"failed {self.failed} | "
+            f"write queue {write_queue.qsize()}/{write_queue.maxsize} | ETA {eta / 60:.0f} min"
+        )
+
+
+def list_images(images_dir: str, limit: int) -> list:
+    """Sorted image paths (sorted, so plant ids are stable across runs)"""
+    if images_dir:
+        paths = [
+            os.path.join(dirname, filename)
+            for dirname, _, filenames in os.walk(images_dir)
+            for filename in filenames
+            if filename.lower().endswith(IMAGE_SUFFIXES)
+        ]
+        paths.sort()
+        return paths[:limit] if limit else paths
+    from app.services.kaggle_service import kaggle_service  # Needs Kaggle credentials
+
+    return sorted(kaggle_service.get_plant_images(limit=limit or sys.maxsize))
+
+
+def load_checkpoint(path: Path) -> set:
+    if not path.exists():
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def write_stage(write_queue: queue.Queue, checkpoint: Path, stats: PipelineStats, batch_size: int):
+    """Writer thread: bulk import each encoded batch, then checkpoint it"""
+    checkpoint.parent.mkdir(parents=True, exist_ok=True)
+    with open(checkpoint, "a", encoding="utf-8") as log:
+        while True:
+            records = write_queue.get()
+            if records is None:
+                return
+            try:
+                summary = weaviate_service.add_plant_images(records, batch_size=batch_size)
+                failed = set(summary["failed_ids"])
+                for error in summary["errors"]:
+                    logger.warning(f"Write failed: {error}")
+            except Exception as e:
+                logger.error(f"❌ Write batch failed: {e}")
+                failed = {plant_image_uuid(record["image_url"]) for record in records}
+
+            written = [r for r in records if plant_image_uuid(r["image_url"]) not in failed]
+            log.writelines(f"{record['image_url']}\n" for record in written)
+            log.flush()
+            os.fsync(log.fileno())
+            stats.add(written=len(written), failed=len(records) - len(written))
+
+
+def queue_records(paths: list, embeddings: list, plant_ids: dict, write_queue: queue.Queue):
+    """Hand one batch of embedded images to the writer"""
+    # PlantCLEF folders are named after the species; the path keys the UUID
+    write_queue.put([  # Blocks while the writer is behind (backpressure)
+        {
+            "embedding": embedding,
+            "plant_id": plant_ids[path],
+            "scientific_name": Path(path).parent.name,
+            "common_name": "",
+            "image_url": path,
+        }
+        for path, embedding in zip(paths, embeddings)
+    ])
+
+
+def encode_batch(batch: list, plant_ids: dict, write_queue: queue.Queue, stats: PipelineStats):
+    """CLIP stage: one forward pass for the batch, cache the embeddings, hand them on"""
+    try:
+        embeddings = clip_service.encode_pixel_values(
+            np.concatenate([pixels for _, _, pixels in batch]),
+            [len(pixels) for _, _, pixels in batch],
+        )
+    except Exception as e:
+        logger.error(f"❌ CLIP batch failed ({len(batch)} images): {e}")
+        stats.add(failed=len(batch))
+        return
+    for (_, key, _), embedding in zip(batch, embeddings):
+        if key:
+            embedding_cache.set(key, embedding)
+    stats.add(encoded=len(batch))
+    queue_records([path for path, _, _ in batch], embeddings, plant_ids, write_queue)
+
+
+def run_pipeline(todo: list, plant_ids: dict, args, write_queue: queue.Queue, stats: PipelineStats):
+    """Feed the decode pool (bounded in-flight) and batch its output into CLIP"""
+    pending_paths = iter(todo)
+    in_flight = set()
+    ready, ready_rows = [], 0
+    cached = []  # (path, embedding) cache hits waiting for a write batch
+    max_in_flight = args.workers * 4
+
+    context = multiprocessing.get_context("spawn")  # Never fork a process holding torch
+    with ProcessPoolExecutor(
+        args.workers, mp_context=context, initializer=_init_decoder, initargs=(args.tta,)
+    ) as pool:
+        while True:
+            while len(in_flight) < max_in_flight:
+                path = next(pending_paths, None)
+                if path is None:
+                    break
+                in_flight.add(pool.submit(decode, path))
+            if not in_flight and not ready:
+                if cached:
+                    queue_records(*zip(*cached), plant_ids, write_queue)
+                return
+
+            if in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, key, embedding, pixels, error = future.result()
+                    if error:
+                        logger.warning(f"Decode failed ({path}): {error}")
+                        stats.add(failed=1)
+                        continue
+                    if embedding is not None:
+                        cached.append((path, embedding))
+                        stats.add(cached=1)
+                        continue
+                    ready.append((path, key, pixels))
+                    ready_rows += len(pixels)
+                    stats.add(decoded=1)
+
+            if ready and (ready_rows >= args.batch or not in_flight):
+                encode_batch(ready, plant_ids, write_queue, stats)
+                ready, ready_rows = [], 0
+            if len(cached) >= args.batch:
+                queue_records(*zip(*cached), plant_ids, write_queue)
+                cached = []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipelined Kaggle -> Weaviate loader")
+    parser.add_argument("--images", help="Image directory (default: Kaggle PlantCLEF dataset)")
+    parser.add_argument("--limit", type=int, default=1000, help="Max images (0 = all)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Decode processes")
+    parser.add_argument("--threads", type=int, default=0, help="Torch threads (0 = cores - workers)")
+    parser.add_argument("--batch", type=int, default=64, help="CLIP rows per forward pass")
+    parser.add_argument("--write-batch", type=int, default=200, help="Objects per Weaviate batch")
+    parser.add_argument("--queue", type=int, default=8, help="Encoded batches waiting for the writer")
+    parser.add_argument("--tta", action=argparse.BooleanOptionalAction, default=True,
+                        help="Multi-crop TTA, as the API uses for queries (5x CLIP work)")
+    parser.add_argument("--checkpoint", default="data/ingest/kaggle_loaded.txt",
+                        help="Imported-paths log for resuming")
+    parser.add_argument("--report-every", type=float, default=5.0, help="Seconds between reports")
+    args = parser.parse_args()
+
+    paths = list_images(args.images, args.limit)
+    plant_ids = {path: i + 1 for i, path in enumerate(paths)}
+    checkpoint = Path(args.checkpoint)
+    done = load_checkpoint(checkpoint)
+    todo = [path for path in paths if path not in done]
+    logger.info(f"📋 {len(paths)} images, {len(paths) - len(todo)} already loaded, {len(todo)} to go")
+    if not todo:
+        return
+
+    import torch
+
+    torch.set_num_threads(args.threads or max(1, (os.cpu_count() or 2) - args.workers))
+    clip_service.load_model()
+    weaviate_service.connect()
+    weaviate_service.create_schema()
+
+    stats = PipelineStats(len(todo))
+    write_queue: queue.Queue = queue.Queue(maxsize=args.queue)
+    writer = threading.Thread(
+        target=write_stage, args=(write_queue, checkpoint, stats, args.write_batch), daemon=True
+    )
+    writer.start()
+
+    stop_reporting = threading.Event()
+
+    def report():
+        while not stop_reporting.wait(args.report_every):
+            logger.info(stats.report(write_queue))
+
+    threading.Thread(target=report, daemon=True).start()
+
+    try:
+        run_pipeline(todo, plant_ids, args, write_queue, stats)
+    finally:
+        write_queue.put(None)
+        writer.join()
+        stop_reporting.set()
+
+    elapsed = time.perf_counter() - stats.started
+    logger.info(stats.report(write_queue))
+    logger.info(
+        f"✅ Loaded {stats.written}/{len(todo)} images in {elapsed / 60:.1f} min "
+        f"({stats.written / elapsed:.1f} images/s), {stats.cached} from the embedding cache, "
+        f"{stats.failed} failed"
+    )
+
 
 if __name__ == "__main__":
-    # Örnek: İlk 100 görseli yükle
-    asyncio.run(load_kaggle_to_weaviate(limit=100))
+    main()
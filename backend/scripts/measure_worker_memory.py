@@ -0,0 +1,128 @@
+"""
+Per-worker memory: uvicorn --workers vs pre-fork gunicorn (gunicorn.conf.py)
+Starts the server in each mode, waits until the workers are warm, then
+reads /proc/<pid>/smaps_rollup of the master and every worker:
+    RSS     - resident pages, shared ones counted in every process
+    PSS     - shared pages split between the processes sharing them
+    Private - pages no other process shares (what one more worker costs)
+
+Usage:
+    python scripts/measure_worker_memory.py [--workers 4] [--settle 10]
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.core.config import settings
+
+
+def smaps_kb(pid: int) -> dict:
+    memory = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                memory[key] = int(rest.split()[0])
+    memory["Private"] = memory.pop("Private_Clean", 0) + memory.pop("Private_Dirty", 0)
+    return memory
+
+
+def worker_pids(master: int) -> list:
+    """Direct children of the master, minus multiprocessing helpers"""
+    with open(f"/proc/{master}/task/{master}/children") as f:
+        children = [int(pid) for pid in f.read().split()]
+    workers = []
+    for pid in children:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            if b"resource_tracker" not in f.read():
+                workers.append(pid)
+    return workers
+
+
+def _mb(kb: int) -> float:
+    return kb / 1024
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_warm(port: int, workers: int, timeout: float):
+    """Until /ready answers 200 enough times in a row to have hit every worker"""
+    url = f"http://127.0.0.1:{port}{settings.API_V1_PREFIX}/ready"
+    deadline = time.monotonic() + timeout
+    streak = 0
+    while streak < workers * 4:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Workers not ready after {timeout}s")
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                streak = streak + 1 if response.status == 200 else 0
+        except (urllib.error.URLError, OSError):
+            streak = 0
+            time.sleep(0.5)
+
+
+def measure(mode: str, workers: int, settle: float, timeout: float):
+    port = _free_port()
+    if mode == "uvicorn":
+        command = [sys.executable, "-m", "uvicorn", "app.main:app",
+                   "--port", str(port), "--workers", str(workers)]
+    else:
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+                   "--bind", f"127.0.0.1:{port}", "--workers", str(workers), "app.main:app"]
+    env = {**os.environ, "CLIP_WARMUP_ON_STARTUP": "true"}
+    server = subprocess.Popen(
+        command, cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_warm(port, workers, timeout)
+        time.sleep(settle)
+        return smaps_kb(server.pid), [smaps_kb(pid) for pid in worker_pids(server.pid)]
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory comparison")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--settle", type=float, default=5, help="Seconds to wait once warm")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--modes", nargs="+", default=["uvicorn", "prefork"],
+                        choices=["uvicorn", "prefork"])
+    args = parser.parse_args()
+
+    print("=" * 72)
+    print(f"{'mode':<10}{'process':<12}{'RSS MB':>12}{'PSS MB':>12}{'Private MB':>14}")
+    print("=" * 72)
+    for mode in args.modes:
+        master, workers = measure(mode, args.workers, args.settle, args.timeout)
+        print(f"{mode:<10}{'master':<12}{_mb(master['Rss']):>12.0f}"
+              f"{_mb(master['Pss']):>12.0f}{_mb(master['Private']):>14.0f}")
+        for i, worker in enumerate(workers):
+            print(f"{'':<10}{f'worker {i}':<12}{_mb(worker['Rss']):>12.0f}"
+                  f"{_mb(worker['Pss']):>12.0f}{_mb(worker['Private']):>14.0f}")
+        total_pss = master["Pss"] + sum(w["Pss"] for w in workers)
+        private = sum(w["Private"] for w in workers) / max(1, len(workers))
+        print(f"{'':<10}{'total PSS':<12}{'':>12}{_mb(total_pss):>12.0f}"
+              f"{f'{_mb(private):.0f}/worker':>14}")
+        print("-" * 72)
+    print("Private/worker is what each extra worker costs; total PSS is the host's bill.")
+
+
+if __name__ == "__main__":
+    main()
@@ -214,45 +214,33 @@ def populate_weaviate():
     # Step 4: Add plants to Weaviate
     print(f"\n[4/4] Adding {len(TEST_PLANTS)} plants to Weaviate...")
     
-    added_count = 0
-    failed_count = 0
+    # Create synthetic images and encode them in one CLIP batch
+    print("       Creating synthetic images and encoding with CLIP...")
+    images = [create_synthetic_plant_image(plant) for plant in TEST_PLANTS]
+    try:
+        embeddings = clip_service.encode_images(images)
+    except Exception as e:
+        print(f"     ERROR: {e}")
+        return
     
-    for i, plant in enumerate(TEST_PLANTS, 1):
-        try:
-            print(f"\n  [{i}/{len(TEST_PLANTS)}] {plant['scientific_name']} ({plant['common_name']})")
-            
-            # Create synthetic image
-            print(f"       Creating synthetic image...")
-            img = create_synthetic_plant_image(plant)
-            
-            # Encode with CLIP
-            print(f"       Encoding with CLIP...")
-            embedding = clip_service.encode_image(img)
-            
-            if embedding is None or len(embedding) == 0:
-                print(f"       ERROR: Failed to encode image")
-                failed_count += 1
-                continue
-            
-            # Add to Weaviate
-            print(f"       Adding to Weaviate...")
-            uuid = weaviate_service.add_plant_image(
-                embedding=embedding,
-                plant_id=plant['id'],
-                scientific_name=plant['scientific_name'],
-                common_name=plant['common_name'],
-                family=plant['family'],
-                image_url=f"synthetic/{plant['scientific_name'].lower().replace(' ', '_')}.jpg",
-                description=plant['description']
-            )
-            
-            print(f"       SUCCESS! UUID: {uuid[:8]}...")
-            added_count += 1
-            
-        except Exception as e:
-            print(f"       ERROR: {e}")
-            failed_count += 1
-            continue
+    # Bulk import (deterministic UUIDs: re-running updates instead of duplicating)
+    print("       Bulk importing to Weaviate...")
+    summary = weaviate_service.add_plant_images([
+        {
+            "embedding": embedding,
+            "plant_id": plant['id'],
+            "scientific_name": plant['scientific_name'],
+            "common_name": plant['common_name'],
+            "family": plant['family'],
+            "image_url": f"synthetic/{plant['scientific_name'].lower().replace(' ', '_')}.jpg",
+            "description": plant['description'],
+        }
+        for plant, embedding in zip(TEST_PLANTS, embeddings)
+    ])
+    added_count = summary["added"]
+    failed_count = summary["failed"]
+    for error in summary["errors"]:
+        print(f"       ERROR: {error}")
     
     # Summary
     print("\n" + "="*60)
@@ -261,6 +249,7 @@ def populate_weaviate():
     print(f"  Total plants: {len(TEST_PLANTS)}")
     print(f"  Successfully added: {added_count}")
     print(f"  Failed: {failed_count}")
+    print(f"  Throughput: {summary['objects_per_second']} plants/sec ({summary['seconds']}s)")
     
     # Verify count
     total_in_db = weaviate_service.count_objects()
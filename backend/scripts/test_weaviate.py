@@ -3,6 +3,7 @@ Weaviate Cloud Connection Test
 Tests connection, schema creation, and basic operations
 """
 import sys
+import time
 from pathlib import Path
 
 # Add backend to path
@@ -162,6 +163,39 @@ def test_similarity_search():
         traceback.print_exc()
         return False
 
+def test_batch_similarity_search():
+    """Test batch similarity search (one request) against one-by-one searches"""
+    print("\n🔄 Testing batch similarity search...")
+    try:
+        colors = [(255, 80, 80), (80, 200, 80), (240, 220, 60), (120, 80, 200)]
+        query_embeddings = [
+            clip_service.encode_image(Image.new('RGB', (224, 224), color=color))
+            for color in colors
+        ]
+        
+        start = time.perf_counter()
+        singles = [weaviate_service.similarity_search(e, limit=5) for e in query_embeddings]
+        single_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        batch = weaviate_service.similarity_search_batch(query_embeddings, limit=5)
+        batch_ms = (time.perf_counter() - start) * 1000
+        
+        same = [
+            [r.get('scientificName') for r in a] == [r.get('scientificName') for r in b]
+            for a, b in zip(singles, batch)
+        ]
+        print(f"   {len(colors)} queries: {single_ms:.0f}ms one by one, {batch_ms:.0f}ms batched")
+        if len(batch) == len(colors) and all(same):
+            print("✅ Batch results match one-by-one searches")
+            return True
+        print(f"   ❌ Mismatch: {same}")
+        return False
+    except Exception as e:
+        print(f"❌ Batch similarity search error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
 def test_data_count():
     """Test counting objects in Weaviate"""
     print("\n🔄 Counting objects in Weaviate...")
@@ -190,6 +224,7 @@ def main():
         "schema": False,
         "add_data": False,
         "search": False,
+        "batch_search": False,
         "count": False
     }
     
@@ -214,6 +249,9 @@ def main():
     # Test 5: Search
     results["search"] = test_similarity_search()
     
+    # Test 6: Batch search
+    results["batch_search"] = test_batch_similarity_search()
+    
     # Summary
     print("\n" + "=" * 60)
     print("📊 Test Summary")
@@ -0,0 +1,27 @@
+"""Shared fixtures: a small plantlst.txt-shaped checklist"""
+
+import pytest
+
+from app.services.usda_local_index import USDALocalIndex
+
+# (symbol, synonym symbol, scientific name with author, common name, family)
+PLANT_ROWS = [
+    ("ROCA3", "", "Rosa canina L.", "dog rose", "Rosaceae"),
+    ("ROCA3", "ROLU5", "Rosa lutetiana Léman", "", ""),
+    ("ROCA4", "", "Rosa carolina L.", "Carolina rose", "Rosaceae"),
+    ("ROSA5", "", "Rosa L.", "rose", "Rosaceae"),
+    ("MAPU", "", "Malus pumila Mill.", "paradise apple", "Rosaceae"),
+    ("ZEMA", "", "Zea mays L.", "corn", "Poaceae"),
+    ("QURU", "", "Quercus rubra L.", "northern red oak", "Fagaceae"),
+    ("SARU8", "", "Salix ×rubens Schrank (pro sp.)", "hybrid crack willow", "Salicaceae"),
+]
+
+
+@pytest.fixture
+def plant_rows():
+    return list(PLANT_ROWS)
+
+
+@pytest.fixture
+def usda_index(plant_rows) -> USDALocalIndex:
+    return USDALocalIndex.from_rows(plant_rows)
@@ -0,0 +1,139 @@
+"""Identification pipeline: merging source predictions and caching the answer"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.api import chatbot
+from app.core.config import settings
+from app.services.redis_service import TieredCache
+
+KAGGLE = [{"scientificName": "Rosa canina", "score": 0.9, "source": "kaggle"}]
+PLANTNET = [{"scientific_name": "Rosa canina", "common_name": "dog rose", "certainty": 0.8}]
+
+
+class FakeRedis:
+    """The Redis tier of TieredCache, recording the expiry of each write"""
+
+    def __init__(self):
+        self.expiry = {}
+
+    async def get_json(self, key):
+        return None
+
+    async def set_json(self, key, value, expire=3600):
+        self.expiry[key] = expire
+        return True
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr("app.services.redis_service.redis_service", redis)
+    return redis
+
+
+@pytest.fixture
+def cache(monkeypatch, redis):
+    cache = TieredCache(namespace="pipeline:test", maxsize=16, ttl=86400)
+    monkeypatch.setattr(chatbot, "pipeline_result_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    """Stub both remote sources; tests set what each one returns"""
+    answers = {}
+    calls = []
+
+    async def identify_concurrently(image_bytes):
+        calls.append(image_bytes)
+        for source in ("kaggle", "plantnet"):
+            yield source, answers[source]
+
+    monkeypatch.setattr(chatbot, "_identify_concurrently", identify_concurrently)
+    monkeypatch.setattr(
+        chatbot, "zero_shot_service", SimpleNamespace(mode="off", is_available=False)
+    )
+    monkeypatch.setattr(
+        chatbot.usda_service,
+        "find_by_scientific_names",
+        lambda names: {name: None for name in names},
+    )
+    monkeypatch.setattr(settings, "PIPELINE_CACHE_PARTIAL_TTL", 300)
+    answers["calls"] = calls
+    return answers
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        PLANTNET,  # bare list (Kaggle's shape)
+        {"success": True, "results": PLANTNET},  # PlantNet's envelope
+        [*PLANTNET, "not a prediction"],
+    ],
+)
+def test_source_responses_normalize_to_the_same_predictions(response):
+    assert chatbot._as_prediction_list(response) == PLANTNET
+
+
+def test_prediction_list_edge_cases():
+    assert chatbot._as_prediction_list({"success": False, "results": []}) is None
+    assert chatbot._as_prediction_list({"success": True, "results": None}) == []
+    assert chatbot._as_prediction_list(PLANTNET[0]) == PLANTNET
+    assert chatbot._as_prediction_list(None) == []
+
+
+def test_plantnet_envelope_merges_like_a_list(sources):
+    envelope = chatbot._as_prediction_list({"success": True, "results": PLANTNET})
+    merged = asyncio.run(chatbot._merge_with_usda([], envelope))
+    assert merged == asyncio.run(chatbot._merge_with_usda([], PLANTNET))
+    assert [r["scientificName"] for r in merged] == ["Rosa canina"]
+
+
+def run_pipeline(image_hash):
+    async def collect():
+        return [stage async for stage in chatbot._identify_and_merge(b"image", image_hash)]
+
+    return asyncio.run(collect())
+
+
+def test_full_answer_is_cached_with_the_default_ttl(sources, cache, redis):
+    sources.update(kaggle=KAGGLE, plantnet=PLANTNET)
+    stages = run_pipeline("hash-a")
+
+    assert [stage for stage, _ in stages] == ["kaggle", "plantnet", "merged"]
+    merged = stages[-1][1]
+    assert merged[0]["scientificName"] == "Rosa canina"
+    assert merged[0]["source"] == "kaggle"
+    assert redis.expiry == {"pipeline:test:hash-a": 86400}
+
+    # Same image hash: served from the cache without asking the sources
+    assert run_pipeline("hash-a") == [("merged", merged)]
+    assert len(sources["calls"]) == 1
+
+    # Another image hash is its own entry
+    run_pipeline("hash-b")
+    assert len(sources["calls"]) == 2
+
+
+def test_answer_with_an_empty_source_is_cached_briefly(sources, cache, redis):
+    sources.update(kaggle=[], plantnet=PLANTNET)
+    merged = run_pipeline("hash-a")[-1][1]
+
+    assert merged[0]["scientificName"] == "Rosa canina"
+    assert merged[0]["commonName"] == "dog rose"
+    assert redis.expiry == {"pipeline:test:hash-a": 300}
+
+
+def test_answer_with_a_failed_source_is_not_cached(sources, cache, redis):
+    sources.update(kaggle=KAGGLE, plantnet=None)
+    stages = run_pipeline("hash-a")
+
+    assert stages[1] == ("plantnet", [])
+    assert stages[-1][1][0]["scientificName"] == "Rosa canina"
+    assert redis.expiry == {}
+
+    run_pipeline("hash-a")
+    assert len(sources["calls"]) == 2
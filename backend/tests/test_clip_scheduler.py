@@ -0,0 +1,120 @@
+"""CLIPBatchScheduler micro-batching with a fake encoder"""
+
+import threading
+from concurrent.futures import wait
+
+import pytest
+
+from app.core.exceptions import CLIPModelError
+from app.services.clip_scheduler import CLIPBatchScheduler
+
+
+class FakeCLIP:
+    """Stands in for CLIPService: one view per image, records every forward batch"""
+
+    def __init__(self):
+        self.batches = []
+        self.error = None
+        self.release = threading.Event()
+        self.release.set()
+        self.started = threading.Event()
+
+    def embedding_cache_key(self, image, use_tta):
+        return None
+
+    def prepare_views(self, image, use_tta):
+        return [image] * (3 if use_tta else 1)
+
+    def encode_prepared(self, views_per_image):
+        return self._forward([views[0] for views in views_per_image])
+
+    def encode_texts(self, texts):
+        return self._forward(texts)
+
+    def _forward(self, payloads):
+        self.started.set()
+        self.release.wait(5)
+        self.batches.append(list(payloads))
+        if self.error is not None:
+            raise self.error
+        return [[f"embedding:{payload}"] for payload in payloads]
+
+
+@pytest.fixture
+def service():
+    return FakeCLIP()
+
+
+@pytest.fixture
+def scheduler(service):
+    scheduler = CLIPBatchScheduler(service, max_batch_size=4, max_wait_ms=200)
+    yield scheduler
+    service.release.set()
+    scheduler.stop()
+
+
+def submit_while_busy(scheduler, service, texts):
+    """Hold the thread on a first request so the rest queue up together"""
+    service.release.clear()
+    first = scheduler.submit_text("first")
+    assert service.started.wait(5)
+    futures = [scheduler.submit_text(text) for text in texts]
+    return first, futures
+
+
+def test_concurrent_submits_share_a_batch_up_to_the_max_size(scheduler, service):
+    first, futures = submit_while_busy(scheduler, service, [f"t{i}" for i in range(6)])
+    service.release.set()
+    wait([first, *futures], timeout=5)
+
+    assert service.batches == [["first"], ["t0", "t1", "t2", "t3"], ["t4", "t5"]]
+    assert scheduler.stats()["largest_batch_rows"] == 4
+
+
+def test_tta_crops_count_against_the_row_budget(scheduler, service):
+    service.release.clear()
+    first = scheduler.submit_text("first")
+    assert service.started.wait(5)
+    futures = [scheduler.submit_image(f"img{i}", use_tta=True) for i in range(3)]
+    service.release.set()
+    wait([first, *futures], timeout=5)
+
+    # 3 rows per image: only one image fits in a batch of 4 rows
+    assert service.batches[1:] == [["img0"], ["img1"], ["img2"]]
+    assert [future.result() for future in futures] == [
+        ["embedding:img0"], ["embedding:img1"], ["embedding:img2"]
+    ]
+
+
+def test_each_future_gets_its_own_row(scheduler, service):
+    first, futures = submit_while_busy(scheduler, service, ["rose", "oak", "fern"])
+    service.release.set()
+
+    assert first.result(5) == ["embedding:first"]
+    assert [future.result(5) for future in futures] == [
+        ["embedding:rose"], ["embedding:oak"], ["embedding:fern"]
+    ]
+
+
+def test_encoder_error_reaches_every_waiting_future(scheduler, service):
+    first, futures = submit_while_busy(scheduler, service, ["rose", "oak", "fern"])
+    service.error = RuntimeError("out of memory")
+    service.release.set()
+
+    for future in [first, *futures]:
+        with pytest.raises(RuntimeError, match="out of memory"):
+            future.result(5)
+    assert len(service.batches) == 2
+
+
+def test_stop_fails_pending_requests(scheduler, service):
+    first, futures = submit_while_busy(scheduler, service, ["rose", "oak"])
+
+    scheduler.stop(timeout=0.1)
+    for future in futures:
+        assert isinstance(future.exception(timeout=1), CLIPModelError)
+
+    # The batch already running still completes
+    service.release.set()
+    assert first.result(5) == ["embedding:first"]
+    assert service.batches == [["first"]]
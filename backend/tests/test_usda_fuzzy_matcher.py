@@ -0,0 +1,93 @@
+"""Fuzzy binomial matching and the USDA_MATCH_THRESHOLD decision"""
+
+import pytest
+
+from app.core.config import settings
+from app.services.usda_fuzzy_matcher import (
+    MAX_EDIT_DISTANCE,
+    edit_distance,
+    name_similarity,
+)
+from app.services.usda_service import USDAPlantService
+from app.services.usda_snapshot import USDASnapshotIndex, write_snapshot
+
+
+@pytest.mark.parametrize(
+    "a, b, distance",
+    [
+        ("rosa", "rosa", 0),
+        ("rosa", "rsoa", 1),  # adjacent transposition is one edit
+        ("canina", "cainna", 1),
+        ("zea mays", "zae mais", 2),
+        ("rosa", "rosaaa", 2),
+    ],
+)
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b) == distance
+
+
+def test_edit_distance_stops_past_the_limit():
+    assert edit_distance("rosa", "quercus") == MAX_EDIT_DISTANCE + 1
+
+
+def test_name_similarity():
+    assert name_similarity("zea mays", "zea mays") == 1.0
+    assert name_similarity("zae mais", "zea mays") == pytest.approx(0.75)
+    assert name_similarity("", "zea mays") == 0.0
+
+
+def test_misspelled_binomial_resolves(usda_index):
+    plant, confidence = usda_index.match_scientific_name("Rosa_caninna")
+    assert plant["symbol"] == "ROCA3"
+    assert plant["scientific_name"] == "Rosa canina L."
+    assert 0.9 < confidence < 1.0
+
+
+def test_exact_binomial_skips_the_fuzzy_index(usda_index):
+    plant, confidence = usda_index.match_scientific_name("Zea mays")
+    assert (plant["symbol"], confidence) == ("ZEMA", 1.0)
+    assert usda_index._matcher is None
+
+
+def test_unreachable_name_has_no_match(usda_index):
+    assert usda_index.match_scientific_name("Ficus carica") is None
+
+
+def test_low_similarity_candidate_rejected(usda_index, monkeypatch):
+    monkeypatch.setattr(settings, "USDA_MATCH_THRESHOLD", 0.85)
+    service = USDAPlantService()
+
+    # Two edits in "zea mays" resolve to ZEMA but only score 0.75
+    plant, confidence = usda_index.match_scientific_name("Zae mais")
+    assert plant["symbol"] == "ZEMA" and confidence < 0.85
+    assert service._match_local(usda_index, "Zae mais") is None
+
+    accepted = service._match_local(usda_index, "Zea mais")
+    assert accepted["symbol"] == "ZEMA"
+    assert accepted["match_confidence"] == 0.875
+
+
+QUERIES = ("rosa caninna", "rosa carolia", "zae mais", "quercus rubar", "malsu", "ficus carica")
+
+
+def _fuzzy_answers(index):
+    """Plain-data view of a fuzzy index (no references into a mapped file)"""
+    matcher = index.build_fuzzy_index()
+    parts = [
+        (list(part.words), part.hashes.tolist(), part.word_ids.tolist())
+        for part in (matcher.genera, matcher.epithets)
+    ]
+    matches = [matcher.match(query) for query in QUERIES]
+    candidates = [matcher.epithets.candidates(query.split()[-1]) for query in QUERIES]
+    return parts, matches, candidates
+
+
+def test_snapshot_delete_index_matches_in_memory(usda_index, tmp_path):
+    path = tmp_path / "plantlst.snap"
+    write_snapshot(usda_index, str(path))
+    snapshot = USDASnapshotIndex.open(str(path))
+    try:
+        assert "fuzzy.genus.hashes" in snapshot._layout
+        assert _fuzzy_answers(snapshot) == _fuzzy_answers(usda_index)
+    finally:
+        snapshot.close()
@@ -0,0 +1,26 @@
+"""binomial_key normalization (USDA local index keys)"""
+
+import pytest
+
+from app.services.usda_local_index import binomial_key
+
+
+@pytest.mark.parametrize(
+    "name, key",
+    [
+        ("Rosa canina L.", "rosa canina"),
+        ("Rosa_canina", "rosa canina"),
+        ("Rosa L.", "rosa"),
+        ("Salix × rubens Schrank", "salix × rubens"),
+        ("× Sorbaronia jackii Rehder", "× sorbaronia jackii"),
+        ("× Sorbaronia Sennikov", "× sorbaronia"),
+        ("", ""),
+    ],
+)
+def test_binomial_key(name, key):
+    assert binomial_key(name) == key
+
+
+def test_spaced_intergeneric_hybrids_get_distinct_keys():
+    assert binomial_key("× Sorbaronia jackii") != binomial_key("× Sorbaronia fallax")
+    assert binomial_key("× Sorbaronia jackii") != "×"
@@ -0,0 +1,116 @@
+"""USDAPlantService lookup cache: negative TTL, uncached failures, counters"""
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.config import settings
+from app.core.exceptions import WeaviateConnectionError
+from app.services.usda_service import USDAPlantService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class CountingIndex:
+    """Wraps the fixture index, counting backend lookups; fails while `down`"""
+
+    def __init__(self, index):
+        self._index = index
+        self.calls = 0
+        self.down = False
+
+    def __getattr__(self, name):
+        method = getattr(self._index, name)
+
+        def lookup(*args, **kwargs):
+            self.calls += 1
+            if self.down:
+                raise WeaviateConnectionError("backend down")
+            return method(*args, **kwargs)
+
+        return lookup
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def backend(usda_index):
+    return CountingIndex(usda_index)
+
+
+@pytest.fixture
+def service(backend, clock, monkeypatch):
+    monkeypatch.setattr(settings, "USDA_CACHE_TTL", 86400)
+    monkeypatch.setattr(settings, "USDA_CACHE_NEGATIVE_TTL", 60)
+    monkeypatch.setattr(settings, "USDA_CACHE_SHARED", False)
+    service = USDAPlantService()
+    monkeypatch.setattr(service, "_get_local_index", lambda: backend)
+    return service
+
+
+def test_negative_results_expire_after_negative_ttl(service, backend, clock):
+    assert service.find_by_family("Moraceae") == []
+    assert service.find_by_family("Moraceae") == []
+    assert backend.calls == 1
+
+    clock.now += 59
+    assert service.find_by_family("Moraceae") == []
+    assert backend.calls == 1
+
+    clock.now += 2
+    assert service.find_by_family("Moraceae") == []
+    assert backend.calls == 2
+
+
+def test_positive_results_keep_the_full_ttl(service, backend, clock):
+    assert service.find_by_family("Poaceae")[0]["symbol"] == "ZEMA"
+    clock.now += 3600
+    assert service.find_by_family("Poaceae")[0]["symbol"] == "ZEMA"
+    assert backend.calls == 1
+
+
+def test_backend_failures_are_not_cached(service, backend):
+    backend.down = True
+    assert service.find_by_family("Poaceae") == []
+    assert service.find_by_common_name("corn") == []
+    assert len(service._cache) == 0
+
+    backend.down = False
+    assert service.find_by_family("Poaceae")[0]["symbol"] == "ZEMA"
+    assert service.find_by_common_name("corn")[0]["symbol"] == "ZEMA"
+    assert backend.calls == 4
+
+
+def test_family_key_is_normalized(service, backend):
+    results = [service.find_by_family(name) for name in ("Rosaceae", "rosaceae ", "ROSACEAE")]
+    assert results[0] == results[1] == results[2]
+    assert len(results[0]) == 4
+    assert backend.calls == 1
+
+
+def test_counters_add_up(service, backend):
+    names = ["Rosaceae", "Moraceae", "Rosaceae", "Moraceae", "Poaceae", "Rosaceae"]
+    for name in names:
+        service.find_by_family(name)
+
+    stats = service.cache_stats()
+    assert stats["hits"] + stats["misses"] == len(names)
+    assert stats["misses"] == backend.calls == 3
+    assert stats["hits"] == 3
+    assert stats["negative_hits"] == 1
+    assert stats["size"] == 3
+    assert stats["hit_rate"] == 0.5
+
+    service.clear_cache()
+    stats = service.cache_stats()
+    assert (stats["hits"], stats["misses"], stats["negative_hits"], stats["size"]) == (0, 0, 0, 0)
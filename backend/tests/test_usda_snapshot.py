@@ -0,0 +1,70 @@
+"""USDA snapshot round trip: the mapped file answers like the CSV-built index"""
+
+import csv
+
+import pytest
+
+from app.services.usda_local_index import USDALocalIndex
+from app.services.usda_snapshot import USDASnapshotIndex, write_snapshot
+
+SCIENTIFIC_NAMES = [
+    "Rosa canina",
+    "Rosa lutetiana Léman",  # synonym: common name and family come from ROCA3
+    "rosa_carolina",
+    "Rosa L.",
+    "Salix × rubens",
+    "Ficus carica",  # missing
+    "",
+]
+COMMON_NAMES = ["dog rose", "rose", "Red Oak", "apple", "baobab"]
+FAMILIES = ["Rosaceae", "rosaceae ", "POACEAE", "Moraceae"]
+
+
+@pytest.fixture
+def plantlst(tmp_path, plant_rows):
+    path = tmp_path / "plantlst.txt"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(
+            ["Symbol", "Synonym Symbol", "Scientific Name with Author", "Common Name", "Family"]
+        )
+        writer.writerows(plant_rows)
+    return path
+
+
+def _answers(index):
+    return (
+        len(index),
+        [index.find_by_scientific_name(name) for name in SCIENTIFIC_NAMES],
+        [index.find_by_common_name(name) for name in COMMON_NAMES],
+        [index.find_by_family(family, limit=3) for family in FAMILIES],
+    )
+
+
+def test_snapshot_round_trip(plantlst, plant_rows, tmp_path):
+    index = USDALocalIndex.from_file(str(plantlst))
+    path = tmp_path / "plantlst.snap"
+    assert write_snapshot(index, str(path)) == path.stat().st_size
+
+    snapshot = USDASnapshotIndex.open(str(path))
+    try:
+        answers = _answers(snapshot)
+    finally:
+        snapshot.close()
+
+    assert answers == _answers(index)
+    count, by_name, by_common, by_family = answers
+    assert count == len(plant_rows)
+    assert by_name[1]["symbol"] == "ROCA3"
+    assert by_name[1]["common_name"] == "dog rose"
+    assert by_name[5] is None
+    assert [plant["symbol"] for plant in by_common[1]][:1] == ["ROSA5"]
+    assert by_common[4] == []
+    assert [len(plants) for plants in by_family] == [3, 3, 1, 0]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "plantlst.snap"
+    path.write_bytes(b"not a snapshot" * 4)
+    with pytest.raises(ValueError):
+        USDASnapshotIndex.open(str(path))
@@ -0,0 +1,87 @@
+"""Local vector index: exact kNN ranking and the snapshot round trip"""
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.vector_index import (
+    PlantVectorIndex,
+    read_vector_snapshot,
+    write_vector_snapshot,
+)
+
+
+@pytest.fixture
+def gallery():
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((200, 32)).astype(np.float32)
+    ids = [f"00000000-0000-0000-0000-{i:012d}" for i in range(len(vectors))]
+    columns = {
+        "scientificName": [f"Species {i}" for i in range(len(vectors))],
+        "imageUrl": [f"https://example.org/{i}.jpg" for i in range(len(vectors))],
+    }
+    return ids, vectors, columns
+
+
+def brute_force_top_k(vectors, query, k):
+    cosines = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    order = np.argsort(-cosines)[:k]
+    return order.tolist(), cosines[order]
+
+
+def test_exact_top_k_matches_brute_force_cosine(gallery):
+    ids, vectors, columns = gallery
+    index = PlantVectorIndex(ids, vectors, columns, mode="exact")
+    queries = np.random.default_rng(11).standard_normal((5, 32)).astype(np.float32)
+
+    for query, hits in zip(queries, index.search_batch(queries, limit=10)):
+        rows, cosines = brute_force_top_k(vectors, query, 10)
+        assert [row for row, _ in hits] == rows
+        assert [score for _, score in hits] == pytest.approx(cosines, abs=1e-5)
+
+    results = index.similarity_search(queries[0].tolist(), limit=3)
+    rows, cosines = brute_force_top_k(vectors, queries[0], 3)
+    assert [r["_additional"]["id"] for r in results] == [ids[row] for row in rows]
+    assert [r["scientificName"] for r in results] == [f"Species {row}" for row in rows]
+    assert results[0]["_additional"]["distance"] == pytest.approx(1 - cosines[0], abs=1e-4)
+
+
+def test_limit_is_capped_by_the_gallery(gallery):
+    ids, vectors, columns = gallery
+    index = PlantVectorIndex(ids[:3], vectors[:3], {k: v[:3] for k, v in columns.items()})
+    assert len(index.search(vectors[0], limit=10)) == 3
+    assert PlantVectorIndex([], np.zeros((0, 32)), {}).search(vectors[0]) == []
+
+
+def test_snapshot_round_trip_keeps_ids_and_vectors(gallery, tmp_path):
+    ids, vectors, columns = gallery
+    prefix = str(tmp_path / "vectors" / "plant_images")
+    PlantVectorIndex(ids, vectors, columns, model="test-clip").save(prefix)
+
+    meta, stored = read_vector_snapshot(prefix)
+    assert meta["ids"] == ids
+    assert meta["columns"] == columns
+    assert meta["model"] == "test-clip"
+    assert stored.dtype == np.float16 and stored.shape == vectors.shape
+
+    restored = PlantVectorIndex.from_snapshot(prefix)
+    original = PlantVectorIndex(ids, vectors, columns)
+    assert restored.ids == ids
+    assert restored.model == "test-clip"
+    # float16 storage: same unit vectors up to half precision
+    np.testing.assert_allclose(restored.vectors, original.vectors, atol=2e-3)
+    assert [row for row, _ in restored.search(vectors[42], limit=5)] == [
+        row for row, _ in original.search(vectors[42], limit=5)
+    ]
+
+
+def test_snapshot_rejects_mismatched_lengths(gallery, tmp_path):
+    ids, vectors, columns = gallery
+    with pytest.raises(ValueError):
+        write_vector_snapshot(str(tmp_path / "bad"), ids[:-1], vectors, columns)
+
+
+def test_model_default_follows_settings(gallery, monkeypatch):
+    ids, vectors, columns = gallery
+    monkeypatch.setattr(settings, "CLIP_MODEL_NAME", "overridden-clip")
+    assert PlantVectorIndex(ids, vectors, columns).model == "overridden-clip"
@@ -9,13 +9,34 @@ const api = axios.create({
   },
 });
 
+// Bearer header for the stored auth token (null when logged out)
+const authorizationHeader = () => {
+  const token = localStorage.getItem('auth_token');
+  return token ? `Bearer ${token}` : null;
+};
+
+// Error shapes every caller receives: { message, status, data? }
+const serverError = (status, data) => {
+  const errorMessage = data?.detail || data?.message || 'An error occurred';
+  console.error('API Error:', errorMessage);
+  return { message: errorMessage, status, data };
+};
+
+const networkError = (request) => {
+  console.error('Network Error:', request);
+  return {
+    message: 'Network error. Please check your connection.',
+    status: 0,
+  };
+};
+
 // Request interceptor for adding auth tokens if needed
 api.interceptors.request.use(
   (config) => {
     // Add auth token if available
-    const token = localStorage.getItem('auth_token');
-    if (token) {
-      config.headers.Authorization = `Bearer ${token}`;
+    const authorization = authorizationHeader();
+    if (authorization) {
+      config.headers.Authorization = authorization;
     }
     return config;
   },
@@ -30,20 +51,10 @@ api.interceptors.response.use(
   (error) => {
     if (error.response) {
       // Server responded with error status
-      const errorMessage = error.response.data?.detail || error.response.data?.message || 'An error occurred';
-      console.error('API Error:', errorMessage);
-      return Promise.reject({
-        message: errorMessage,
-        status: error.response.status,
-        data: error.response.data,
-      });
+      return Promise.reject(serverError(error.response.status, error.response.data));
     } else if (error.request) {
       // Request made but no response
-      console.error('Network Error:', error.request);
-      return Promise.reject({
-        message: 'Network error. Please check your connection.',
-        status: 0,
-      });
+      return Promise.reject(networkError(error.request));
     } else {
       // Something else happened
       console.error('Error:', error.message);
@@ -74,6 +85,60 @@ export const chatAPI = {
       headers: { 'Content-Type': 'multipart/form-data' },
     }),
   
+  // Chat with image, streamed as Server-Sent Events.
+  // onEvent(event, data) fires for: validated, kaggle, plantnet, zeroshot
+  // (only when the local classifier runs), merged, response, done (same
+  // body as sendImageMessage) and error.
+  // axios can't read a streamed body in the browser, so this uses fetch with
+  // the instance's base URL, auth header and error shapes.
+  streamImageMessage: async (formData, onEvent) => {
+    const authorization = authorizationHeader();
+    let response;
+    try {
+      response = await fetch(`${api.defaults.baseURL}/chat-with-image/stream`, {
+        method: 'POST',
+        body: formData,
+        headers: authorization ? { Authorization: authorization } : {},
+      });
+    } catch (error) {
+      throw networkError(error);
+    }
+    if (!response.ok) {
+      const data = await response.json().catch(() => ({}));
+      throw serverError(response.status, data);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      let chunk;
+      try {
+        chunk = await reader.read();
+      } catch (error) {
+        throw networkError(error);
+      }
+      const { value, done } = chunk;
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const frame = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let event = 'message';
+        let data = '';
+        frame.split('\n').forEach((line) => {
+          if (line.startsWith('event:')) event = line.slice(6).trim();
+          else if (line.startsWith('data:')) data += line.slice(5).trim();
+        });
+        onEvent(event, data ? JSON.parse(data) : null);
+      }
+    }
+  },
+
   // Get conversation history
   getHistory: (sessionId) => api.get(`/conversation-history/${sessionId}`),
 };